@@ -1,19 +1,48 @@
 import os
+import re
+import math
 import logging
+import threading
+import traceback
 from telegram import Update
+from telegram.error import BadRequest
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 from web3 import Web3
-import json
 from dotenv import load_dotenv
 import asyncio
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Sequence
 from time import time
 import protocols
 import rebalancing
 from protocol_strategy import ProtocolManager, PositionData
+from dataclasses import dataclass, replace
 from protocol_strategies_impl import NeverlandStrategy, MorphoStrategy, CurvanceStrategy, EulerStrategy
 import sqlite3
+import copy
+import atexit
+from collections import defaultdict
+import pickle
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from functools import lru_cache
+from operator import attrgetter
+from cachetools import TTLCache
+
+# orjson is much faster for the per-address JSON blobs; fall back to stdlib json if it isn't installed
+try:
+    import orjson
+
+    def dumps_json(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    loads_json = orjson.loads
+except ImportError:
+    import json
+
+    def dumps_json(obj) -> str:
+        return json.dumps(obj, separators=(',', ':'))
+
+    loads_json = json.loads
 
 # Unique instance identifier to track duplicate instances
 import socket
@@ -39,7 +68,7 @@ PROTOCOL_CONFIG = {
         'health_factor_method': 'getUserAccountData',  # Method name to call
         'health_factor_index': 5,  # Index in return array (0-indexed)
         'health_factor_divisor': 1e18,  # Divisor to convert to readable format
-        'abi': protocols.load_abi('neverland')
+        'abi_name': 'neverland'  # ABI file in abis/, parsed on first use
     },
     'morpho': {
         'name': 'Morpho',
@@ -53,7 +82,7 @@ PROTOCOL_CONFIG = {
         'health_factor_method': 'position',  # Morpho uses 'position' method
         'health_factor_index': None,  # Will need custom parsing
         'health_factor_divisor': 1e18,
-        'abi': protocols.load_abi('morpho')
+        'abi_name': 'morpho'
     },
     'curvance': {
         'name': 'Curvance',
@@ -70,7 +99,7 @@ PROTOCOL_CONFIG = {
         'health_factor_method': 'getPositionHealth',  # Use getPositionHealth instead
         'health_factor_index': None,  # Will need custom parsing
         'health_factor_divisor': 1e18,
-        'abi': protocols.load_abi('curvance')
+        'abi_name': 'curvance'
     },
     'euler': {
         'name': 'Euler',
@@ -88,88 +117,160 @@ PROTOCOL_CONFIG = {
         'health_factor_method': 'getAccountEnabledVaultsInfo',  # Custom method in protocols.py
         'health_factor_index': None,  # Will need custom parsing
         'health_factor_divisor': 1e18,
-        'abi': protocols.load_abi('AccountLens')  # Use AccountLens ABI (case-sensitive)
+        'abi_name': 'AccountLens'  # Use AccountLens ABI (case-sensitive)
     }
 }
 
+# Protocol IDs, their display list and display names, computed once for command parsing and replies
+PROTOCOL_IDS = frozenset(PROTOCOL_CONFIG)
+PROTOCOL_LIST_STR = ", ".join(PROTOCOL_CONFIG)
+PROTOCOL_NAMES = {protocol_id: info['name'] for protocol_id, info in PROTOCOL_CONFIG.items()}
+# /protocols reply (PROTOCOL_CONFIG is static, so it's built once)
+PROTOCOLS_MESSAGE = "📚 Supported Protocols:\n\n" + "".join(
+    f"• {info['name']} ({protocol_id})\n  Chain: {info['chain']}\n  App: {info['app_url']}\n\n"
+    for protocol_id, info in PROTOCOL_CONFIG.items()
+)
+
 # Default protocol
 DEFAULT_PROTOCOL = 'neverland'
 
+# Default health factor alert threshold
+DEFAULT_THRESHOLD = 1.5
+
+# Wallet address format (command arguments are lowercased before validation,
+# so a plain hex match is enough - no checksum validation needed)
+ADDRESS_RE = re.compile(r'^0x[0-9a-f]{40}$')
+
+def normalize_address(text: str) -> Optional[str]:
+    """
+    Normalize a user-supplied wallet address.
+    
+    Args:
+        text: Address as typed; the 0x prefix is optional (as with Web3.is_address)
+    
+    Returns:
+        Lowercase 0x-prefixed address, or None if text is not an address
+    """
+    address = text.strip().lower()
+    if not address.startswith('0x'):
+        address = '0x' + address
+    return address if ADDRESS_RE.match(address) else None
+
+# Market ID format per protocol: (pattern, error message template)
+MARKET_ID_FORMATS = {
+    # Morpho market ID is bytes32 (0x + 64 hex)
+    'morpho': (
+        re.compile(r'^0x[0-9a-f]{64}$'),
+        "⚠️ Invalid Morpho market ID format: {market_id}\n"
+        "Market ID should be 66 characters (0x + 64 hex chars).\n"
+        "Example: 0x409f2824aee2d8391d4a5924935e13312e157055e262b923b60c9dcb47e6311d"
+    ),
+    # Curvance MarketManager is an address (0x + 40 hex)
+    'curvance': (
+        ADDRESS_RE,
+        "⚠️ Invalid Curvance MarketManager address format: {market_id}\n"
+        "MarketManager address should be 42 characters (0x + 40 hex chars).\n"
+        "Example: 0xd6365555f6a697C7C295bA741100AA644cE28545"
+    ),
+}
+
 # Load configuration from environment variables
 TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
 USER_DATA_FILE = os.environ.get('USER_DATA_FILE', 'lendinghealthchatids.json')
 DATABASE_FILE = os.environ.get('DATABASE_FILE', 'bot.db')
+DB_TIMEOUT = float(os.environ.get('DB_TIMEOUT', 30))  # seconds to wait for the database lock
 CHECK_INTERVAL = int(os.environ.get('CHECK_INTERVAL', 3600))  # Default to 1 hour
 
 # Rate limiting semaphores
-# RPC calls: max 10 concurrent requests per protocol
+# RPC calls: max 10 blocking web3 fetches running in worker threads at once
 RPC_RATE_LIMIT = int(os.environ.get('RPC_RATE_LIMIT', 10))
 # GraphQL API: max 5 concurrent requests
 GRAPHQL_RATE_LIMIT = int(os.environ.get('GRAPHQL_RATE_LIMIT', 5))
 # User processing: max 10 concurrent users
 USER_PROCESSING_LIMIT = int(os.environ.get('USER_PROCESSING_LIMIT', 10))
+# Address discovery: max 8 addresses discovered concurrently
+ADDRESS_DISCOVERY_LIMIT = int(os.environ.get('ADDRESS_DISCOVERY_LIMIT', 8))
+# Worker threads for asyncio.to_thread: room for every RPC and GraphQL slot plus DB/cache writes.
+# The interpreter default (cpu_count + 4) can be smaller than RPC_RATE_LIMIT on small hosts,
+# which would queue blocking web3 calls instead of running them side by side.
+WORKER_THREADS = int(os.environ.get('WORKER_THREADS', RPC_RATE_LIMIT + GRAPHQL_RATE_LIMIT + 4))
 
 rpc_semaphore = asyncio.Semaphore(RPC_RATE_LIMIT)
 graphql_semaphore = asyncio.Semaphore(GRAPHQL_RATE_LIMIT)
 user_processing_semaphore = asyncio.Semaphore(USER_PROCESSING_LIMIT)
+address_discovery_semaphore = asyncio.Semaphore(ADDRESS_DISCOVERY_LIMIT)
 
-# Initialize Web3 connections for each protocol (kept for backward compatibility)
-protocol_connections = {}
-for protocol_id, protocol_info in PROTOCOL_CONFIG.items():
-    w3 = Web3(Web3.HTTPProvider(protocol_info['rpc_url']))
+# Position fetches are bounded by the backend they mostly wait on. Morpho positions come from
+# the Morpho GraphQL API, so they take GraphQL slots and overlap with the on-chain protocols
+# instead of queueing behind them for RPC slots (everything else shares the one Monad node)
+FETCH_SEMAPHORES = {
+    'morpho': graphql_semaphore,
+}
+
+# Web3 connections are built lazily on first use, so protocols that are never
+# touched don't pay for ABI parsing and contract construction at startup.
+# Protocols on the same RPC URL share one Web3 instance (see protocols.make_web3)
+@lru_cache(maxsize=None)
+def get_connection(protocol_id: str) -> Dict:
+    """
+    Get the Web3 connection for a protocol, building it on first use.
+    
+    Args:
+        protocol_id: Protocol identifier (must be in PROTOCOL_CONFIG)
+    
+    Returns:
+        Dict with 'w3', 'contract', 'protocol' and 'health_fn'
+    """
+    protocol_info = PROTOCOL_CONFIG[protocol_id]
+    w3 = protocols.make_web3(protocol_info['rpc_url'])
     contract_address = protocol_info['pool_address']
-    contract = w3.eth.contract(address=contract_address, abi=protocol_info['abi'])
-    protocol_connections[protocol_id] = {
+    contract = w3.eth.contract(address=contract_address, abi=protocols.load_abi(protocol_info['abi_name']))
+    # Resolve the health factor method once instead of per check
+    try:
+        health_fn = contract.functions[protocol_info['health_factor_method']]
+    except Exception:
+        health_fn = None
+    logger.debug(f"Initialized {protocol_info['name']} connection")
+    return {
         'w3': w3,
         'contract': contract,
-        'protocol': protocol_info
+        'protocol': protocol_info,
+        'health_fn': health_fn
     }
 
 # Initialize ProtocolManager with strategies (new Strategy Pattern approach)
+# Strategies are registered as factories, so a protocol's Web3 connection is only built when first queried
 protocol_manager = ProtocolManager()
 
-# Register Neverland strategy
-neverland_conn = protocol_connections['neverland']
-protocol_manager.register_strategy(
-    NeverlandStrategy(
-        neverland_conn['contract'],
-        neverland_conn['w3'],
-        PROTOCOL_CONFIG['neverland']['app_url']
-    )
-)
+# Build Neverland strategy
+def _build_neverland_strategy() -> NeverlandStrategy:
+    conn = get_connection('neverland')
+    return NeverlandStrategy(conn['contract'], conn['w3'], PROTOCOL_CONFIG['neverland']['app_url'])
 
-# Register Morpho strategy
-morpho_info = PROTOCOL_CONFIG['morpho']
-morpho_conn = protocol_connections['morpho']
-protocol_manager.register_strategy(
-    MorphoStrategy(
-        morpho_conn['w3'],
-        morpho_info['chain_id'],
-        morpho_info['app_url']
-    )
-)
+# Build Morpho strategy
+def _build_morpho_strategy() -> MorphoStrategy:
+    morpho_info = PROTOCOL_CONFIG['morpho']
+    return MorphoStrategy(get_connection('morpho')['w3'], morpho_info['chain_id'], morpho_info['app_url'])
 
-# Register Curvance strategy
-curvance_conn = protocol_connections['curvance']
-protocol_manager.register_strategy(
-    CurvanceStrategy(
-        curvance_conn['contract'],
-        curvance_conn['w3'],
-        PROTOCOL_CONFIG['curvance']['app_url']
-    )
-)
+# Build Curvance strategy
+def _build_curvance_strategy() -> CurvanceStrategy:
+    conn = get_connection('curvance')
+    return CurvanceStrategy(conn['contract'], conn['w3'], PROTOCOL_CONFIG['curvance']['app_url'])
 
-# Register Euler strategy (now supports sub-accounts for isolated vaults)
-euler_info = PROTOCOL_CONFIG['euler']
-euler_w3 = Web3(Web3.HTTPProvider(euler_info['rpc_url']))
-protocol_manager.register_strategy(
-    EulerStrategy(
-        euler_w3,
+# Build Euler strategy (now supports sub-accounts for isolated vaults)
+def _build_euler_strategy() -> EulerStrategy:
+    euler_info = PROTOCOL_CONFIG['euler']
+    return EulerStrategy(
+        protocols.make_web3(euler_info['rpc_url']),
         euler_info['account_lens_address'],
         euler_info['pool_address'],  # EVC address
         euler_info['app_url']
     )
-)
+
+protocol_manager.register_factory('neverland', _build_neverland_strategy)
+protocol_manager.register_factory('morpho', _build_morpho_strategy)
+protocol_manager.register_factory('curvance', _build_curvance_strategy)
+protocol_manager.register_factory('euler', _build_euler_strategy)
 
 # Debug: Print environment variables
 print("TELEGRAM_BOT_TOKEN:", "SET" if TOKEN else "NOT SET")
@@ -183,6 +284,8 @@ for protocol_id, protocol_info in PROTOCOL_CONFIG.items():
 def init_database():
     """Initialize SQLite database with schema."""
     with get_db() as conn:
+        # WAL lets readers run alongside the single writer (cache writes vs. user data saves)
+        conn.execute('PRAGMA journal_mode=WAL')
         conn.execute('''
             CREATE TABLE IF NOT EXISTS user_data (
                 chat_id TEXT NOT NULL,
@@ -197,11 +300,18 @@ def init_database():
         conn.execute('''
             CREATE INDEX IF NOT EXISTS idx_address ON user_data(address)
         ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache (
+                cache_key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
 
 @contextmanager
 def get_db():
     """Get database connection with automatic commit/rollback."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = sqlite3.connect(DATABASE_FILE, timeout=DB_TIMEOUT)
     conn.row_factory = sqlite3.Row
     try:
         yield conn
@@ -221,7 +331,7 @@ def load_user_data():
             for row in cursor:
                 chat_id = row['chat_id']
                 address = row['address']
-                user_info = json.loads(row['data'])
+                user_info = loads_json(row['data'])
                 
                 if chat_id not in data:
                     data[chat_id] = {'addresses': {}}
@@ -239,24 +349,35 @@ def load_user_data():
     
     return data
 
-def save_user_data(data):
-    """Save user data to database."""
+def save_user_data(data, rows: Optional[List[tuple]] = None):
+    """
+    Save user data to database.
+    
+    Args:
+        data: User data keyed by chat_id (may hold only the chats/addresses being written)
+        rows: (chat_id, address) rows to write (default: every chat in data). A row whose
+            address is missing from data is deleted; address None rewrites the whole chat,
+            deleting it if the chat is missing from data (e.g. after /stop).
+    """
+    if rows is None:
+        rows = [(chat_id, None) for chat_id in data]
     try:
         with get_db() as conn:
-            # Clear existing data for all chat_ids that are in the new data
-            chat_ids = list(data.keys())
-            if chat_ids:
-                placeholders = ','.join(['?'] * len(chat_ids))
-                conn.execute(f'DELETE FROM user_data WHERE chat_id IN ({placeholders})', chat_ids)
-            
-            # Insert new data
-            for chat_id, user_info in data.items():
-                addresses = user_info.get('addresses', {})
-                for address, address_data in addresses.items():
+            for chat_id, address in rows:
+                addresses = data.get(chat_id, {}).get('addresses', {})
+                if address is None:
+                    conn.execute('DELETE FROM user_data WHERE chat_id = ?', (chat_id,))
+                    conn.executemany(
+                        'INSERT INTO user_data (chat_id, address, data) VALUES (?, ?, ?)',
+                        [(chat_id, addr, dumps_json(address_data)) for addr, address_data in addresses.items()]
+                    )
+                elif address in addresses:
                     conn.execute(
                         'INSERT OR REPLACE INTO user_data (chat_id, address, data) VALUES (?, ?, ?)',
-                        (chat_id, address, json.dumps(address_data))
+                        (chat_id, address, dumps_json(addresses[address]))
                     )
+                else:
+                    conn.execute('DELETE FROM user_data WHERE chat_id = ? AND address = ?', (chat_id, address))
     except Exception as e:
         logger.error(f"Error saving user data to database: {e}")
         raise
@@ -267,33 +388,288 @@ init_database()
 # Global variable to store user data (loaded from database)
 user_data = load_user_data()
 
+# Flattened threshold lookup, see _rebuild_threshold_index()
+_threshold_index: Dict[tuple, float] = {}
+
+# Debounced persistence: handlers only mark user data dirty, and a background
+# task writes it off the event loop, collapsing a burst of mutations into one write
+PERSIST_DEBOUNCE = float(os.environ.get('PERSIST_DEBOUNCE', 0.5))  # seconds
+_user_data_dirty = asyncio.Event()
+# (chat_id, address) rows changed since the last flush - only those rows are written.
+# address None marks the whole chat (e.g. /stop)
+_dirty_rows: set = set()
+_persist_task: Optional[asyncio.Task] = None
+
+def mark_user_data_dirty(chat_id: str, address: Optional[str] = None):
+    """Schedule a chat's address row (or the whole chat) to be persisted by the background writer."""
+    _rebuild_threshold_index()
+    _dirty_rows.add((chat_id, address))
+    _user_data_dirty.set()
+
+def _snapshot_rows(rows: List[tuple]) -> Dict:
+    """Copy just the user data needed to write rows, so handlers can keep mutating user_data."""
+    snapshot = {}
+    for chat_id, address in rows:
+        addresses = user_data.get(chat_id, {}).get('addresses', {})
+        target = snapshot.setdefault(chat_id, {'addresses': {}})['addresses']
+        if address is None:
+            target.update(copy.deepcopy(addresses))
+        elif address in addresses:
+            target[address] = copy.deepcopy(addresses[address])
+    return snapshot
+
+async def flush_user_data():
+    """Persist changed rows now (in a worker thread) if there are pending changes."""
+    if not _user_data_dirty.is_set():
+        return
+    _user_data_dirty.clear()
+    rows = list(_dirty_rows)
+    _dirty_rows.clear()
+    snapshot = _snapshot_rows(rows)
+    try:
+        await asyncio.to_thread(save_user_data, snapshot, rows)
+    except Exception as e:
+        logger.error(f"Error persisting user data: {e}")
+        _dirty_rows.update(rows)
+        _user_data_dirty.set()  # Retry on the next flush
+
+async def _persist_loop():
+    """Background writer: wait for changes, debounce, then flush."""
+    while True:
+        await _user_data_dirty.wait()
+        await asyncio.sleep(PERSIST_DEBOUNCE)
+        await flush_user_data()
+
+def start_persistence():
+    """Start the background user data writer (must be called from the running event loop)."""
+    global _persist_task
+    if _persist_task is None or _persist_task.done():
+        _persist_task = asyncio.create_task(_persist_loop())
+
+async def stop_persistence():
+    """Stop the background writer and flush any pending changes."""
+    global _persist_task
+    if _persist_task is not None:
+        _persist_task.cancel()
+        try:
+            await _persist_task
+        except asyncio.CancelledError:
+            pass
+        _persist_task = None
+    await flush_user_data()
+    await asyncio.to_thread(save_static_caches)
+
+@atexit.register
+def _flush_user_data_at_exit():
+    """Last-chance synchronous write for changes still pending when the process exits
+    without a clean shutdown (or when the shutdown flush failed)."""
+    if not _dirty_rows:
+        return
+    rows = list(_dirty_rows)
+    try:
+        save_user_data(_snapshot_rows(rows), rows)
+        _dirty_rows.clear()
+    except Exception as e:
+        logger.error(f"Error persisting user data at exit: {e}")
+
 # Cache for API calls (30 second TTL to balance accuracy vs API calls)
-_cache = {}
+# TTLCache is bounded and evicts expired entries itself, so the cache can't grow without limit
 CACHE_TTL = 30  # seconds
+CACHE_MAXSIZE = int(os.environ.get('CACHE_MAXSIZE', 2048))
+_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+
+# Negative cache: (protocol_id, address) pairs that recently had no positions are skipped
+# for NEGATIVE_CACHE_TTL, so dormant addresses don't re-run a protocol's whole RPC sequence
+NEGATIVE_CACHE_TTL = int(os.environ.get('NEGATIVE_CACHE_TTL', 60))  # seconds
+_empty_positions = TTLCache(maxsize=CACHE_MAXSIZE, ttl=NEGATIVE_CACHE_TTL)
+
+# Dormant pairs: a (protocol_id, address) confirmed to have no debt is skipped by periodic sweeps
+# until DORMANT_RECHECK_INTERVAL has passed since it read as empty, then re-read. Capped at
+# CHECK_INTERVAL so a newly opened borrow is never missed for longer than one sweep period.
+# Commands still use the short negative cache above, and a position found by any of them
+# (or /add) makes the pair active again.
+DORMANT_RECHECK_INTERVAL = min(int(os.environ.get('DORMANT_RECHECK_INTERVAL', 1800)), CHECK_INTERVAL)  # seconds
+_dormant_positions = TTLCache(maxsize=CACHE_MAXSIZE, ttl=DORMANT_RECHECK_INTERVAL)
+
+# Second tier: results persisted in the database so interactive commands right after a restart
+# can serve recent data immediately (stale-while-revalidate) instead of waiting on a cold fetch.
+# Only used for keys this process hasn't fetched yet - after that a memory miss waits for fresh data.
+DISK_CACHE_TTL = int(os.environ.get('DISK_CACHE_TTL', 300))  # seconds
+# Keys fetched at least once by this process (no longer eligible for the disk tier)
+_fetched_keys: set = set()
+
+# In-flight fetches keyed like _cache, so concurrent callers share one request (single-flight)
+_inflight: Dict[tuple, asyncio.Future] = {}
+# Strong references to running fetch tasks (the event loop only keeps weak ones)
+_fetch_tasks: set = set()
 
-def get_cached_or_fetch(cache_key: str, fetch_func, *args, **kwargs):
+# Block-invariant data (e.g. Morpho LLTVs) is stored under this prefix and never expires
+STATIC_CACHE_PREFIX = 'static:'
+# Entry counts at the last save, so unchanged static caches aren't rewritten
+_static_cache_sizes: Dict[str, int] = {}
+# Serializes cache table writes from worker threads, so a sweep's fetches queue here instead
+# of all contending with save_user_data for the database lock
+_disk_cache_lock = threading.Lock()
+
+def disk_cache_key(cache_key: tuple) -> str:
+    """Flatten an in-memory cache key into the cache table's string key (e.g. 'positions_morpho_0x...')."""
+    return '_'.join(map(str, cache_key))
+
+def disk_cache_get(cache_key: str, ttl: Optional[int] = DISK_CACHE_TTL):
     """
-    Get from cache if valid, otherwise fetch and cache.
+    Read a value from the disk cache.
     
     Args:
         cache_key: Unique cache key
-        fetch_func: Function to call if cache miss
+        ttl: Max age in seconds, or None for entries that never expire
+    
+    Returns:
+        Cached value, or None if missing or older than ttl
+    """
+    try:
+        with get_db() as conn:
+            if ttl is None:
+                row = conn.execute('SELECT value FROM cache WHERE cache_key = ?', (cache_key,)).fetchone()
+            else:
+                row = conn.execute(
+                    'SELECT value FROM cache WHERE cache_key = ? AND updated_at >= ?',
+                    (cache_key, time() - ttl)
+                ).fetchone()
+        return pickle.loads(row['value']) if row else None
+    except Exception as e:
+        logger.debug(f"Disk cache read failed for {cache_key}: {e}")
+        return None
+
+def disk_cache_set(cache_key: str, value):
+    """Write a value to the disk cache (expired entries are dropped by disk_cache_prune)."""
+    try:
+        value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with _disk_cache_lock, get_db() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (cache_key, value, updated_at) VALUES (?, ?, ?)',
+                (cache_key, value, time())
+            )
+    except Exception as e:
+        logger.warning(f"Disk cache write failed for {cache_key}: {e}")
+
+def disk_cache_delete(cache_keys: List[str]):
+    """Remove entries from the disk cache."""
+    try:
+        with _disk_cache_lock, get_db() as conn:
+            conn.executemany('DELETE FROM cache WHERE cache_key = ?', [(cache_key,) for cache_key in cache_keys])
+    except Exception as e:
+        logger.warning(f"Disk cache delete failed for {cache_keys}: {e}")
+
+def disk_cache_prune():
+    """Drop expired (non-static) disk cache entries. Runs at startup and after each periodic sweep."""
+    try:
+        with _disk_cache_lock, get_db() as conn:
+            pruned = conn.execute(
+                'DELETE FROM cache WHERE updated_at < ? AND cache_key NOT LIKE ?',
+                (time() - DISK_CACHE_TTL, STATIC_CACHE_PREFIX + '%')
+            ).rowcount
+        if pruned:
+            logger.debug(f"Pruned {pruned} expired disk cache entries")
+    except Exception as e:
+        logger.warning(f"Disk cache prune failed: {e}")
+
+def load_static_caches():
+    """Warm protocols' block-invariant caches from disk."""
+    for name, cache in protocols.STATIC_CACHES.items():
+        stored = disk_cache_get(STATIC_CACHE_PREFIX + name, ttl=None)
+        if stored:
+            cache.update(stored)
+            logger.info(f"Loaded {len(stored)} cached {name} entries from disk")
+        _static_cache_sizes[name] = len(cache)
+
+def save_static_caches():
+    """Persist protocols' block-invariant caches that gained entries since the last save."""
+    for name, cache in protocols.STATIC_CACHES.items():
+        if len(cache) != _static_cache_sizes.get(name):
+            disk_cache_set(STATIC_CACHE_PREFIX + name, dict(cache))
+            _static_cache_sizes[name] = len(cache)
+
+load_static_caches()
+disk_cache_prune()
+
+async def _run_fetch(cache_key: tuple, future: asyncio.Future, fetch_func, args, kwargs):
+    """Run a registered fetch, resolve its future and populate both cache tiers."""
+    try:
+        if asyncio.iscoroutinefunction(fetch_func):
+            value = await fetch_func(*args, **kwargs)
+        else:
+            # Blocking web3 calls run off the event loop, capped by rpc_semaphore
+            async with rpc_semaphore:
+                value = await asyncio.to_thread(fetch_func, *args, **kwargs)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved - waiters (if any) re-raise it themselves
+        return
+    finally:
+        if _inflight.get(cache_key) is future:
+            del _inflight[cache_key]
+    
+    _cache[cache_key] = value
+    _fetched_keys.add(cache_key)
+    future.set_result(value)
+    await asyncio.to_thread(disk_cache_set, disk_cache_key(cache_key), value)
+    await asyncio.to_thread(save_static_caches)
+
+def _start_fetch(cache_key: tuple, fetch_func, args, kwargs) -> asyncio.Future:
+    """Register an in-flight fetch for cache_key and start it in the background."""
+    future = asyncio.get_running_loop().create_future()
+    _inflight[cache_key] = future
+    task = asyncio.create_task(_run_fetch(cache_key, future, fetch_func, args, kwargs))
+    _fetch_tasks.add(task)
+    task.add_done_callback(_fetch_tasks.discard)
+    return future
+
+async def get_cached_or_fetch(cache_key: tuple, fetch_func, *args, allow_stale: bool = False, **kwargs):
+    """
+    Get from cache if valid, otherwise fetch and cache.
+    Concurrent misses for the same key are coalesced into a single fetch.
+    With allow_stale, a memory miss on a key this process hasn't fetched yet (cold start)
+    returns a recent disk-cached value immediately while a background fetch refreshes it;
+    otherwise the caller waits for fresh data.
+    
+    Args:
+        cache_key: Unique cache key, a tuple of its parts (e.g. ('positions', protocol_id, address));
+            only the disk tier flattens it to a string
+        fetch_func: Function to call if cache miss (sync functions run in a worker thread)
         *args, **kwargs: Arguments to pass to fetch_func
+        allow_stale: Serve a disk-cached value on cold start (never set on the alert path)
     
     Returns:
         Cached or freshly fetched value
     """
-    if cache_key in _cache:
-        value, timestamp = _cache[cache_key]
-        if time() - timestamp < CACHE_TTL:
-            logger.debug(f"Cache hit for {cache_key}")
-            return value
-    
-    # Fetch fresh data
-    logger.debug(f"Cache miss for {cache_key}, fetching fresh data")
-    value = fetch_func(*args, **kwargs)
-    _cache[cache_key] = (value, time())
-    return value
+    try:
+        value = _cache[cache_key]
+        logger.debug(f"Cache hit for {cache_key}")
+        return value
+    except KeyError:
+        pass
+    
+    # Join an identical fetch that is already running
+    inflight = _inflight.get(cache_key)
+    if inflight is None and allow_stale and cache_key not in _fetched_keys:
+        stale = await asyncio.to_thread(disk_cache_get, disk_cache_key(cache_key))
+        inflight = _inflight.get(cache_key)  # Another caller may have started one meanwhile
+        if stale is not None:
+            if inflight is None:
+                logger.debug(f"Disk cache hit for {cache_key}, refreshing in background")
+                _start_fetch(cache_key, fetch_func, args, kwargs)
+            return stale
+    
+    if inflight is None:
+        logger.debug(f"Cache miss for {cache_key}, fetching fresh data")
+        inflight = _start_fetch(cache_key, fetch_func, args, kwargs)
+    else:
+        logger.debug(f"Joining in-flight fetch for {cache_key}")
+    # Shield so a cancelled waiter doesn't cancel the shared fetch
+    return await asyncio.shield(inflight)
 
 def is_valid_position(health_factor: Optional[float], borrow_amount: Optional[float] = None) -> bool:
     """
@@ -328,6 +704,25 @@ def is_valid_position(health_factor: Optional[float], borrow_amount: Optional[fl
     
     return True
 
+def _rebuild_threshold_index():
+    """
+    Flatten user_data thresholds into a single dict keyed by
+    (chat_id, address, protocol_id, market_id), with None for the levels that don't apply.
+    Rebuilt whenever user data is mutated so lookups are plain dict hits.
+    """
+    global _threshold_index
+    index = {}
+    for chat_id, chat_data in user_data.items():
+        for address, address_data in chat_data.get('addresses', {}).items():
+            index[(chat_id, address, None, None)] = float(address_data.get('default_threshold', DEFAULT_THRESHOLD))
+            for protocol_id, protocol_data in address_data.get('protocols', {}).items():
+                if protocol_data.get('threshold'):
+                    index[(chat_id, address, protocol_id, None)] = float(protocol_data['threshold'])
+                for market_id, market_data in protocol_data.get('markets', {}).items():
+                    if market_data.get('threshold'):
+                        index[(chat_id, address, protocol_id, market_id)] = float(market_data['threshold'])
+    _threshold_index = index
+
 def get_threshold_for_position(chat_id: str, address: str, protocol_id: str, market_id: Optional[str] = None) -> float:
     """
     Get threshold for a position using hierarchy:
@@ -342,29 +737,36 @@ def get_threshold_for_position(chat_id: str, address: str, protocol_id: str, mar
     Returns:
         Threshold value (defaults to 1.5 if not found)
     """
-    if chat_id not in user_data:
-        return 1.5
-    
-    address_data = user_data[chat_id].get('addresses', {}).get(address, {})
+    index = _threshold_index
     
     # Check market-specific first
     if market_id:
-        market_threshold = address_data.get('protocols', {}).get(protocol_id, {}).get('markets', {}).get(market_id, {}).get('threshold')
-        if market_threshold:
-            return float(market_threshold)
+        threshold = index.get((chat_id, address, protocol_id, market_id))
+        if threshold is not None:
+            return threshold
     
     # Check protocol-specific
-    protocol_threshold = address_data.get('protocols', {}).get(protocol_id, {}).get('threshold')
-    if protocol_threshold:
-        return float(protocol_threshold)
+    threshold = index.get((chat_id, address, protocol_id, None))
+    if threshold is not None:
+        return threshold
     
     # Fall back to global default
-    return float(address_data.get('default_threshold', 1.5))
+    return index.get((chat_id, address, None, None), DEFAULT_THRESHOLD)
+
+_rebuild_threshold_index()
+
+# Health factors from check_health_factor, keyed by (protocol_id, address); failures (None) aren't cached.
+# Locked because callers may run it in worker threads.
+_health_factor_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+_health_factor_lock = threading.Lock()
+# In-flight check_health_factor_async fetches keyed like _health_factor_cache
+_health_factor_inflight: Dict[tuple, asyncio.Future] = {}
 
 # Function to check health factor for a specific protocol
 def check_health_factor(address, protocol_id='neverland'):
     """
     Check health factor for an address on a specific protocol.
+    Results are cached for CACHE_TTL seconds.
     
     Args:
         address: User's wallet address
@@ -373,52 +775,100 @@ def check_health_factor(address, protocol_id='neverland'):
     Returns:
         Health factor as float, or None if error
     """
-    if protocol_id not in protocol_connections:
+    if protocol_id not in PROTOCOL_IDS:
         logger.error(f"Unknown protocol: {protocol_id}")
         return None
     
-    conn = protocol_connections[protocol_id]
-    protocol_info = conn['protocol']
-    contract = conn['contract']
+    cache_key = (protocol_id, address.lower())
+    with _health_factor_lock:
+        health_factor = _health_factor_cache.get(cache_key)
+    if health_factor is not None:
+        logger.debug(f"Cache hit for {protocol_id} health factor of {address}")
+        return health_factor
+    
+    health_factor = _fetch_health_factor(address, protocol_id)
+    if health_factor is not None:
+        with _health_factor_lock:
+            _health_factor_cache[cache_key] = health_factor
+    return health_factor
+
+async def check_health_factor_async(address: str, protocol_id: str = 'neverland') -> Optional[float]:
+    """
+    Async wrapper for check_health_factor: serves cache hits directly and runs the blocking
+    RPC in a worker thread (bounded by rpc_semaphore) so the event loop is never stalled.
+    
+    Args:
+        address: User's wallet address
+        protocol_id: Protocol identifier ('neverland', 'morpho', etc.)
     
+    Returns:
+        Health factor as float, or None if error
+    """
+    cache_key = (protocol_id, address.lower())
+    with _health_factor_lock:
+        health_factor = _health_factor_cache.get(cache_key)
+    if health_factor is not None:
+        return health_factor
+    
+    # Concurrent misses for the same key share one RPC (single-flight)
+    inflight = _health_factor_inflight.get(cache_key)
+    if inflight is None:
+        inflight = asyncio.ensure_future(_check_health_factor_in_thread(address, protocol_id))
+        _health_factor_inflight[cache_key] = inflight
+        inflight.add_done_callback(lambda _: _health_factor_inflight.pop(cache_key, None))
+    # Shielded so one cancelled caller doesn't cancel the fetch for the others
+    return await asyncio.shield(inflight)
+
+async def _check_health_factor_in_thread(address: str, protocol_id: str) -> Optional[float]:
+    async with rpc_semaphore:
+        return await asyncio.to_thread(check_health_factor, address, protocol_id)
+
+def _neverland_health_factor(address: str, conn: Dict) -> Optional[float]:
+    return protocols.check_neverland_health_factor(address, conn['contract'], conn['w3'])
+
+def _morpho_health_factor(address: str, conn: Dict) -> Optional[float]:
+    # Morpho Blue requires market IDs - fetch user positions
+    return protocols.check_morpho_health_factor_all_markets(address, None, conn['protocol']['chain_id'])
+
+def _curvance_health_factor(address: str, conn: Dict) -> Optional[float]:
+    # No MarketManager given - query the Central Registry for all MarketManagers
+    return protocols.check_curvance_health_factor(address, conn['contract'], conn['w3'], None, None)
+
+def _generic_health_factor(address: str, conn: Dict) -> Optional[float]:
+    """Call the protocol's pre-resolved health factor method and extract the value per PROTOCOL_CONFIG."""
+    protocol_info = conn['protocol']
+    health_fn = conn['health_fn']
+    if health_fn is None:
+        logger.error(f"{protocol_info['name']} has no {protocol_info['health_factor_method']} method in its ABI")
+        return None
+    if protocol_info['health_factor_index'] is None:
+        logger.error(f"{protocol_info['name']} requires custom health factor extraction")
+        return None
+    result = health_fn(protocols.to_checksum_address(address)).call()
+    if isinstance(result, (list, tuple)):
+        result = result[protocol_info['health_factor_index']]
+    return result / protocol_info['health_factor_divisor']
+
+# Health factor readers by protocol; protocols not listed use _generic_health_factor
+# (Euler has no single health factor call - its positions come from EulerStrategy)
+HEALTH_HANDLERS = {
+    'neverland': _neverland_health_factor,
+    'morpho': _morpho_health_factor,
+    'curvance': _curvance_health_factor,
+}
+
+# Protocols check_health_factor can read for a bare address: a dedicated handler or a
+# generic method with a known result index (Euler has neither, so lookups would only log errors)
+HEALTH_CHECK_PROTOCOLS = tuple(
+    protocol_id for protocol_id, info in PROTOCOL_CONFIG.items()
+    if protocol_id in HEALTH_HANDLERS or info['health_factor_index'] is not None
+)
+
+def _fetch_health_factor(address, protocol_id):
+    """Query a protocol's health factor for an address (uncached, see check_health_factor)."""
+    handler = HEALTH_HANDLERS.get(protocol_id, _generic_health_factor)
     try:
-        method_name = protocol_info['health_factor_method']
-        
-        # Handle different protocol structures
-        if protocol_id == 'neverland':
-            return protocols.check_neverland_health_factor(address, contract, conn['w3'])
-        
-        elif protocol_id == 'morpho':
-            # Morpho Blue requires market IDs - fetch user positions
-            market_id = None
-            return protocols.check_morpho_health_factor_all_markets(address, market_id, protocol_info['chain_id'])
-        
-        elif protocol_id == 'curvance':
-            # Pass MarketManager address for getPositionHealth
-            # MarketManager should come from user data (stored when /add was called)
-            # If not found, will query Central Registry for all MarketManagers
-            market_manager = None  # Will be passed from user data in check function
-            return protocols.check_curvance_health_factor(address, contract, conn['w3'], market_manager, None)  # None = use Central Registry
-        
-        # elif protocol_id == 'euler':
-        #     return protocols.check_euler_health_factor(address, contract, conn['w3'])
-        
-        else:
-            # Generic fallback - try calling the method directly
-            method = getattr(contract.functions, method_name)
-            result = method(address).call()
-            
-            # Try to extract health factor based on protocol config
-            if protocol_info['health_factor_index'] is not None:
-                if isinstance(result, (list, tuple)):
-                    health_factor = result[protocol_info['health_factor_index']] / protocol_info['health_factor_divisor']
-                else:
-                    health_factor = result / protocol_info['health_factor_divisor']
-                return health_factor
-            else:
-                logger.error(f"Protocol {protocol_id} requires custom health factor extraction")
-                return None
-                
+        return handler(address, get_connection(protocol_id))
     except Exception as e:
         logger.error(f"Error checking health factor for {address} on {protocol_id}: {e}")
         return None
@@ -431,46 +881,88 @@ check_morpho_health_factor_single_market = protocols.check_morpho_health_factor_
 # Legacy function for backward compatibility
 def check_morpho_health_factor(address, market_id):
     """Legacy function - use check_morpho_health_factor_all_markets instead"""
-    if 'morpho' not in protocol_connections:
-        return None
-    conn = protocol_connections['morpho']
+    conn = get_connection('morpho')
     # Convert address to checksum format
     try:
-        address_checksum = conn['w3'].to_checksum_address(address)
+        address_checksum = protocols.to_checksum_address(address)
     except Exception as e:
         logger.error(f"Invalid address format: {address}, error: {e}")
         return None
     return check_morpho_health_factor_single_market(address_checksum, market_id, conn['contract'], conn['w3'])
 
+# /start help text (static, so built once at import)
+START_MESSAGE = (
+    "Welcome to the Multi-Protocol Lending Health Factor Monitor Bot!\n\n"
+    "Supported Protocols:\n" + "\n".join(f"  • {info['name']} ({pid})" for pid, info in PROTOCOL_CONFIG.items()) + "\n\n"
+    "Here are the available commands:\n"
+    "/start - Show this help message\n"
+    "/add <address> - Add address with default threshold (1.5)\n"
+    "/add <address> <threshold> - Set global threshold (monitors all protocols)\n"
+    "/add <address> <threshold> <protocol> - Set protocol-specific threshold\n"
+    "/add <address> <threshold> <protocol> <market> - Set market-specific threshold\n"
+    "  Examples:\n"
+    "    /add 0x1234...\n"
+    "    /add 0x1234... 1.5\n"
+    "    /add 0x1234... 1.3 morpho\n"
+    "    /add 0x1234... 1.2 morpho 0xMarketID\n"
+    "/list - List all addresses you're monitoring\n"
+    "/check - Auto-discover and check all positions across all protocols\n"
+    "/repay - Get rebalancing suggestions (withdraw from vaults & repay loans)\n"
+    "/remove <address> - Remove an address from monitoring\n"
+    "/stop - Stop monitoring all addresses\n"
+    "/protocols - List all supported protocols\n\n"
+    "The bot automatically discovers all your positions across all protocols!\n\n"
+    "DISCLAIMER: This bot is not officially affiliated with or endorsed by any protocol. "
+    "It is an independent tool created for informational purposes only. "
+    "The bot is not guaranteed to be always accurate or available. "
+    "Users should not rely solely on this bot for making financial decisions."
+)
+
 # Function to handle the /start command
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    protocols_list = "\n".join([f"  • {info['name']} ({pid})" for pid, info in PROTOCOL_CONFIG.items()])
-    await update.message.reply_text(
-        "Welcome to the Multi-Protocol Lending Health Factor Monitor Bot!\n\n"
-        "Supported Protocols:\n" + protocols_list + "\n\n"
-        "Here are the available commands:\n"
-        "/start - Show this help message\n"
-        "/add <address> - Add address with default threshold (1.5)\n"
-        "/add <address> <threshold> - Set global threshold (monitors all protocols)\n"
-        "/add <address> <threshold> <protocol> - Set protocol-specific threshold\n"
-        "/add <address> <threshold> <protocol> <market> - Set market-specific threshold\n"
-        "  Examples:\n"
-        "    /add 0x1234...\n"
-        "    /add 0x1234... 1.5\n"
-        "    /add 0x1234... 1.3 morpho\n"
-        "    /add 0x1234... 1.2 morpho 0xMarketID\n"
-        "/list - List all addresses you're monitoring\n"
-        "/check - Auto-discover and check all positions across all protocols\n"
-        "/repay - Get rebalancing suggestions (withdraw from vaults & repay loans)\n"
-        "/remove <address> - Remove an address from monitoring\n"
-        "/stop - Stop monitoring all addresses\n"
-        "/protocols - List all supported protocols\n\n"
-        "The bot automatically discovers all your positions across all protocols!\n\n"
-        "DISCLAIMER: This bot is not officially affiliated with or endorsed by any protocol. "
-        "It is an independent tool created for informational purposes only. "
-        "The bot is not guaranteed to be always accurate or available. "
-        "Users should not rely solely on this bot for making financial decisions."
-    )
+    await update.message.reply_text(START_MESSAGE)
+
+# Telegram rejects messages over 4096 characters; long replies and alert batches are chunked below that
+MESSAGE_CHUNK_LIMIT = 4000
+PARAGRAPH_SEPARATOR = "\n\n"
+ALERT_SEPARATOR = "\n\n---\n\n"
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected mid-flight
+_background_tasks: set = set()
+
+def fire_and_forget(coro) -> asyncio.Task:
+    """Run coro in the background without awaiting it (it must handle its own errors)."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def _delete_notice(notice_task: asyncio.Task):
+    """Delete a "Checking positions..." notice once it has been sent."""
+    try:
+        checking_msg = await notice_task
+        await checking_msg.delete()
+    except Exception as e:
+        logger.debug(f"Could not delete checking message: {e}")
+
+async def with_checking_notice(update: Update, coro):
+    """
+    Await coro while a "Checking positions..." notice is shown.
+    The notice is sent concurrently (its round-trip overlaps the work) and deleted in the
+    background afterwards, so the caller's reply doesn't wait on the delete.
+    
+    Args:
+        update: Telegram update to reply to
+        coro: Coroutine building the response
+    
+    Returns:
+        The coroutine's result
+    """
+    notice_task = asyncio.create_task(update.message.reply_text("🔍 Checking positions..."))
+    try:
+        return await coro
+    finally:
+        fire_and_forget(_delete_notice(notice_task))
 
 # Function to handle /add command (adds an address to monitor)
 async def add_address(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -483,8 +975,6 @@ async def add_address(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     chat_id = str(update.effective_chat.id)
     
     # Parse arguments
-    DEFAULT_THRESHOLD = 1.5
-    
     if len(context.args) < 1:
         await update.message.reply_text(
             "Usage:\n"
@@ -498,11 +988,11 @@ async def add_address(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             "  /add 0x1234... 1.3 morpho\n"
             "  /add 0x1234... 1.2 morpho 0xMarketID\n"
             "  /add 0x1234... 1.4 curvance 0xMarketManager\n\n"
-            f"Supported protocols: {', '.join(PROTOCOL_CONFIG.keys())}"
+            f"Supported protocols: {PROTOCOL_LIST_STR}"
         )
         return
     
-    address = context.args[0].lower()
+    address = normalize_address(context.args[0])
     
     # If threshold not provided, use default
     if len(context.args) >= 2:
@@ -525,45 +1015,25 @@ async def add_address(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         market_id = None
         use_default = True
     
-    # Validate address (use any protocol's Web3 instance)
-    if not protocol_connections:
-        await update.message.reply_text("Error: No protocol connections available.")
-        return
-    
-    # Use first available protocol to validate address
-    first_protocol = list(protocol_connections.values())[0]
-    if not first_protocol['w3'].is_address(address):
+    # Validate address
+    if address is None:
         await update.message.reply_text("Invalid address format. Please try again.")
         return
     
     # Validate protocol if specified
-    if protocol_id and protocol_id not in PROTOCOL_CONFIG:
+    if protocol_id and protocol_id not in PROTOCOL_IDS:
         await update.message.reply_text(
             f"Unknown protocol: {protocol_id}\n"
-            f"Supported protocols: {', '.join(PROTOCOL_CONFIG.keys())}"
+            f"Supported protocols: {PROTOCOL_LIST_STR}"
         )
         return
     
     # Validate market ID format if provided
-    if market_id:
-        if protocol_id == 'morpho':
-            # Morpho market ID should be bytes32 (66 chars: 0x + 64 hex)
-            if not market_id.startswith('0x') or len(market_id) != 66:
-                await update.message.reply_text(
-                    f"⚠️ Invalid Morpho market ID format: {market_id}\n"
-                    "Market ID should be 66 characters (0x + 64 hex chars).\n"
-                    "Example: 0x409f2824aee2d8391d4a5924935e13312e157055e262b923b60c9dcb47e6311d"
-                )
-                return
-        elif protocol_id == 'curvance':
-            # Curvance MarketManager should be address (42 chars: 0x + 40 hex)
-            if not market_id.startswith('0x') or len(market_id) != 42:
-                await update.message.reply_text(
-                    f"⚠️ Invalid Curvance MarketManager address format: {market_id}\n"
-                    "MarketManager address should be 42 characters (0x + 40 hex chars).\n"
-                    "Example: 0xd6365555f6a697C7C295bA741100AA644cE28545"
-                )
-                return
+    if market_id and protocol_id in MARKET_ID_FORMATS:
+        pattern, error_message = MARKET_ID_FORMATS[protocol_id]
+        if not pattern.match(market_id):
+            await update.message.reply_text(error_message.format(market_id=market_id))
+            return
     
     # Initialize user data structure if needed
     if chat_id not in user_data:
@@ -605,25 +1075,21 @@ async def add_address(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         else:
             message = f"✅ Set global threshold {threshold} for {address} (applies to all protocols)"
     
-    save_user_data(user_data)
+    mark_user_data_dirty(chat_id, address)
+    await forget_cached_positions(address)
     
     # Automatically check and show positions for this address
     # If protocol was specified, only check that protocol
-    checking_msg = await update.message.reply_text("🔍 Checking positions...")
-    check_message = await build_check_message(chat_id, [address], filter_protocol=protocol_id)
-    
-    # Delete the "checking..." message
-    try:
-        await checking_msg.delete()
-    except Exception as e:
-        logger.debug(f"Could not delete checking message: {e}")
+    check_message = await with_checking_notice(
+        update, build_check_message(chat_id, [address], filter_protocol=protocol_id)
+    )
     
     # Combine confirmation and check results in one message
     combined_message = message
     if check_message:
         combined_message += "\n\n" + check_message
     else:
-        protocol_text = f" for {PROTOCOL_CONFIG[protocol_id]['name']} protocol" if protocol_id else ""
+        protocol_text = f" for {PROTOCOL_NAMES[protocol_id]} protocol" if protocol_id else ""
         combined_message += f"\n\nNo active positions found for {address}{protocol_text}."
     
     await update.message.reply_text(combined_message, parse_mode='Markdown', disable_web_page_preview=True)
@@ -639,35 +1105,43 @@ async def list_addresses(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
 
     addresses = user_data[chat_id]['addresses']
-    message = f"📋 You are monitoring {len(addresses)} address(es):\n\n"
+    # Collect lines and join once (repeated str += is quadratic in message size)
+    lines = [f"📋 You are monitoring {len(addresses)} address(es):\n"]
     
     for idx, (address, address_data) in enumerate(addresses.items(), 1):
-        default_threshold = address_data.get('default_threshold', 1.5)
+        default_threshold = address_data.get('default_threshold', DEFAULT_THRESHOLD)
         protocols_data = address_data.get('protocols', {})
         
-        message += f"{idx}. {address}\n"
-        message += f"   Global threshold: {default_threshold}\n"
+        lines.append(f"{idx}. {address}")
+        lines.append(f"   Global threshold: {default_threshold}")
         
         if protocols_data:
-            message += f"   Protocol-specific thresholds:\n"
+            lines.append("   Protocol-specific thresholds:")
             for protocol_id, protocol_data in protocols_data.items():
-                protocol_info = PROTOCOL_CONFIG.get(protocol_id, {})
-                protocol_name = protocol_info.get('name', protocol_id)
+                protocol_name = PROTOCOL_NAMES.get(protocol_id, protocol_id)
                 
                 if 'threshold' in protocol_data:
-                    message += f"     • {protocol_name}: {protocol_data['threshold']}\n"
+                    lines.append(f"     • {protocol_name}: {protocol_data['threshold']}")
                 
                 if 'markets' in protocol_data:
                     for market_id, market_data in protocol_data['markets'].items():
                         market_threshold = market_data.get('threshold', default_threshold)
                         if protocol_id == 'morpho':
-                            message += f"       - Market {market_id[:20]}...: {market_threshold}\n"
+                            lines.append(f"       - Market {market_id[:20]}...: {market_threshold}")
                         elif protocol_id == 'curvance':
-                            message += f"       - MarketManager {market_id[:20]}...: {market_threshold}\n"
+                            lines.append(f"       - MarketManager {market_id[:20]}...: {market_threshold}")
         
-        message += "\n"
+        lines.append("")
     
-    await update.message.reply_text(message)
+    await update.message.reply_text("\n".join(lines) + "\n")
+
+REMOVE_USAGE = (
+    "Usage: /remove <address> [protocol] [market]\n"
+    "Examples:\n"
+    "  /remove 0x1234... - Remove entire address\n"
+    "  /remove 0x1234... morpho - Remove Morpho protocol threshold\n"
+    "  /remove 0x1234... morpho 0xMarketID - Remove specific market threshold"
+)
 
 # Function to handle /remove command
 async def remove_address(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -676,13 +1150,7 @@ async def remove_address(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     Supports: /remove <address> [protocol] [market]
     """
     if len(context.args) < 1:
-        await update.message.reply_text(
-            "Usage: /remove <address> [protocol] [market]\n"
-            "Examples:\n"
-            "  /remove 0x1234... - Remove entire address\n"
-            "  /remove 0x1234... morpho - Remove Morpho protocol threshold\n"
-            "  /remove 0x1234... morpho 0xMarketID - Remove specific market threshold"
-        )
+        await update.message.reply_text(REMOVE_USAGE)
         return
 
     chat_id = str(update.effective_chat.id)
@@ -708,9 +1176,9 @@ async def remove_address(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 # Clean up empty markets dict
                 if not address_data['protocols'][protocol_id]['markets']:
                     del address_data['protocols'][protocol_id]['markets']
-                save_user_data(user_data)
+                mark_user_data_dirty(chat_id, address)
                 await update.message.reply_text(
-                    f"✅ Removed market-specific threshold for {address} on {PROTOCOL_CONFIG.get(protocol_id, {}).get('name', protocol_id)} market {market_id[:20]}..."
+                    f"✅ Removed market-specific threshold for {address} on {PROTOCOL_NAMES.get(protocol_id, protocol_id)} market {market_id[:20]}..."
                 )
                 return
         await update.message.reply_text("Market threshold not found.")
@@ -722,9 +1190,9 @@ async def remove_address(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             # Clean up empty protocols dict
             if not address_data['protocols']:
                 del address_data['protocols']
-            save_user_data(user_data)
+            mark_user_data_dirty(chat_id, address)
             await update.message.reply_text(
-                f"✅ Removed protocol-specific threshold for {address} on {PROTOCOL_CONFIG.get(protocol_id, {}).get('name', protocol_id)}"
+                f"✅ Removed protocol-specific threshold for {address} on {PROTOCOL_NAMES.get(protocol_id, protocol_id)}"
             )
             return
         await update.message.reply_text("Protocol threshold not found.")
@@ -737,46 +1205,133 @@ async def remove_address(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         if not user_data[chat_id]['addresses']:
             del user_data[chat_id]
         
-        save_user_data(user_data)
+        mark_user_data_dirty(chat_id, address)
+        forget_cached_results(address)
         await update.message.reply_text(f"✅ Removed {address} from monitoring.")
 
+@dataclass(slots=True, frozen=True)
+class Position:
+    """A discovered position together with the alert threshold that applies to it."""
+    protocol_id: str
+    market_id: Optional[str]
+    health_factor: float
+    threshold: float
+    market_info: Optional[dict]
+    position_data: PositionData  # Full PositionData for new code
+
+# Sort key for Position records (worst health first)
+BY_HEALTH_FACTOR = attrgetter('health_factor')
+
+# Fetch one protocol's positions for an address (cached + single-flight per protocol)
+async def _fetch_protocol_positions(protocol_id: str, address: str, periodic: bool = False) -> List[PositionData]:
+    """
+    Fetch positions for one protocol, running its synchronous strategy in a worker thread
+    (bounded by the protocol's FETCH_SEMAPHORES entry, rpc_semaphore by default).
+    
+    Args:
+        protocol_id: Protocol identifier (registered in protocol_manager)
+        address: Wallet address to check
+        periodic: Called from the periodic sweep or alert path, which skips dormant pairs
+            and never serves disk-cached (possibly stale) positions
+    
+    Returns:
+        List of PositionData objects from that protocol
+    """
+    if (protocol_id, address) in _empty_positions:
+        logger.debug(f"Skipping {protocol_id} for {address}: no positions found recently")
+        return []
+    if periodic and (protocol_id, address) in _dormant_positions:
+        logger.debug(f"Skipping {protocol_id} for {address}: dormant (no debt), re-read within {DORMANT_RECHECK_INTERVAL}s")
+        return []
+    
+    strategy = protocol_manager.get_strategy(protocol_id)
+    fetch_func = strategy.get_positions
+    semaphore = FETCH_SEMAPHORES.get(protocol_id)
+    if semaphore is not None:
+        async def fetch_func(address):
+            async with semaphore:
+                return await asyncio.to_thread(strategy.get_positions, address)
+    # Strategies raise ProtocolQueryError when a read fails, so an empty list here is a
+    # confirmed "no positions" and safe to negative-cache
+    positions = await get_cached_or_fetch(('positions', protocol_id, address), fetch_func, address, allow_stale=not periodic)
+    if not positions:
+        _empty_positions[(protocol_id, address)] = True
+        if (protocol_id, address) not in _dormant_positions:
+            _dormant_positions[(protocol_id, address)] = True
+    else:
+        _dormant_positions.pop((protocol_id, address), None)
+    return positions
+
+async def forget_cached_positions(address: str):
+    """
+    Drop every cached position result for an address (memory, negative and disk caches),
+    so the next discovery reads the protocols again and newly opened positions show up.
+    """
+    cache_keys = [('positions', protocol_id, address) for protocol_id in protocol_manager.protocol_ids]
+    for cache_key in cache_keys:
+        _cache.pop(cache_key, None)
+        _empty_positions.pop(cache_key[1:], None)
+        _dormant_positions.pop(cache_key[1:], None)
+    await asyncio.to_thread(disk_cache_delete, [disk_cache_key(cache_key) for cache_key in cache_keys])
+
+def forget_cached_results(address: str):
+    """Drop cached positions and health factors for an address once a chat stops monitoring it."""
+    address = address.lower()
+    for protocol_id in protocol_manager.protocol_ids:
+        _cache.pop(('positions', protocol_id, address), None)
+        _empty_positions.pop((protocol_id, address), None)
+        _dormant_positions.pop((protocol_id, address), None)
+    with _health_factor_lock:
+        for protocol_id in PROTOCOL_IDS:
+            _health_factor_cache.pop((protocol_id, address), None)
+    protocols.forget_morpho_user_markets(address)
+
 # Function to auto-discover all positions for an address across all protocols
 # NEW: Uses Strategy Pattern for clean, scalable architecture
-async def discover_all_positions(address: str, chat_id: str, filter_protocol: Optional[str] = None) -> List[Dict]:
+async def discover_all_positions(address: str, chat_id: str, filter_protocol: Optional[str] = None,
+                                 periodic: bool = False) -> List[Position]:
     """
     Auto-discover all active positions for an address across all protocols.
     Uses Strategy Pattern - no more if/else spaghetti!
-    Now with parallel protocol checking for better performance.
+    All protocols are fetched concurrently with a single gather; failures are logged per protocol.
     
     Args:
         address: Wallet address to check
         chat_id: Chat ID for user data lookup
         filter_protocol: Optional protocol ID to filter results (e.g., 'euler', 'morpho')
+        periodic: Called from the periodic sweep or alert path (dormant protocols are skipped,
+            disk-cached positions are never served)
     
     Returns:
-        List of position dicts with: protocol_id, market_id, health_factor, threshold, etc.
+        List of Position records with: protocol_id, market_id, health_factor, threshold, etc.
     """
-    positions = []
-    address_data = user_data[chat_id].get('addresses', {}).get(address, {})
+    if filter_protocol:
+        if filter_protocol not in protocol_manager.protocol_ids:
+            logger.warning(f"Unknown protocol filter: {filter_protocol}")
+            return []
+        protocol_ids = [filter_protocol]
+    else:
+        protocol_ids = protocol_manager.protocol_ids
     
-    # Use ProtocolManager to get all positions in parallel (clean, no if/else!)
-    try:
-        # Run protocol checks in parallel using asyncio.to_thread
-        position_data_list = await protocol_manager.get_all_positions_async(address, filter_protocol)
+    # Fetch all protocols concurrently (cached for CACHE_TTL, concurrent callers share one fetch)
+    results = await asyncio.gather(
+        *[_fetch_protocol_positions(protocol_id, address, periodic) for protocol_id in protocol_ids],
+        return_exceptions=True
+    )
+    
+    positions = []
+    for protocol_id, result in zip(protocol_ids, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error discovering {protocol_id} positions for {address}: {result}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("".join(traceback.format_exception(result)))
+            continue
         
-        for pos_data in position_data_list:
+        for pos_data in result:
             # Skip invalid positions
             if not is_valid_position(pos_data.health_factor, pos_data.debt.usd_value):
                 continue
             
-            # Map protocol_name to protocol_id
-            protocol_name_to_id = {
-                'Neverland': 'neverland',
-                'Morpho': 'morpho',
-                'Curvance': 'curvance',
-                'Euler': 'euler'
-            }
-            protocol_id = protocol_name_to_id.get(pos_data.protocol_name, pos_data.protocol_name.lower())
             market_id = pos_data.market_id.lower() if pos_data.market_id else None
             
             # Get threshold for this position
@@ -808,19 +1363,37 @@ async def discover_all_positions(address: str, chat_id: str, filter_protocol: Op
                 'lltv': None  # Will be fetched if needed
             }
             
-            positions.append({
-                'protocol_id': protocol_id,
-                'market_id': market_id,
-                'health_factor': pos_data.health_factor,
-                'threshold': threshold,
-                'market_info': market_info,
-                'position_data': pos_data  # Keep full PositionData for new code
-            })
-    except Exception as e:
-        logger.error(f"Error discovering positions for {address}: {e}", exc_info=True)
+            positions.append(Position(
+                protocol_id=protocol_id,
+                market_id=market_id,
+                health_factor=pos_data.health_factor,
+                threshold=threshold,
+                market_info=market_info,
+                position_data=pos_data
+            ))
     
     return positions
 
+async def discover_positions_for_addresses(addresses: Sequence[str], chat_id: str, filter_protocol: Optional[str] = None,
+                                           periodic: bool = False) -> List:
+    """
+    Discover positions for several addresses concurrently (bounded by ADDRESS_DISCOVERY_LIMIT).
+    
+    Args:
+        addresses: Wallet addresses to check
+        chat_id: Chat ID for user data lookup
+        filter_protocol: Optional protocol ID to filter results
+        periodic: Called from the periodic sweep or alert path (see discover_all_positions)
+    
+    Returns:
+        List aligned with addresses; each entry is that address's positions or the exception raised
+    """
+    async def discover_bounded(address):
+        async with address_discovery_semaphore:
+            return await discover_all_positions(address, chat_id, filter_protocol=filter_protocol, periodic=periodic)
+    
+    return await asyncio.gather(*[discover_bounded(address) for address in addresses], return_exceptions=True)
+
 # OLD CODE BELOW - KEPT FOR REFERENCE BUT NOT USED
 # This can be removed once we verify the Strategy Pattern works correctly
 async def discover_all_positions_OLD(address: str, chat_id: str, filter_protocol: Optional[str] = None) -> List[Dict]:
@@ -833,8 +1406,8 @@ async def discover_all_positions_OLD(address: str, chat_id: str, filter_protocol
     # Check Neverland
     if filter_protocol is None or filter_protocol == 'neverland':
         try:
-            cache_key = f"neverland_{address}"
-            health_factor = get_cached_or_fetch(
+            cache_key = ('neverland', address)
+            health_factor = await get_cached_or_fetch(
                 cache_key,
                 check_health_factor,
                 address,
@@ -847,9 +1420,9 @@ async def discover_all_positions_OLD(address: str, chat_id: str, filter_protocol
                 neverland_info = None
                 try:
                     protocol_info = PROTOCOL_CONFIG['neverland']
-                    conn = protocol_connections['neverland']
-                    cache_key_data = f"neverland_data_{address}"
-                    account_data = get_cached_or_fetch(
+                    conn = get_connection('neverland')
+                    cache_key_data = ('neverland_data', address)
+                    account_data = await get_cached_or_fetch(
                         cache_key_data,
                         protocols.get_neverland_account_data,
                         address,
@@ -878,8 +1451,8 @@ async def discover_all_positions_OLD(address: str, chat_id: str, filter_protocol
     if filter_protocol is None or filter_protocol == 'morpho':
         try:
             protocol_info = PROTOCOL_CONFIG['morpho']
-            cache_key = f"morpho_markets_{address}"
-            markets_data = get_cached_or_fetch(
+            cache_key = ('morpho_markets', address)
+            markets_data = await get_cached_or_fetch(
                 cache_key,
                 protocols.get_morpho_user_markets,
                 address,
@@ -908,11 +1481,11 @@ async def discover_all_positions_OLD(address: str, chat_id: str, filter_protocol
     if filter_protocol is None or filter_protocol == 'curvance':
         try:
             protocol_info = PROTOCOL_CONFIG['curvance']
-            conn = protocol_connections['curvance']
+            conn = get_connection('curvance')
             
             # Get all MarketManagers from Central Registry
-            cache_key = f"curvance_managers"
-            market_managers = get_cached_or_fetch(
+            cache_key = ('curvance_managers',)
+            market_managers = await get_cached_or_fetch(
                 cache_key,
                 protocols.get_curvance_market_managers,
                 conn['w3']
@@ -921,8 +1494,8 @@ async def discover_all_positions_OLD(address: str, chat_id: str, filter_protocol
             # Check each MarketManager for positions
             for market_manager in market_managers:
                 try:
-                    cache_key_market = f"curvance_{address}_{market_manager}"
-                    health_factor = get_cached_or_fetch(
+                    cache_key_market = ('curvance', address, market_manager)
+                    health_factor = await get_cached_or_fetch(
                         cache_key_market,
                         protocols.check_curvance_health_factor,
                         address,
@@ -936,8 +1509,8 @@ async def discover_all_positions_OLD(address: str, chat_id: str, filter_protocol
                         threshold = get_threshold_for_position(chat_id, address, 'curvance', market_manager)
                         # Get position details (token symbols and amounts)
                         try:
-                            cache_key_details = f"curvance_details_{address}_{market_manager}"
-                            position_details_list = get_cached_or_fetch(
+                            cache_key_details = ('curvance_details', address, market_manager)
+                            position_details_list = await get_cached_or_fetch(
                                 cache_key_details,
                                 protocols.get_curvance_position_details,
                                 address,
@@ -969,13 +1542,13 @@ async def discover_all_positions_OLD(address: str, chat_id: str, filter_protocol
     # if filter_protocol is None or filter_protocol == 'euler':
     #     try:
     #         protocol_info = PROTOCOL_CONFIG['euler']
-    #         conn = protocol_connections['euler']
+    #         conn = get_connection('euler')
     #         
     #         logger.info(f"Checking Euler for {address}...")
     #         
     #         # Get all vaults where user has positions using AccountLens
-    #         cache_key = f"euler_vaults_{address}"
-    #         vaults_data = get_cached_or_fetch(
+    #         cache_key = ('euler_vaults', address)
+    #         vaults_data = await get_cached_or_fetch(
     #             cache_key,
     #             protocols.get_euler_user_vaults,
     #             address,
@@ -1016,8 +1589,249 @@ async def discover_all_positions_OLD(address: str, chat_id: str, filter_protocol
     
     return positions
 
+# Message formatting helpers (shared by the /check and /position builders)
+def format_amount(val: float) -> str:
+    """Format a token amount with K/M suffixes (e.g., 1.02 or 50.0K)."""
+    if val >= 1_000_000:
+        return f"{val/1_000_000:.2f}M"
+    if val >= 1_000:
+        return f"{val/1_000:.1f}K"
+    if val >= 1:
+        return f"{val:.2f}"
+    return f"{val:.4f}"
+
+def format_usd(val: float) -> str:
+    """Format a USD value with K/M suffixes."""
+    if val >= 1_000_000:
+        return f"${val/1_000_000:.2f}M"
+    if val >= 1_000:
+        return f"${val/1_000:.2f}K"
+    return f"${val:.2f}"
+
+@lru_cache(maxsize=1024)
+def format_currency(value: float) -> str:
+    """Format a USD value with K/M suffixes ("$0.00" for zero)."""
+    if value == 0:
+        return "$0.00"
+    return format_usd(value)
+
+@lru_cache(maxsize=256)
+def format_threshold(threshold: float) -> str:
+    """Format an alert threshold without trailing zeros, e.g. 1.500 -> "1.5" (users share a few values)."""
+    return f"{threshold:.3f}".rstrip('0').rstrip('.')
+
+def format_sig_fig(value: float) -> str:
+    """Format a value to 3 significant figures with K/M suffixes."""
+    if value == 0:
+        return "0"
+    if value >= 1:
+        # For values >= 1, round to 3 sig fig
+        magnitude = math.floor(math.log10(value))
+        factor = 10 ** (2 - magnitude)
+        rounded = round(value * factor) / factor
+        if rounded >= 1_000_000:
+            return f"{rounded/1_000_000:.3g}M"
+        elif rounded >= 1_000:
+            return f"{rounded/1_000:.3g}K"
+        else:
+            return f"{rounded:.3g}"
+    # For values < 1, show 3 sig fig
+    return f"{value:.3g}"
+
 # Helper function to build quick check message (health factors only - fast)
-async def build_check_message(chat_id: str, addresses: List[str], filter_protocol: Optional[str] = None) -> Optional[str]:
+def format_position_label(protocol_id: str, market_info: Optional[dict], market_id: Optional[str], protocol_name: str, app_url: str) -> str:
+    """
+    Markdown label for a position line, linking to the market/protocol page where possible.
+    
+    Args:
+        protocol_id: Protocol identifier
+        market_info: Position's market info dict (may be None)
+        market_id: Market ID (for Curvance, the MarketManager address)
+        protocol_name: Protocol display name
+        app_url: Protocol app URL ('' if none)
+    
+    Returns:
+        Label string, e.g. "[WETH-USDC](https://...)" or "Neverland"
+    """
+    if protocol_id == 'morpho' and market_info:
+        market_name = market_info.get('name', 'Unknown').upper()
+        market_id_for_url = market_info.get('id') or market_id or 'unknown'
+        return f"[{market_name}]({protocols.morpho_market_url(app_url, market_id_for_url, market_info.get('name', 'unknown'))})"
+    if protocol_id == 'curvance' and market_id:
+        # market_id is the MarketManager address (positions are grouped by MarketManager);
+        # market name from market_info includes collateral token symbols
+        market_name = market_info.get('name', 'Curvance Market') if market_info else 'Curvance Market'
+        return f"[{market_name}]({app_url}/market/{market_id})"
+    # Neverland and other protocols
+    if app_url:
+        return f"[{protocol_name}]({app_url})"
+    return protocol_name
+
+def format_health_line(status: str, label: str, health_factor: float, threshold_str: str,
+                       liquidation_drop_pct: Optional[float] = None, extra: str = "",
+                       health_label: str = "Current Health") -> str:
+    """
+    Format one position's health line.
+    
+    Args:
+        status: Warning prefix ("⚠️ " or "")
+        label: Position label (see format_position_label)
+        health_factor: Current health factor
+        threshold_str: Formatted alert threshold
+        liquidation_drop_pct: Distance to liquidation in percent (omitted if None)
+        extra: Text appended after the threshold (e.g. collateral/debt details)
+        health_label: Health factor caption
+    
+    Returns:
+        Formatted line ending with a newline
+    """
+    liquidation_str = f" ({liquidation_drop_pct:.1f}% from liquidation)" if liquidation_drop_pct is not None else ""
+    return f"{status}{label}:\n{health_label}: {health_factor:.3f}{liquidation_str}, Alert at {threshold_str}{extra}\n"
+
+def format_morpho_details(market_info: dict, collateral_usd: float, debt_usd: float) -> str:
+    """
+    Format Morpho collateral/debt quantities (with USD in brackets) and liquidation price.
+    
+    Args:
+        market_info: Morpho market info from discovery
+        collateral_usd: Collateral value in USD
+        debt_usd: Debt value in USD
+    
+    Returns:
+        Detail text starting with a newline
+    """
+    collateral_symbol = market_info.get('collateralAsset', '?')
+    loan_symbol = market_info.get('loanAsset', '?')
+    collateral_human = market_info.get('supplyAmountHuman', 0)
+    borrow_human = market_info.get('borrowAmountHuman', 0)
+    
+    col_str = f"{format_amount(collateral_human)} {collateral_symbol} ({format_usd(collateral_usd)})"
+    deb_str = f"{format_amount(borrow_human)} {loan_symbol} ({format_usd(debt_usd)})"
+    
+    # Liquidation Info - check both camelCase and snake_case keys
+    liq_price = market_info.get('liquidationPrice') or market_info.get('liquidation_price')
+    drop_pct = market_info.get('liquidationDropPct') or market_info.get('liquidation_drop_pct')
+    
+    liq_str = ""
+    if liq_price and float(liq_price) > 0:
+        liq_price = float(liq_price)
+        drop_pct = float(drop_pct) if drop_pct else 0
+        # Smart formatting for price (handle small vs large prices)
+        price_fmt = f"${liq_price:,.2f}" if liq_price > 1 else f"${liq_price:.4f}"
+        liq_str = f"\nLiquidation price: {price_fmt} ({drop_pct:.1f}% drop to liquidation)"
+    
+    return f"\nCollateral: {col_str} | Debt: {deb_str}{liq_str}"
+
+# Per-protocol position formatters used by /check (detail=False) and /position (detail=True).
+# All share one signature; protocols without an entry use format_default_position.
+def format_default_position(pos: Position, label: str, status: str, threshold_str: str,
+                            liquidation_drop_pct: float, detail: bool) -> str:
+    """Format a position with no protocol-specific details."""
+    return format_health_line(status, label, pos.health_factor, threshold_str, liquidation_drop_pct)
+
+def format_neverland_position(pos: Position, label: str, status: str, threshold_str: str,
+                              liquidation_drop_pct: float, detail: bool) -> str:
+    """Format a Neverland position (USD collateral/debt in detail mode)."""
+    extra = ""
+    if detail and pos.market_info:
+        collateral_usd = pos.market_info.get('collateral_usd', 0)
+        debt_usd = pos.market_info.get('debt_usd', 0)
+        extra = f"\nCollateral: {format_currency(collateral_usd)} | Debt: {format_currency(debt_usd)}"
+    return format_health_line(status, label, pos.health_factor, threshold_str, liquidation_drop_pct, extra)
+
+def format_morpho_position(pos: Position, label: str, status: str, threshold_str: str,
+                           liquidation_drop_pct: float, detail: bool) -> str:
+    """Format a Morpho position with asset quantities and liquidation price."""
+    market_info = pos.market_info
+    if not market_info:
+        return format_default_position(pos, label, status, threshold_str, liquidation_drop_pct, detail)
+    
+    health_factor = pos.health_factor
+    collateral_usd = market_info.get('supplyAssetsUsd', 0)
+    debt_usd = market_info.get('borrowAssetsUsd', 0)
+    if not detail:
+        return format_health_line(status, label, health_factor, threshold_str, liquidation_drop_pct,
+                                  format_morpho_details(market_info, collateral_usd, debt_usd))
+    
+    # Morpho: Health Factor = (Collateral Value × LLTV) / Total Borrowed Amount
+    # So: Collateral Value = (Health Factor × Total Borrowed Amount) / LLTV
+    lltv = market_info.get('lltv')  # Liquidation LTV (e.g., 0.86 for 86%) - fetched from contract
+    if lltv is None and market_info.get('id'):
+        # Prefetched into the process-wide LLTV cache by build_position_message
+        lltv = protocols.get_cached_morpho_market_lltv(market_info['id'])
+        if lltv:
+            market_info['lltv'] = lltv  # Cache it in market_info
+    
+    # Calculate collateral from health factor and LLTV if supplyAssetsUsd is 0
+    if collateral_usd == 0 and debt_usd > 0 and health_factor and lltv:
+        try:
+            lltv_float = float(lltv)
+            if lltv_float > 0:
+                # Formula: Collateral = (HF × Debt) / LLTV
+                collateral_usd = (float(debt_usd) * float(health_factor)) / lltv_float
+                logger.debug(f"Calculated Morpho collateral: (${debt_usd} × {health_factor}) / {lltv_float} = ${collateral_usd:.2f}")
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Error calculating collateral from LLTV: {e}")
+    
+    # Fallback if LLTV not available
+    if collateral_usd == 0 and debt_usd > 0 and health_factor:
+        try:
+            # Use estimated LLTV of 0.80 (80%) as fallback
+            estimated_lltv = 0.80
+            collateral_usd = (float(debt_usd) * float(health_factor)) / estimated_lltv
+            logger.debug(f"Estimated Morpho collateral with default LLTV: (${debt_usd} × {health_factor}) / {estimated_lltv} = ${collateral_usd:.2f}")
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Could not estimate Morpho collateral: {e}")
+            collateral_usd = 0
+    
+    # Morpho shows liquidation price/drop in the collateral line instead
+    return format_health_line(status, label, health_factor, threshold_str, None,
+                              format_morpho_details(market_info, collateral_usd, debt_usd))
+
+def format_curvance_position(pos: Position, label: str, status: str, threshold_str: str,
+                             liquidation_drop_pct: float, detail: bool) -> str:
+    """Format a Curvance position (token amounts in detail mode)."""
+    market_info = pos.market_info
+    extra = ""
+    if detail and market_info:
+        # Curvance: use raw amounts with token symbols, formatted with 3 sig fig
+        collateral_amount = market_info.get('collateral_amount', 0)
+        debt_amount = market_info.get('debt_amount', 0)
+        collateral_str = format_sig_fig(collateral_amount) if collateral_amount else "0"
+        debt_str = format_sig_fig(debt_amount) if debt_amount else "0"
+        extra = f"\nCollateral: {collateral_str} {market_info.get('collateral_token', '?')} | Debt: {debt_str} {market_info.get('debt_token', '?')}"
+    # Curvance getPositionHealth is aggregate health for the MarketManager
+    health_label = "Aggregated Health" if pos.market_id else "Current Health"
+    return format_health_line(status, label, pos.health_factor, threshold_str, liquidation_drop_pct, extra, health_label)
+
+POSITION_FORMATTERS = {
+    'neverland': format_neverland_position,
+    'morpho': format_morpho_position,
+    'curvance': format_curvance_position,
+}
+
+def format_position(pos: Position, protocol_name: str, app_url: str, detail: bool = False) -> str:
+    """
+    Format one position's line, dispatching to its protocol's formatter.
+    
+    Args:
+        pos: Discovered position
+        protocol_name: Protocol display name
+        app_url: Protocol app URL ('' if none)
+        detail: Include collateral/debt details (/position) instead of the summary (/check)
+    
+    Returns:
+        Formatted line ending with a newline
+    """
+    health_factor = pos.health_factor
+    status = "⚠️ " if health_factor < pos.threshold else ""
+    liquidation_drop_pct = (1 - (1 / health_factor)) * 100 if health_factor > 0 else 0
+    threshold_str = format_threshold(pos.threshold)
+    label = format_position_label(pos.protocol_id, pos.market_info, pos.market_id, protocol_name, app_url)
+    formatter = POSITION_FORMATTERS.get(pos.protocol_id, format_default_position)
+    return formatter(pos, label, status, threshold_str, liquidation_drop_pct, detail)
+
+async def build_check_message(chat_id: str, addresses: Sequence[str], filter_protocol: Optional[str] = None) -> Optional[str]:
     """
     Build a formatted message showing all positions for given addresses.
     
@@ -1034,128 +1848,46 @@ async def build_check_message(chat_id: str, addresses: List[str], filter_protoco
     
     messages = []
     
+    # Auto-discover all positions for every address concurrently (only check specified protocol if filter provided)
+    discovered = await discover_positions_for_addresses(addresses, chat_id, filter_protocol)
+    
     # Process each address
-    for address in addresses:
+    for address, positions in zip(addresses, discovered):
         try:
-            # Auto-discover all positions (only check specified protocol if filter provided)
-            positions = await discover_all_positions(address, chat_id, filter_protocol=filter_protocol)
+            if isinstance(positions, Exception):
+                raise positions
             
             if not positions:
-                protocol_text = f" for {PROTOCOL_CONFIG[filter_protocol]['name']} protocol" if filter_protocol else ""
+                protocol_text = f" for {PROTOCOL_NAMES[filter_protocol]} protocol" if filter_protocol else ""
                 messages.append(f"For {address}:\n\nNo active positions found{protocol_text}.")
                 continue
             
-            # Group positions by protocol
-            protocol_groups = {}
+            # Group positions by protocol (discovery already applied filter_protocol)
+            protocol_groups = defaultdict(list)
             for pos in positions:
-                protocol_id = pos['protocol_id']
-                # Filter by protocol if specified
-                if filter_protocol and protocol_id != filter_protocol:
-                    continue
-                if protocol_id not in protocol_groups:
-                    protocol_groups[protocol_id] = []
-                protocol_groups[protocol_id].append(pos)
-            
-            # Skip if no positions after filtering
-            if not protocol_groups:
-                continue
+                protocol_groups[pos.protocol_id].append(pos)
             
             # Build message
-            address_message = f"For {address}:\n"
+            address_parts = [f"For {address}:\n"]
             
             for protocol_id, protocol_positions in protocol_groups.items():
                 protocol_info = PROTOCOL_CONFIG[protocol_id]
-                address_message += f"\n{protocol_info['name']} protocol:\n"
+                protocol_name = protocol_info['name']
+                app_url = protocol_info.get('app_url', '')
+                address_parts.append(f"\n{protocol_name} protocol:\n")
                 
                 # Sort by health factor (worst first)
-                protocol_positions.sort(key=lambda x: x['health_factor'])
+                protocol_positions.sort(key=BY_HEALTH_FACTOR)
                 
                 for pos in protocol_positions:
-                    health_factor = pos['health_factor']
-                    threshold = pos['threshold']
-                    market_id = pos['market_id']
-                    market_info = pos.get('market_info')
-                    
-                    status = "⚠️ " if health_factor < threshold else ""
-                    liquidation_drop_pct = (1 - (1 / health_factor)) * 100 if health_factor > 0 else 0
-                    threshold_str = f"{threshold:.3f}".rstrip('0').rstrip('.')
-                    
-                    # Extract collateral and debt values for Morpho
-                    tvl_debt_str = ""
-                    if protocol_id == 'morpho' and market_info:
-                        collateral_usd = market_info.get('supplyAssetsUsd', 0)
-                        debt_usd = market_info.get('borrowAssetsUsd', 0)
-                        collateral_symbol = market_info.get('collateralAsset', '?')
-                        loan_symbol = market_info.get('loanAsset', '?')
-                        collateral_human = market_info.get('supplyAmountHuman', 0)
-                        borrow_human = market_info.get('borrowAmountHuman', 0)
-                        
-                        # Format Amounts (e.g., 1.02 or 50k)
-                        def format_amount(val):
-                            if val >= 1_000_000:
-                                return f"{val/1_000_000:.2f}M"
-                            if val >= 1_000:
-                                return f"{val/1_000:.1f}K"
-                            if val >= 1:
-                                return f"{val:.2f}"
-                            return f"{val:.4f}"
-                        
-                        def format_usd(val):
-                            if val >= 1_000_000:
-                                return f"${val/1_000_000:.2f}M"
-                            if val >= 1_000:
-                                return f"${val/1_000:.2f}K"
-                            return f"${val:.2f}"
-                        
-                        col_str = f"{format_amount(collateral_human)} {collateral_symbol} ({format_usd(collateral_usd)})"
-                        deb_str = f"{format_amount(borrow_human)} {loan_symbol} ({format_usd(debt_usd)})"
-                        
-                        # Liquidation Info - check both camelCase and snake_case keys
-                        liq_price = market_info.get('liquidationPrice') or market_info.get('liquidation_price')
-                        drop_pct = market_info.get('liquidationDropPct') or market_info.get('liquidation_drop_pct')
-                        
-                        liq_str = ""
-                        if liq_price and float(liq_price) > 0:
-                            liq_price = float(liq_price)
-                            drop_pct = float(drop_pct) if drop_pct else 0
-                            # Smart formatting for price (handle small vs large prices)
-                            price_fmt = f"${liq_price:,.2f}" if liq_price > 1 else f"${liq_price:.4f}"
-                            liq_str = f"\nLiquidation price: {price_fmt} ({drop_pct:.1f}% drop to liquidation)"
-                        
-                        tvl_debt_str = f"\nCollateral: {col_str} | Debt: {deb_str}{liq_str}"
-                    
-                    # Format message - reordered: Current Health first, then threshold
-                    if protocol_id == 'morpho' and market_info:
-                        market_name = market_info.get('name', 'Unknown').upper()
-                        market_id_for_url = market_info.get('id') or market_id or 'unknown'
-                        market_url = f"https://app.morpho.org/monad/market/{market_id_for_url}/{market_info.get('name', 'unknown')}?subTab=yourPosition"
-                        address_message += f"{status}[{market_name}]({market_url}):\nCurrent Health: {health_factor:.3f} ({liquidation_drop_pct:.1f}% from liquidation), Alert at {threshold_str}{tvl_debt_str}\n"
-                    elif protocol_id == 'curvance' and market_id:
-                        # market_id is now the MarketManager address (grouped by MarketManager)
-                        market_manager_address = market_id
-                        market_url = f"{protocol_info.get('app_url', '')}/market/{market_manager_address}"
-                        # Get market name from market_info (includes collateral token symbols)
-                        market_name = market_info.get('name', 'Curvance Market') if market_info else 'Curvance Market'
-                        address_message += f"{status}[{market_name}]({market_url}):\nAggregated Health: {health_factor:.3f} ({liquidation_drop_pct:.1f}% from liquidation), Alert at {threshold_str}\n"
-                    # elif protocol_id == 'euler' and market_id:
-                    #     # Euler vault URL format: /positions/{account}/{vault}?network=monad
-                    #     # Use the monitored address (not vault address) for the URL
-                    #     vault_url = f"{protocol_info.get('app_url', '')}/positions/{address}/{market_id}?network=monad"
-                    #     address_message += f"{status}[Euler Vault]({vault_url}):\nCurrent Health: {health_factor:.3f} ({liquidation_drop_pct:.1f}% from liquidation), Alert at {threshold_str}\n"
-                    else:
-                        # Neverland and other protocols
-                        protocol_url = protocol_info.get('app_url', '')
-                        if protocol_url:
-                            address_message += f"{status}[{protocol_info['name']}]({protocol_url}):\nCurrent Health: {health_factor:.3f} ({liquidation_drop_pct:.1f}% from liquidation), Alert at {threshold_str}\n"
-                        else:
-                            address_message += f"{status}{protocol_info['name']}:\nCurrent Health: {health_factor:.3f} ({liquidation_drop_pct:.1f}% from liquidation), Alert at {threshold_str}\n"
+                    address_parts.append(format_position(pos, protocol_name, app_url))
             
-            messages.append(address_message)
+            messages.append("".join(address_parts))
             
         except Exception as e:
             logger.error(f"Error processing address {address}: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(traceback.format_exc())
             messages.append(f"For {address}:\n\n⚠️ Error checking positions: {str(e)[:100]}")
     
     if not messages:
@@ -1164,7 +1896,7 @@ async def build_check_message(chat_id: str, addresses: List[str], filter_protoco
     return "\n\n".join(messages)
 
 # Helper function to build full position message with collateral/debt details
-async def build_position_message(chat_id: str, addresses: List[str], filter_protocol: Optional[str] = None) -> Optional[str]:
+async def build_position_message(chat_id: str, addresses: Sequence[str], filter_protocol: Optional[str] = None) -> Optional[str]:
     """
     Build a detailed message showing all positions with collateral and debt values.
     
@@ -1181,250 +1913,64 @@ async def build_position_message(chat_id: str, addresses: List[str], filter_prot
     
     messages = []
     
+    # Auto-discover all positions for every address concurrently (only check specified protocol if filter provided)
+    discovered = await discover_positions_for_addresses(addresses, chat_id, filter_protocol)
+    
+    # Fetch every missing Morpho LLTV up front in one multicall (the Morpho formatter reads the cache)
+    missing_lltv_ids = set()
+    for positions in discovered:
+        if isinstance(positions, Exception):
+            continue
+        for pos in positions:
+            market_info = pos.market_info
+            if pos.protocol_id == 'morpho' and market_info and market_info.get('lltv') is None and market_info.get('id'):
+                if protocols.get_cached_morpho_market_lltv(market_info['id']) is None:
+                    missing_lltv_ids.add(market_info['id'])
+    if missing_lltv_ids:
+        try:
+            conn = get_connection('morpho')
+            async with rpc_semaphore:
+                await asyncio.to_thread(protocols.batch_morpho_lltvs, list(missing_lltv_ids), conn['contract'], conn['w3'])
+        except Exception as e:
+            logger.debug(f"Could not batch fetch Morpho LLTVs: {e}")
+    
     # Process each address
-    for address in addresses:
+    for address, positions in zip(addresses, discovered):
         try:
-            # Auto-discover all positions (only check specified protocol if filter provided)
-            positions = await discover_all_positions(address, chat_id, filter_protocol=filter_protocol)
+            if isinstance(positions, Exception):
+                raise positions
             
             if not positions:
-                protocol_text = f" for {PROTOCOL_CONFIG[filter_protocol]['name']} protocol" if filter_protocol else ""
+                protocol_text = f" for {PROTOCOL_NAMES[filter_protocol]} protocol" if filter_protocol else ""
                 messages.append(f"For {address}:\n\nNo active positions found{protocol_text}.")
                 continue
             
             # Group positions by protocol
-            protocol_groups = {}
+            protocol_groups = defaultdict(list)
             for pos in positions:
-                protocol_id = pos['protocol_id']
-                if protocol_id not in protocol_groups:
-                    protocol_groups[protocol_id] = []
-                protocol_groups[protocol_id].append(pos)
+                protocol_groups[pos.protocol_id].append(pos)
             
             # Build message
-            address_message = f"For {address}:\n"
+            address_parts = [f"For {address}:\n"]
             
             for protocol_id, protocol_positions in protocol_groups.items():
                 protocol_info = PROTOCOL_CONFIG[protocol_id]
-                address_message += f"\n{protocol_info['name']} protocol:\n"
+                protocol_name = protocol_info['name']
+                app_url = protocol_info.get('app_url', '')
+                address_parts.append(f"\n{protocol_name} protocol:\n")
                 
                 # Sort by health factor (worst first)
-                protocol_positions.sort(key=lambda x: x['health_factor'])
+                protocol_positions.sort(key=BY_HEALTH_FACTOR)
                 
                 for pos in protocol_positions:
-                    health_factor = pos['health_factor']
-                    threshold = pos['threshold']
-                    market_id = pos['market_id']
-                    market_info = pos.get('market_info')
-                    
-                    status = "⚠️ " if health_factor < threshold else ""
-                    liquidation_drop_pct = (1 - (1 / health_factor)) * 100 if health_factor > 0 else 0
-                    threshold_str = f"{threshold:.3f}".rstrip('0').rstrip('.')
-                    
-                    # Ensure liquidation_drop_pct is not None
-                    if liquidation_drop_pct is None:
-                        liquidation_drop_pct = 0
-                    
-                    # Extract collateral and debt values
-                    collateral_usd = None
-                    debt_usd = None
-                    collateral_token = None
-                    debt_token = None
-                    collateral_amount = None
-                    debt_amount = None
-                    
-                    if protocol_id == 'morpho' and market_info:
-                        # Morpho: Health Factor = (Collateral Value × LLTV) / Total Borrowed Amount
-                        # So: Collateral Value = (Health Factor × Total Borrowed Amount) / LLTV
-                        collateral_usd = market_info.get('supplyAssetsUsd', 0)
-                        debt_usd = market_info.get('borrowAssetsUsd', 0)
-                        lltv = market_info.get('lltv')  # Liquidation LTV (e.g., 0.86 for 86%) - fetched from contract
-                        
-                        # If LLTV is still not available, try fetching from contract
-                        if lltv is None:
-                            market_id = market_info.get('id')
-                            if market_id:
-                                try:
-                                    protocol_info = PROTOCOL_CONFIG['morpho']
-                                    conn = protocol_connections['morpho']
-                                    lltv = protocols.get_morpho_market_lltv(market_id, conn['contract'], conn['w3'])
-                                    if lltv:
-                                        market_info['lltv'] = lltv  # Cache it in market_info
-                                        logger.debug(f"Fetched LLTV from contract for market {market_id}: {lltv:.4f}")
-                                except Exception as e:
-                                    logger.debug(f"Could not fetch LLTV from contract: {e}")
-                        
-                        # Calculate collateral from health factor and LLTV if supplyAssetsUsd is 0
-                        if collateral_usd == 0 and debt_usd > 0 and health_factor and lltv:
-                            try:
-                                lltv_float = float(lltv)
-                                if lltv_float > 0:
-                                    # Formula: Collateral = (HF × Debt) / LLTV
-                                    collateral_usd = (float(debt_usd) * float(health_factor)) / lltv_float
-                                    logger.debug(f"Calculated Morpho collateral: (${debt_usd} × {health_factor}) / {lltv_float} = ${collateral_usd:.2f}")
-                            except (ValueError, TypeError) as e:
-                                logger.debug(f"Error calculating collateral from LLTV: {e}")
-                        
-                        # Fallback if LLTV not available
-                        if collateral_usd == 0 and debt_usd > 0 and health_factor:
-                            try:
-                                # Use estimated LLTV of 0.80 (80%) as fallback
-                                estimated_lltv = 0.80
-                                collateral_usd = (float(debt_usd) * float(health_factor)) / estimated_lltv
-                                logger.debug(f"Estimated Morpho collateral with default LLTV: (${debt_usd} × {health_factor}) / {estimated_lltv} = ${collateral_usd:.2f}")
-                            except (ValueError, TypeError) as e:
-                                logger.debug(f"Could not estimate Morpho collateral: {e}")
-                                collateral_usd = 0
-                        
-                        # Store liquidation price if available
-                        liquidation_price = market_info.get('liquidationPrice')
-                    elif protocol_id == 'neverland' and market_info:
-                        collateral_usd = market_info.get('collateral_usd', 0)
-                        debt_usd = market_info.get('debt_usd', 0)
-                    elif protocol_id == 'curvance' and market_info:
-                        # Curvance: use raw amounts with token symbols
-                        collateral_token = market_info.get('collateral_token', '?')
-                        debt_token = market_info.get('debt_token', '?')
-                        collateral_amount = market_info.get('collateral_amount', 0)
-                        debt_amount = market_info.get('debt_amount', 0)
-                    
-                    # Format collateral/debt display
-                    tvl_debt_str = ""
-                    if protocol_id == 'curvance' and market_info:
-                        # Format with 3 sig fig
-                        def format_sig_fig(value):
-                            if value == 0:
-                                return "0"
-                            # Convert to scientific notation for sig fig calculation
-                            import math
-                            if value >= 1:
-                                # For values >= 1, round to 3 sig fig
-                                magnitude = math.floor(math.log10(value))
-                                factor = 10 ** (2 - magnitude)
-                                rounded = round(value * factor) / factor
-                                # Format nicely
-                                if rounded >= 1_000_000:
-                                    return f"{rounded/1_000_000:.3g}M"
-                                elif rounded >= 1_000:
-                                    return f"{rounded/1_000:.3g}K"
-                                else:
-                                    return f"{rounded:.3g}"
-                            else:
-                                # For values < 1, show 3 sig fig
-                                return f"{value:.3g}"
-                        
-                        collateral_str = format_sig_fig(collateral_amount) if collateral_amount else "0"
-                        debt_str = format_sig_fig(debt_amount) if debt_amount else "0"
-                        tvl_debt_str = f"\nCollateral: {collateral_str} {collateral_token} | Debt: {debt_str} {debt_token}"
-                    elif collateral_usd is not None and debt_usd is not None:
-                        # Format large numbers nicely for USD values
-                        def format_currency(value):
-                            if value == 0:
-                                return "$0.00"
-                            if value >= 1_000_000:
-                                return f"${value/1_000_000:.2f}M"
-                            elif value >= 1_000:
-                                return f"${value/1_000:.2f}K"
-                            else:
-                                return f"${value:.2f}"
-                        
-                        # For Morpho, show asset quantity with USD in brackets and add liquidation price
-                        if protocol_id == 'morpho' and market_info:
-                            collateral_symbol = market_info.get('collateralAsset', '?')
-                            loan_symbol = market_info.get('loanAsset', '?')
-                            
-                            collateral_human = market_info.get('supplyAmountHuman', 0)
-                            borrow_human = market_info.get('borrowAmountHuman', 0)
-                            
-                            # Format Amounts (e.g., 1.02 or 50k)
-                            def format_amount(val):
-                                if val >= 1_000_000:
-                                    return f"{val/1_000_000:.2f}M"
-                                if val >= 1_000:
-                                    return f"{val/1_000:.1f}K"
-                                if val >= 1:
-                                    return f"{val:.2f}"
-                                return f"{val:.4f}"
-                            
-                            def format_usd(val):
-                                if val >= 1_000_000:
-                                    return f"${val/1_000_000:.2f}M"
-                                if val >= 1_000:
-                                    return f"${val/1_000:.2f}K"
-                                return f"${val:.2f}"
-                            
-                            col_str = f"{format_amount(collateral_human)} {collateral_symbol} ({format_usd(collateral_usd)})"
-                            deb_str = f"{format_amount(borrow_human)} {loan_symbol} ({format_usd(debt_usd)})"
-                            
-                            # Liquidation Info - check both camelCase and snake_case keys
-                            liq_price = market_info.get('liquidationPrice') or market_info.get('liquidation_price')
-                            drop_pct = market_info.get('liquidationDropPct') or market_info.get('liquidation_drop_pct')
-                            
-                            liq_str = ""
-                            if liq_price and float(liq_price) > 0:
-                                liq_price = float(liq_price)
-                                drop_pct = float(drop_pct) if drop_pct else 0
-                                # Smart formatting for price (handle small vs large prices)
-                                price_fmt = f"${liq_price:,.2f}" if liq_price > 1 else f"${liq_price:.4f}"
-                                liq_str = f"\nLiquidation price: {price_fmt} ({drop_pct:.1f}% drop to liquidation)"
-                            
-                            tvl_debt_str = f"\nCollateral: {col_str} | Debt: {deb_str}{liq_str}"
-                        else:
-                            tvl_debt_str = f"\nCollateral: {format_currency(collateral_usd)} | Debt: {format_currency(debt_usd)}"
-                    
-                    # Format message based on protocol
-                    if protocol_id == 'morpho' and market_info:
-                        market_name = market_info.get('name', 'Unknown').upper()
-                        market_id_for_url = market_info.get('id') or market_id or 'unknown'
-                        market_url = f"https://app.morpho.org/monad/market/{market_id_for_url}/{market_info.get('name', 'unknown')}?subTab=yourPosition"
-                        # Calculate liquidation_drop_pct if not already calculated
-                        if liquidation_drop_pct is None:
-                            liquidation_drop_pct = (1 - (1 / health_factor)) * 100 if health_factor > 0 else 0
-                        address_message += f"{status}[{market_name}]({market_url}):\nCurrent Health: {health_factor:.3f}, Alert at {threshold_str}{tvl_debt_str}\n"
-                    elif protocol_id == 'curvance' and market_id:
-                        # market_id is now the MarketManager address (grouped by MarketManager)
-                        market_manager_address = market_id
-                        market_url = f"{protocol_info.get('app_url', '')}/market/{market_manager_address}"
-                        # Get market name from market_info (includes collateral token symbols)
-                        market_name = market_info.get('name', 'Curvance Market') if market_info else 'Curvance Market'
-                        address_message += f"{status}[{market_name}]({market_url}):\nAggregated Health: {health_factor:.3f} ({liquidation_drop_pct:.1f}% from liquidation), Alert at {threshold_str}{tvl_debt_str}\n"
-                    # elif protocol_id == 'euler' and market_id:
-                    #     # Euler vault URL format: /positions/{account}/{vault}?network=monad
-                    #     # Use the monitored address (not vault address) for the URL
-                    #     vault_url = f"{protocol_info.get('app_url', '')}/positions/{address}/{market_id}?network=monad"
-                    #     # Extract collateral/debt from market_info
-                    #     if market_info:
-                    #         collateral_usd = market_info.get('collateral_usd', 0)
-                    #         debt_usd = market_info.get('debt_usd', 0)
-                    #         if collateral_usd is not None and debt_usd is not None:
-                    #             def format_currency(value):
-                    #                 if value == 0:
-                    #                     return "$0.00"
-                    #                 if value >= 1_000_000:
-                    #                     return f"${value/1_000_000:.2f}M"
-                    #                 elif value >= 1_000:
-                    #                     return f"${value/1_000:.2f}K"
-                    #                 else:
-                    #                     return f"${value:.2f}"
-                    #             tvl_debt_str = f"\nCollateral: {format_currency(collateral_usd)} | Debt: {format_currency(debt_usd)}"
-                    #         else:
-                    #             tvl_debt_str = ""
-                    #     else:
-                    #         tvl_debt_str = ""
-                    #     address_message += f"{status}[Euler Vault]({vault_url}):\nCurrent Health: {health_factor:.3f} ({liquidation_drop_pct:.1f}% from liquidation), Alert at {threshold_str}{tvl_debt_str}\n"
-                    else:
-                        # Neverland and other protocols
-                        protocol_url = protocol_info.get('app_url', '')
-                        if protocol_url:
-                            address_message += f"{status}[{protocol_info['name']}]({protocol_url}):\nCurrent Health: {health_factor:.3f} ({liquidation_drop_pct:.1f}% from liquidation), Alert at {threshold_str}{tvl_debt_str}\n"
-                        else:
-                            address_message += f"{status}{protocol_info['name']}:\nCurrent Health: {health_factor:.3f} ({liquidation_drop_pct:.1f}% from liquidation), Alert at {threshold_str}{tvl_debt_str}\n"
+                    address_parts.append(format_position(pos, protocol_name, app_url, detail=True))
             
-            messages.append(address_message)
+            messages.append("".join(address_parts))
             
         except Exception as e:
             logger.error(f"Error processing address {address}: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(traceback.format_exc())
             messages.append(f"For {address}:\n\n⚠️ Error checking positions: {str(e)[:100]}")
     
     if not messages:
@@ -1432,100 +1978,142 @@ async def build_position_message(chat_id: str, addresses: List[str], filter_prot
     
     return "\n\n".join(messages)
 
-# Function to handle /check command
-async def check(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+CHECK_USAGE = (
+    "Usage:\n"
+    "  /check - Check all protocols for all addresses\n"
+    "  /check <protocol> - Check specific protocol (e.g., /check morpho)\n"
+    "  /check <address> - Check specific address"
+)
+
+POSITION_USAGE = (
+    "Usage:\n"
+    "  /position - Show all protocols for all addresses\n"
+    "  /position <protocol> - Show specific protocol (e.g., /position morpho)\n"
+    "  /position <address> - Show specific address"
+)
+
+def parse_filter(args: Optional[List[str]], monitored_addresses: Dict, usage: str) -> tuple:
     """
-    Auto-discover and check positions with optional filters:
-    - /check - Check all protocols for all addresses
-    - /check <protocol> - Check specific protocol for all addresses
-    - /check <address> - Check all protocols for specific address
+    Parse the optional protocol/address argument of /check and /position.
+    
+    Args:
+        args: Command arguments (only the first one is used)
+        monitored_addresses: The chat's address dict (keys are lowercase addresses)
+        usage: Usage text shown for an invalid argument
+    
+    Returns:
+        (filter_protocol, filter_address, error_msg) - error_msg is None when the argument is valid
+    """
+    if not args:
+        return None, None, None
+    
+    arg = args[0].lower()
+    
+    # Check if it's a protocol ID
+    if arg in PROTOCOL_IDS:
+        logger.info(f"Filtering by protocol: {arg}")
+        return arg, None, None
+    
+    # Check if it's a valid address format that is being monitored
+    address = normalize_address(arg)
+    if address:
+        if address in monitored_addresses:
+            logger.info(f"Filtering by address: {address}")
+            return None, address, None
+        return None, None, (
+            f"Address {address} is not being monitored.\n"
+            f"Use /add {address} to start monitoring it (default threshold: 1.5)."
+        )
+    
+    return None, None, f"Invalid argument: {arg}\n\n{usage}\n\nSupported protocols: {PROTOCOL_LIST_STR}"
+
+# /check and /position replies being built, keyed by (command, chat_id, addresses, filter_protocol):
+# a repeated identical command joins the running build instead of starting another discovery
+_command_inflight: Dict[tuple, asyncio.Future] = {}
+
+def _join_or_start_build(key: tuple, build_message, chat_id: str, addresses: Sequence[str],
+                         filter_protocol: Optional[str]) -> asyncio.Future:
+    """
+    Return a future for the reply identified by key, starting build_message only if none is running.
+    The future is shielded so one impatient caller can't cancel the build for the others.
+    """
+    future = _command_inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(build_message(chat_id, addresses, filter_protocol=filter_protocol))
+        _command_inflight[key] = future
+        future.add_done_callback(lambda done: _command_inflight.pop(key, None) if _command_inflight.get(key) is done else None)
+    else:
+        logger.info(f"Joining in-flight {key[0]} for chat_id {chat_id}")
+    return asyncio.shield(future)
+
+async def _run_positions_command(update: Update, context: ContextTypes.DEFAULT_TYPE, command: str,
+                                 build_message, usage: str) -> None:
+    """
+    Shared flow of /check and /position: parse the optional filter, build the message and reply.
+    
+    Args:
+        update: Telegram update
+        context: Handler context
+        command: Command name for logging (e.g. 'check')
+        build_message: build_check_message or build_position_message
+        usage: Usage text shown for an invalid argument
     """
     chat_id = str(update.effective_chat.id)
-    check_start_time = time()
+    start_time = time()
     address_arg = context.args[0] if context.args and len(context.args) > 0 else "all"
-    logger.info(f"[CONCURRENT] /check STARTED by chat_id: {chat_id}, address: {address_arg}")
+    logger.info(f"[CONCURRENT] /{command} STARTED by chat_id: {chat_id}, address: {address_arg}")
     
     if chat_id not in user_data or not user_data[chat_id].get('addresses'):
         logger.info(f"[{INSTANCE_ID}] No addresses found for chat_id {chat_id}, user_data: {user_data.get(chat_id, {})}")
         await update.message.reply_text(
-            f"[Instance: {INSTANCE_ID[:8]}]\n"
             "You are not currently monitoring any addresses.\n"
             "Use /add <address> to start monitoring (default threshold: 1.5)."
         )
         return
     
-    addresses = list(user_data[chat_id]['addresses'].keys())
-    
-    if not addresses:
-        await update.message.reply_text("No addresses to check.")
-        return
+    addresses = tuple(user_data[chat_id]['addresses'])
     
     # Parse arguments
-    filter_protocol = None
-    filter_address = None
-    
-    if context.args and len(context.args) > 0:
-        arg = context.args[0].lower()
-        
-        # Check if it's a protocol ID
-        if arg in PROTOCOL_CONFIG:
-            filter_protocol = arg
-            logger.info(f"Filtering by protocol: {filter_protocol}")
-        else:
-            # Check if it's a valid address format
-            # Use any protocol's Web3 instance to validate
-            first_protocol = list(protocol_connections.values())[0]
-            if first_protocol['w3'].is_address(arg):
-                # Check if this address is being monitored
-                if arg in addresses:
-                    filter_address = arg
-                    logger.info(f"Filtering by address: {filter_address}")
-                else:
-                    await update.message.reply_text(
-                        f"Address {arg} is not being monitored.\n"
-                        f"Use /add {arg} to start monitoring it (default threshold: 1.5)."
-                    )
-                    return
-            else:
-                await update.message.reply_text(
-                    f"Invalid argument: {arg}\n\n"
-                    "Usage:\n"
-                    "  /check - Check all protocols for all addresses\n"
-                    "  /check <protocol> - Check specific protocol (e.g., /check morpho)\n"
-                    "  /check <address> - Check specific address\n\n"
-                    f"Supported protocols: {', '.join(PROTOCOL_CONFIG.keys())}"
-                )
-                return
-    
-    # Send "checking..." message and store it for deletion
-    checking_msg = await update.message.reply_text("🔍 Checking positions...")
+    filter_protocol, filter_address, error_msg = parse_filter(context.args, user_data[chat_id]['addresses'], usage)
+    if error_msg:
+        await update.message.reply_text(error_msg)
+        return
     
     # Filter addresses if needed
-    addresses_to_check = [filter_address] if filter_address else addresses
+    addresses_to_check = (filter_address,) if filter_address else addresses
     
-    # Build check message with optional protocol filter
-    final_message = await build_check_message(chat_id, addresses_to_check, filter_protocol=filter_protocol)
-    
-    # Delete the "checking..." message
-    try:
-        await checking_msg.delete()
-    except Exception as e:
-        logger.debug(f"Could not delete checking message: {e}")
+    # Build message with optional protocol filter (the "checking..." notice is sent meanwhile);
+    # an identical command still running for this chat is joined rather than repeated
+    build_key = (command, chat_id, addresses_to_check, filter_protocol)
+    final_message = await with_checking_notice(
+        update, _join_or_start_build(build_key, build_message, chat_id, addresses_to_check, filter_protocol)
+    )
     
-    # Send single consolidated message
-    check_elapsed = time() - check_start_time
+    # Send one consolidated message (split at paragraph breaks only if it exceeds Telegram's limit)
+    elapsed = time() - start_time
     if final_message:
-        logger.info(f"[CONCURRENT] /check COMPLETED by chat_id: {chat_id}, address: {address_arg} in {check_elapsed:.2f}s")
-        await update.message.reply_text(final_message, parse_mode='Markdown', disable_web_page_preview=True)
+        logger.info(f"[CONCURRENT] /{command} COMPLETED by chat_id: {chat_id}, address: {address_arg} in {elapsed:.2f}s")
+        for chunk in chunk_messages(final_message.split(PARAGRAPH_SEPARATOR), PARAGRAPH_SEPARATOR):
+            await update.message.reply_text(chunk, parse_mode='Markdown', disable_web_page_preview=True)
     else:
         filter_msg = ""
         if filter_protocol:
-            filter_msg = f" for {PROTOCOL_CONFIG[filter_protocol]['name']}"
+            filter_msg = f" for {PROTOCOL_NAMES[filter_protocol]}"
         elif filter_address:
             filter_msg = f" for {filter_address}"
-        logger.info(f"[CONCURRENT] /check COMPLETED (no positions) by chat_id: {chat_id}, address: {address_arg} in {check_elapsed:.2f}s")
+        logger.info(f"[CONCURRENT] /{command} COMPLETED (no positions) by chat_id: {chat_id}, address: {address_arg} in {elapsed:.2f}s")
         await update.message.reply_text(f"No active positions found{filter_msg}.")
 
+# Function to handle /check command
+async def check(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Auto-discover and check positions with optional filters:
+    - /check - Check all protocols for all addresses
+    - /check <protocol> - Check specific protocol for all addresses
+    - /check <address> - Check all protocols for specific address
+    """
+    await _run_positions_command(update, context, 'check', build_check_message, CHECK_USAGE)
+
 # Function to handle /position command (full details with collateral/debt)
 async def position(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
@@ -1535,93 +2123,11 @@ async def position(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     - /position <protocol>: specific protocol, all addresses
     - /position <address>: all protocols, specific address
     """
-    chat_id = str(update.effective_chat.id)
-    logger.info(f"/position called by chat_id: {chat_id}")
-    
-    if chat_id not in user_data or not user_data[chat_id].get('addresses'):
-        await update.message.reply_text(
-            "You are not currently monitoring any addresses.\n"
-            "Use /add <address> to start monitoring (default threshold: 1.5)."
-        )
-        return
-    
-    addresses = list(user_data[chat_id]['addresses'].keys())
-    
-    if not addresses:
-        await update.message.reply_text("No addresses to check.")
-        return
-    
-    # Parse arguments
-    filter_protocol = None
-    filter_address = None
-    
-    if context.args and len(context.args) > 0:
-        arg = context.args[0].lower()
-        
-        # Check if it's a protocol ID
-        if arg in PROTOCOL_CONFIG:
-            filter_protocol = arg
-            logger.info(f"Filtering /position by protocol: {filter_protocol}")
-        else:
-            # Check if it's a valid address format
-            first_protocol = list(protocol_connections.values())[0]
-            if first_protocol['w3'].is_address(arg):
-                # Check if this address is being monitored
-                if arg in addresses:
-                    filter_address = arg
-                    logger.info(f"Filtering /position by address: {filter_address}")
-                else:
-                    await update.message.reply_text(
-                        f"Address {arg} is not being monitored.\n"
-                        f"Use /add {arg} to start monitoring it (default threshold: 1.5)."
-                    )
-                    return
-            else:
-                await update.message.reply_text(
-                    f"Invalid argument: {arg}\n\n"
-                    "Usage:\n"
-                    "  /position - Show all protocols for all addresses\n"
-                    "  /position <protocol> - Show specific protocol (e.g., /position morpho)\n"
-                    "  /position <address> - Show specific address\n\n"
-                    f"Supported protocols: {', '.join(PROTOCOL_CONFIG.keys())}"
-                )
-                return
-    
-    # Send "checking..." message and store it for deletion
-    checking_msg = await update.message.reply_text("🔍 Checking positions...")
-    
-    # Filter addresses if needed
-    addresses_to_check = [filter_address] if filter_address else addresses
-    
-    # Build full position message with optional protocol filter
-    final_message = await build_position_message(chat_id, addresses_to_check, filter_protocol=filter_protocol)
-    
-    # Delete the "checking..." message
-    try:
-        await checking_msg.delete()
-    except Exception as e:
-        logger.debug(f"Could not delete checking message: {e}")
-    
-    # Send single consolidated message
-    if final_message:
-        logger.info(f"Sending /position response from instance {INSTANCE_ID}, chat_id: {chat_id}")
-        await update.message.reply_text(final_message, parse_mode='Markdown', disable_web_page_preview=True)
-    else:
-        filter_msg = ""
-        if filter_protocol:
-            filter_msg = f" for {PROTOCOL_CONFIG[filter_protocol]['name']}"
-        elif filter_address:
-            filter_msg = f" for {filter_address}"
-        await update.message.reply_text(f"No active positions found{filter_msg}.")
+    await _run_positions_command(update, context, 'position', build_position_message, POSITION_USAGE)
 
 # Function to handle /protocols command
 async def list_protocols(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    message = "📚 Supported Protocols:\n\n"
-    for protocol_id, protocol_info in PROTOCOL_CONFIG.items():
-        message += f"• {protocol_info['name']} ({protocol_id})\n"
-        message += f"  Chain: {protocol_info['chain']}\n"
-        message += f"  App: {protocol_info['app_url']}\n\n"
-    await update.message.reply_text(message)
+    await update.message.reply_text(PROTOCOLS_MESSAGE)
 
 # Function to handle /repay command (manual rebalancing suggestions)
 async def repay(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -1634,45 +2140,41 @@ async def repay(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         )
         return
     
-    addresses = list(user_data[chat_id]['addresses'].keys())
+    addresses = tuple(user_data[chat_id]['addresses'])
     messages_sent = 0
     
-    # Find worst position across all addresses
-    worst_position = None
-    worst_hf = float('inf')
+    # Discover every address concurrently (bounded by ADDRESS_DISCOVERY_LIMIT), then scan the
+    # results once in memory - nothing below re-queries per market
+    discovered = await discover_positions_for_addresses(addresses, chat_id)
     
-    for address in addresses:
-        try:
-            positions = await discover_all_positions(address, chat_id)
-            
-            for pos in positions:
-                health_factor = pos['health_factor']
-                threshold = pos['threshold']
-                
-                # Only consider positions below threshold
-                if health_factor < threshold and health_factor < worst_hf:
-                    worst_hf = health_factor
-                    worst_position = {
-                        'address': address,
-                        'protocol_id': pos['protocol_id'],
-                        'market_id': pos['market_id'],
-                        'health_factor': health_factor,
-                        'threshold': threshold
-                    }
-        except Exception as e:
-            logger.error(f"Error checking positions for {address} in /repay: {e}")
+    # Positions below threshold that rebalancing can give suggestions for
+    candidates = []
+    for address, positions in zip(addresses, discovered):
+        if isinstance(positions, Exception):
+            logger.error(f"Error checking positions for {address} in /repay: {positions}")
             continue
+        candidates.extend(
+            (address, pos) for pos in positions
+            if pos.protocol_id in rebalancing.SUPPORTED_PROTOCOLS and pos.health_factor < pos.threshold
+        )
+    
+    # Worst position across all addresses
+    worst_position = min(candidates, key=lambda candidate: candidate[1].health_factor, default=None)
     
     # Generate rebalancing message for worst position
+    # (its Morpho markets were just fetched by discovery and are served from cache)
     if worst_position:
-        protocol_info = PROTOCOL_CONFIG[worst_position['protocol_id']]
-        rebalancing_msg = rebalancing.generate_rebalancing_message(
-            address=worst_position['address'],
-            protocol_id=worst_position['protocol_id'],
-            market_id=worst_position['market_id'],
-            current_hf=worst_position['health_factor'],
-            threshold=worst_position['threshold'],
-            chain_id=protocol_info.get('chain_id', 143)
+        address, pos = worst_position
+        # Blocking API calls, run off the event loop
+        rebalancing_msg = await asyncio.to_thread(
+            rebalancing.generate_rebalancing_message,
+            address=address,
+            protocol_id=pos.protocol_id,
+            market_id=pos.market_id,
+            current_hf=pos.health_factor,
+            threshold=pos.threshold,
+            chain_id=PROTOCOL_CONFIG[pos.protocol_id].get('chain_id', 143),
+            app_url=PROTOCOL_CONFIG[pos.protocol_id]['app_url']
         )
         
         if rebalancing_msg:
@@ -1693,31 +2195,28 @@ async def repay(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def stop(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     chat_id = str(update.effective_chat.id)
     if chat_id in user_data:
-        del user_data[chat_id]
-        save_user_data(user_data)
+        for address in user_data.pop(chat_id).get('addresses', {}):
+            forget_cached_results(address)
+        mark_user_data_dirty(chat_id)
         await update.message.reply_text("Monitoring stopped.")
     else:
         await update.message.reply_text("You were not monitoring any address.")
 
 # Function to handle direct address input
 async def handle_address(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    address = update.message.text.strip()
-    
-    # Try to validate address on any protocol
-    valid_protocols = []
-    for protocol_id, conn in protocol_connections.items():
-        if conn['w3'].is_address(address):
-            valid_protocols.append(protocol_id)
+    address = normalize_address(update.message.text)
     
-    if not valid_protocols:
+    # Address format is the same on every protocol, so validate once
+    if address is None:
         await update.message.reply_text("Invalid address format. Please try again.")
         return
     
-    # Try to get health factor from all valid protocols
+    # Try to get health factor from every protocol that supports a direct lookup, concurrently
+    health_factors = await asyncio.gather(*[check_health_factor_async(address, protocol_id) for protocol_id in HEALTH_CHECK_PROTOCOLS])
+    
     results = []
-    for protocol_id in valid_protocols:
+    for protocol_id, health_factor in zip(HEALTH_CHECK_PROTOCOLS, health_factors):
         protocol_info = PROTOCOL_CONFIG[protocol_id]
-        health_factor = check_health_factor(address, protocol_id)
         if health_factor is not None:
             results.append({
                 'protocol': protocol_info['name'],
@@ -1726,88 +2225,196 @@ async def handle_address(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             })
     
     if results:
-        message = f"Health factors for {address}:\n\n"
+        parts = [f"Health factors for {address}:\n\n"]
         for result in results:
-            message += f"{result['protocol']}: {result['health_factor']:.4f}\n"
-            message += f"Explorer: {result['explorer']}/address/{address}\n\n"
-        await update.message.reply_text(message)
+            parts.append(f"{result['protocol']}: {result['health_factor']:.4f}\n")
+            parts.append(f"Explorer: {result['explorer']}/address/{address}\n\n")
+        await update.message.reply_text("".join(parts))
     else:
         await update.message.reply_text("Unable to fetch health factor from any protocol. Please try again later.")
     
     logger.info(f"Health factor check requested for address: {address}")
 
-# Function to check health factor and notify user for all addresses
-async def check_and_notify(context: ContextTypes.DEFAULT_TYPE, chat_id: str) -> None:
+# Fallback alert when no rebalancing suggestion is available (includes address and protocol info)
+ALERT_TEMPLATE = (
+    "⚠️ Health Factor Alert: {health_factor:.4f} < {threshold:.3f}\n\n"
+    "Address: `{address}`\n"
+    "Protocol: {protocol}\n"
+    "{market_line}"
+    "\nCheck your position: {app_url}\n"
+    "View on explorer: {explorer_url}/address/{address}"
+)
+
+def chunk_messages(messages: List[str], separator: str, limit: int = MESSAGE_CHUNK_LIMIT) -> List[str]:
     """
-    Auto-discover all positions and send alerts for positions below threshold.
+    Join messages with separator into as few chunks as possible, each at most limit characters.
+    A single message longer than limit becomes its own chunk (messages are never split).
+    
+    Args:
+        messages: Messages in sending order
+        separator: Text placed between messages within a chunk
+        limit: Maximum chunk length
+    
+    Returns:
+        List of combined message texts
     """
-    if chat_id not in user_data or not user_data[chat_id].get('addresses'):
-        return
+    return [separator.join(group) for group in group_messages(messages, separator, limit)]
 
-    addresses = list(user_data[chat_id]['addresses'].keys())
-    alerts = []
+def group_messages(messages: List[str], separator: str, limit: int = MESSAGE_CHUNK_LIMIT) -> List[List[str]]:
+    """
+    Split messages into consecutive groups that fit in one chunk each when joined with separator
+    (see chunk_messages).
+    
+    Args:
+        messages: Messages in sending order
+        separator: Text placed between messages within a chunk
+        limit: Maximum chunk length
+    
+    Returns:
+        List of message groups
+    """
+    chunks = []
+    current = []
+    current_len = 0
+    for message in messages:
+        added_len = len(message) + (len(separator) if current else 0)
+        if current and current_len + added_len > limit:
+            chunks.append(current)
+            current = []
+            current_len = 0
+            added_len = len(message)
+        current.append(message)
+        current_len += added_len
+    if current:
+        chunks.append(current)
+    return chunks
 
-    # Check all addresses using auto-discovery
-    for address in addresses:
+async def send_alerts(context: ContextTypes.DEFAULT_TYPE, chat_id: str, alerts: List[str]) -> None:
+    """
+    Send a group of alerts as one Markdown message. If Telegram rejects it (e.g. an unescaped
+    `_` in a market name), resend the alerts one at a time, falling back to plain text, so one
+    bad entity can't drop the others.
+    
+    Args:
+        context: Bot context
+        chat_id: Chat to notify
+        alerts: Alert texts that fit in one message together
+    """
+    try:
+        await context.bot.send_message(
+            chat_id=int(chat_id),
+            text=ALERT_SEPARATOR.join(alerts),
+            parse_mode='Markdown',
+            disable_web_page_preview=True
+        )
+        return
+    except BadRequest as e:
+        logger.warning(f"Combined alert for {chat_id} rejected ({e}), sending {len(alerts)} alert(s) individually")
+    except Exception as e:
+        logger.error(f"Error sending alerts to {chat_id}: {e}")
+        return
+    
+    for alert in alerts:
         try:
-            positions = await discover_all_positions(address, chat_id)
-            
-            for pos in positions:
-                health_factor = pos['health_factor']
-                threshold = pos['threshold']
-                
-                if health_factor < threshold:
-                    protocol_info = PROTOCOL_CONFIG[pos['protocol_id']]
-                    market_info = pos.get('market_info', {})
-                    market_name = market_info.get('name') if market_info else None
-                    alerts.append({
-                        'address': address,
-                        'health_factor': health_factor,
-                        'threshold': threshold,
-                        'protocol': protocol_info,
-                        'protocol_id': pos['protocol_id'],
-                        'market_id': pos['market_id'],
-                        'market_name': market_name
-                    })
-        except Exception as e:
-            logger.error(f"Error checking positions for {address}: {e}")
-            continue
-
-    # Send alerts if any
-    if alerts:
-        for alert in alerts:
-            # Generate rebalancing message with vault suggestions
-            rebalancing_msg = rebalancing.generate_rebalancing_message(
-                address=alert['address'],
-                protocol_id=alert['protocol_id'],
-                market_id=alert.get('market_id'),
-                current_hf=alert['health_factor'],
-                threshold=alert['threshold'],
-                chain_id=alert['protocol'].get('chain_id', 143)
-            )
-            
-            if rebalancing_msg:
-                # Send rebalancing message (now includes address and protocol)
+            try:
                 await context.bot.send_message(
                     chat_id=int(chat_id),
-                    text=rebalancing_msg,
+                    text=alert,
                     parse_mode='Markdown',
                     disable_web_page_preview=True
                 )
-            else:
-                # Fallback to simple alert if rebalancing message generation fails
-                # Include address and protocol info
-                message = f"⚠️ Health Factor Alert: {alert['health_factor']:.4f} < {alert['threshold']:.3f}\n\n"
-                message += f"Address: `{alert['address']}`\n"
-                message += f"Protocol: {alert['protocol']['name']}\n"
-                # Show market name if available, otherwise fall back to market ID
-                if alert.get('market_name'):
-                    message += f"Market: {alert['market_name']}\n"
-                elif alert.get('market_id'):
-                    message += f"Market ID: {alert['market_id'][:20]}...\n"
-                message += f"\nCheck your position: {alert['protocol']['app_url']}\n"
-                message += f"View on explorer: {alert['protocol']['explorer_url']}/address/{alert['address']}"
-                await context.bot.send_message(chat_id=int(chat_id), text=message, parse_mode='Markdown')
+            except BadRequest:
+                await context.bot.send_message(chat_id=int(chat_id), text=alert, disable_web_page_preview=True)
+        except Exception as e:
+            logger.error(f"Error sending alert to {chat_id}: {e}")
+
+# Function to check health factor and notify user for all addresses
+async def check_and_notify(context: ContextTypes.DEFAULT_TYPE, chat_id: str,
+                           discovered_by_address: Optional[Dict[str, object]] = None) -> None:
+    """
+    Auto-discover all positions and send alerts for positions below threshold.
+    
+    Args:
+        context: Handler/job context (used to send messages)
+        chat_id: Chat to check
+        discovered_by_address: Already discovered positions (or the exception raised) per address,
+            with this chat's thresholds; discovered here when not given
+    """
+    if discovered_by_address is not None:
+        addresses = tuple(discovered_by_address)
+        discovered = list(discovered_by_address.values())
+    else:
+        if chat_id not in user_data or not user_data[chat_id].get('addresses'):
+            return
+        addresses = tuple(user_data[chat_id]['addresses'])
+        # Check all addresses using auto-discovery (concurrently, bounded by ADDRESS_DISCOVERY_LIMIT)
+        discovered = await discover_positions_for_addresses(addresses, chat_id, periodic=True)
+    
+    # Collect positions below threshold across all addresses
+    below_threshold = []
+    for address, positions in zip(addresses, discovered):
+        if isinstance(positions, Exception):
+            logger.error(f"Error checking positions for {address}: {positions}")
+            continue
+        below_threshold.extend((address, pos) for pos in positions if pos.health_factor < pos.threshold)
+    
+    async def build_rebalancing(address: str, pos: Position) -> Optional[str]:
+        """
+        Rebalancing suggestion with vault options (blocking Morpho API calls, run off the event loop).
+        Up to GRAPHQL_RATE_LIMIT run at once; the GraphQL limiter only spaces request starts.
+        """
+        if pos.protocol_id not in rebalancing.SUPPORTED_PROTOCOLS:
+            return None
+        try:
+            async with graphql_semaphore:
+                return await asyncio.to_thread(
+                    rebalancing.generate_rebalancing_message,
+                    address=address,
+                    protocol_id=pos.protocol_id,
+                    market_id=pos.market_id,
+                    current_hf=pos.health_factor,
+                    threshold=pos.threshold,
+                    chain_id=PROTOCOL_CONFIG[pos.protocol_id].get('chain_id', 143),
+                    app_url=PROTOCOL_CONFIG[pos.protocol_id]['app_url']
+                )
+        except Exception as e:
+            logger.error(f"Error generating rebalancing message for {address}: {e}")
+            return None
+    
+    # Generate all rebalancing suggestions concurrently
+    rebalancing_msgs = await asyncio.gather(*[build_rebalancing(address, pos) for address, pos in below_threshold])
+    
+    # One message per position below threshold
+    alert_messages = []
+    for (address, pos), rebalancing_msg in zip(below_threshold, rebalancing_msgs):
+        if rebalancing_msg:
+            # Rebalancing message includes address and protocol
+            alert_messages.append(rebalancing_msg)
+            continue
+        
+        # Fallback to simple alert if rebalancing message generation fails
+        # Show market name if available, otherwise fall back to market ID
+        protocol_info = PROTOCOL_CONFIG[pos.protocol_id]
+        market_name = pos.market_info.get('name') if pos.market_info else None
+        if market_name:
+            market_line = f"Market: {market_name}\n"
+        elif pos.market_id:
+            market_line = f"Market ID: {pos.market_id[:20]}...\n"
+        else:
+            market_line = ""
+        alert_messages.append(ALERT_TEMPLATE.format(
+            health_factor=pos.health_factor,
+            threshold=pos.threshold,
+            address=address,
+            protocol=protocol_info['name'],
+            market_line=market_line,
+            app_url=protocol_info['app_url'],
+            explorer_url=protocol_info['explorer_url']
+        ))
+
+    # Send alerts if any, combined into as few messages as Telegram's length limit allows
+    for alerts in group_messages(alert_messages, ALERT_SEPARATOR):
+        await send_alerts(context, chat_id, alerts)
 
 # Function to periodically check health factors
 async def periodic_check(context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -1815,27 +2422,64 @@ async def periodic_check(context: ContextTypes.DEFAULT_TYPE) -> None:
     Process all users in parallel with concurrency limit.
     This prevents server overload during volatile periods.
     """
-    chat_ids = list(user_data.keys())
+    # Snapshot each chat's addresses, and index chats by address: an address watched by
+    # several chats is discovered once per sweep and fanned out to all of them
+    chat_addresses = {chat_id: tuple(info.get('addresses', {})) for chat_id, info in user_data.items()}
+    chat_ids = [chat_id for chat_id, addresses in chat_addresses.items() if addresses]
     
     if not chat_ids:
         return
     
-    start_time = time.time()
-    logger.info(f"[PARALLEL] Starting periodic check for {len(chat_ids)} users (max {USER_PROCESSING_LIMIT} concurrent)")
+    address_subscribers = defaultdict(list)
+    for chat_id in chat_ids:
+        for address in chat_addresses[chat_id]:
+            address_subscribers[address].append(chat_id)
+    
+    start_time = time()
+    logger.info(f"[PARALLEL] Starting periodic check for {len(chat_ids)} users, {len(address_subscribers)} unique addresses (max {USER_PROCESSING_LIMIT} concurrent)")
+    
+    async def discover_once(address: str, chat_id: str):
+        async with address_discovery_semaphore:
+            return await discover_all_positions(address, chat_id, periodic=True)
+    
+    # Discovery uses the first subscriber's thresholds; other subscribers re-apply their own
+    address_tasks = {
+        address: asyncio.ensure_future(discover_once(address, subscribers[0]))
+        for address, subscribers in address_subscribers.items()
+    }
+    
+    async def positions_for(chat_id: str, address: str):
+        try:
+            positions = await asyncio.shield(address_tasks[address])
+        except Exception as e:
+            return e
+        if address_subscribers[address][0] == chat_id:
+            return positions
+        return [
+            replace(pos, threshold=get_threshold_for_position(chat_id, address, pos.protocol_id, pos.market_id))
+            for pos in positions
+        ]
     
     async def check_user(chat_id: str):
         """Check a single user with semaphore limit."""
-        user_start = time.time()
+        user_start = time()
         async with user_processing_semaphore:
             logger.info(f"[PARALLEL] Processing user {chat_id[:8]}...")
-            await check_and_notify(context, chat_id)
-            elapsed = time.time() - user_start
+            addresses = chat_addresses[chat_id]
+            discovered = await asyncio.gather(*[positions_for(chat_id, address) for address in addresses])
+            await check_and_notify(context, chat_id, dict(zip(addresses, discovered)))
+            elapsed = time() - user_start
             logger.info(f"[PARALLEL] Completed user {chat_id[:8]}... in {elapsed:.2f}s")
     
-    # Process all users in parallel (limited by semaphore)
-    await asyncio.gather(*[check_user(chat_id) for chat_id in chat_ids], return_exceptions=True)
+    # Process all users in parallel (limited by semaphore); one user's failure doesn't affect the others
+    results = await asyncio.gather(*[check_user(chat_id) for chat_id in chat_ids], return_exceptions=True)
+    for chat_id, result in zip(chat_ids, results):
+        if isinstance(result, Exception):
+            logger.error(f"[PARALLEL] Periodic check failed for user {chat_id[:8]}...: {result}")
+    
+    await asyncio.to_thread(disk_cache_prune)
     
-    total_elapsed = time.time() - start_time
+    total_elapsed = time() - start_time
     logger.info(f"[PARALLEL] Completed periodic check for {len(chat_ids)} users in {total_elapsed:.2f}s (avg: {total_elapsed/len(chat_ids):.2f}s per user)")
 
 def main() -> None:
@@ -1843,12 +2487,23 @@ def main() -> None:
         logger.error("No bot token provided. Please set the TELEGRAM_BOT_TOKEN environment variable.")
         return
 
-    # Verify connection to blockchains
-    for protocol_id, conn in protocol_connections.items():
+    # Verify connection to blockchains (chain IDs fetched concurrently, startup waits for the slowest RPC).
+    # Protocols on the same RPC URL share a Web3 instance, so each endpoint is asked only once.
+    connections = {protocol_id: get_connection(protocol_id) for protocol_id in PROTOCOL_CONFIG}
+    endpoints = {conn['w3'] for conn in connections.values()}
+    executor = ThreadPoolExecutor(max_workers=len(endpoints))
+    chain_id_futures = {w3: executor.submit(lambda w3: w3.eth.chain_id, w3) for w3 in endpoints}
+    # One shared deadline for all endpoints, then don't wait on a hung one at shutdown
+    wait_futures(chain_id_futures.values(), timeout=protocols.RPC_TIMEOUT)
+    executor.shutdown(wait=False)
+    for protocol_id, conn in connections.items():
         protocol_info = conn['protocol']
-        w3 = conn['w3']
+        future = chain_id_futures[conn['w3']]
+        if not future.done():
+            logger.error(f"Failed to connect to {protocol_info['name']} blockchain: no response within {protocols.RPC_TIMEOUT}s")
+            continue
         try:
-            chain_id = w3.eth.chain_id
+            chain_id = future.result()
             logger.info(f"Connected to {protocol_info['name']} on {protocol_info['chain']} (Chain ID: {chain_id})")
             if chain_id != protocol_info['chain_id']:
                 logger.warning(f"{protocol_info['name']}: Expected Chain ID {protocol_info['chain_id']}, but got {chain_id}. Please verify RPC endpoint.")
@@ -1891,13 +2546,31 @@ def main() -> None:
         await application.bot.set_my_commands(bot_commands)
         logger.info("Bot commands menu set successfully")
     
-    application.post_init = set_commands
+    async def post_init(application: Application) -> None:
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix='worker')
+        )
+        await set_commands(application)
+        start_persistence()
+    
+    async def post_shutdown(application: Application) -> None:
+        await stop_persistence()
+    
+    application.post_init = post_init
+    application.post_shutdown = post_shutdown
 
     # Set up periodic task
     # Use CHECK_INTERVAL for first run to avoid running immediately on startup
     # This prevents duplicate messages when bot restarts
     job_queue = application.job_queue
-    job_queue.run_repeating(periodic_check, interval=CHECK_INTERVAL, first=CHECK_INTERVAL)
+    # At most one sweep at a time: a slow run delays the next tick instead of overlapping it,
+    # and missed ticks are coalesced into a single run
+    job_queue.run_repeating(
+        periodic_check,
+        interval=CHECK_INTERVAL,
+        first=CHECK_INTERVAL,
+        job_kwargs={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': CHECK_INTERVAL // 2}
+    )
 
     logger.info(f"Multi-Protocol Lending Health Monitor Bot started. Instance ID: {INSTANCE_ID}")
     logger.info("Polling for updates...")
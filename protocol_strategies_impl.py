@@ -32,21 +32,19 @@ class NeverlandStrategy(LendingProtocolStrategy):
         positions = []
         
         try:
-            # Get health factor
-            health_factor = protocols.check_neverland_health_factor(
+            # Single getUserAccountData read provides health factor, collateral and debt
+            account_data = protocols.get_neverland_account_data(
                 user_address, self.contract, self.w3
             )
-            
+            if not account_data:
+                raise protocols.ProtocolQueryError(f"getUserAccountData failed for {user_address}")
+
+            health_factor = account_data.get('health_factor')
             if not health_factor or health_factor > 1e10:  # Invalid position
                 return positions
-            
-            # Get account data for collateral/debt
-            account_data = protocols.get_neverland_account_data(
-                user_address, self.contract, self.w3
-            )
-            
-            collateral_usd = account_data.get('collateral_usd', 0) if account_data else 0
-            debt_usd = account_data.get('debt_usd', 0) if account_data else 0
+
+            collateral_usd = account_data.get('collateral_usd', 0)
+            debt_usd = account_data.get('debt_usd', 0)
             
             # Neverland doesn't provide token symbols/amounts, use USD only
             positions.append(PositionData(
@@ -58,8 +56,10 @@ class NeverlandStrategy(LendingProtocolStrategy):
                 debt=Asset("USD", 0, debt_usd, 18),
                 app_url=self.app_url
             ))
+        except protocols.ProtocolQueryError:
+            raise
         except Exception as e:
-            logger.error(f"Error fetching Neverland positions: {e}", exc_info=True)
+            raise protocols.ProtocolQueryError(f"Error fetching Neverland positions: {e}") from e
         
         return positions
 
@@ -84,7 +84,7 @@ class MorphoStrategy(LendingProtocolStrategy):
         
         try:
             # Get all markets where user has positions
-            markets_data = protocols.get_morpho_user_markets(user_address, self.chain_id)
+            markets_data = protocols.get_morpho_user_markets(user_address, self.chain_id, raise_errors=True)
             
             for market in markets_data:
                 hf = market.get('healthFactor')
@@ -138,8 +138,10 @@ class MorphoStrategy(LendingProtocolStrategy):
                     liquidation_drop_pct=liquidation_drop_pct,  # Already None if invalid
                     app_url=self.app_url
                 ))
+        except protocols.ProtocolQueryError:
+            raise
         except Exception as e:
-            logger.error(f"Error fetching Morpho positions: {e}", exc_info=True)
+            raise protocols.ProtocolQueryError(f"Error fetching Morpho positions: {e}") from e
         
         return positions
 
@@ -228,7 +230,7 @@ class CurvanceStrategy(LendingProtocolStrategy):
             }]
             
             ctoken_contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(ctoken_address),
+                address=protocols.to_checksum_address(ctoken_address),
                 abi=ctoken_abi
             )
             
@@ -251,17 +253,7 @@ class CurvanceStrategy(LendingProtocolStrategy):
             return self._symbol_cache[token_lower]
         
         try:
-            erc20_abi = [{
-                "inputs": [],
-                "name": "symbol",
-                "outputs": [{"name": "", "type": "string"}],
-                "stateMutability": "view",
-                "type": "function"
-            }]
-            token_contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(token_address),
-                abi=erc20_abi
-            )
+            token_contract = protocols.get_contract(self.w3, protocols.to_checksum_address(token_address), 'ERC20')
             symbol = token_contract.functions.symbol().call()
             self._symbol_cache[token_lower] = symbol
             return symbol
@@ -326,7 +318,7 @@ class CurvanceStrategy(LendingProtocolStrategy):
             
             try:
                 mm_contract = self.w3.eth.contract(
-                    address=self.w3.to_checksum_address(mm_address),
+                    address=protocols.to_checksum_address(mm_address),
                     abi=market_manager_abi
                 )
                 tokens_listed = mm_contract.functions.queryTokensListed().call()
@@ -365,7 +357,8 @@ class CurvanceStrategy(LendingProtocolStrategy):
     
     def _identify_market_manager_by_health(self, address_checksum: str, collateral_amount: float, 
                                           debt_amount: float, market_managers: List[str],
-                                          market_manager_to_ctokens: Dict[str, List[str]]) -> tuple:
+                                          market_manager_to_ctokens: Dict[str, List[str]],
+                                          block_identifier='latest') -> tuple:
         """
         Try to identify MarketManager by testing getPositionHealth with different cTokens.
         Returns (market_manager, cToken, borrowableCToken) or (None, None, None)
@@ -402,62 +395,65 @@ class CurvanceStrategy(LendingProtocolStrategy):
             
             test_ctokens_sorted = sorted(mm_ctokens, key=sort_key)
             
+            # Try each borrowable cToken
+            borrowable_tokens = []
+            bctoken = self.MARKET_MANAGER_TO_BORROWABLE_CTOKEN.get(mm_address.lower())
+            if bctoken:
+                borrowable_tokens.append(bctoken.lower())
+            if market_manager_to_ctokens:
+                for bt in market_manager_to_ctokens.get(mm_address.lower(), []):
+                    if bt.lower() not in [b.lower() for b in borrowable_tokens]:
+                        borrowable_tokens.append(bt.lower())
+            
+            # Candidate (collateral cToken, borrowable cToken) pairs in priority order
+            candidates = []
             for test_ctoken in test_ctokens_sorted:
-                test_ctoken_lower = test_ctoken.lower()
-                is_known_ctoken = test_ctoken_lower in self.CTOKEN_TO_COLLATERAL_SYMBOL
-                
                 # Skip if this is a borrowable token being used as collateral
-                is_borrowable = any(bct_addr.lower() == test_ctoken_lower 
+                is_borrowable = any(bct_addr.lower() == test_ctoken.lower() 
                                   for bct_addr in self.MARKET_MANAGER_TO_BORROWABLE_CTOKEN.values())
                 if is_borrowable:
                     continue
+                for bctoken in borrowable_tokens:
+                    candidates.append((test_ctoken, bctoken))
+            
+            # Probe every candidate for this MarketManager in one multicall
+            test_results = protocols.curvance_position_health_multicall(
+                self.contract, self.w3, address_checksum,
+                [(mm_address, protocols.to_checksum_address(test_ctoken), bctoken) for test_ctoken, bctoken in candidates],
+                block_identifier=block_identifier
+            )
+            
+            for (test_ctoken, bctoken), test_result in zip(candidates, test_results):
+                if test_result is None:
+                    continue
                 
-                # Try each borrowable cToken
-                borrowable_tokens = []
-                bctoken = self.MARKET_MANAGER_TO_BORROWABLE_CTOKEN.get(mm_address.lower())
-                if bctoken:
-                    borrowable_tokens.append(bctoken.lower())
-                if market_manager_to_ctokens:
-                    for bt in market_manager_to_ctokens.get(mm_address.lower(), []):
-                        if bt.lower() not in [b.lower() for b in borrowable_tokens]:
-                            borrowable_tokens.append(bt.lower())
+                test_ctoken_lower = test_ctoken.lower()
+                is_known_ctoken = test_ctoken_lower in self.CTOKEN_TO_COLLATERAL_SYMBOL
                 
-                for bctoken in borrowable_tokens:
-                    try:
-                        test_result = self.contract.functions.getPositionHealth(
-                            self.w3.to_checksum_address(mm_address),
-                            address_checksum,
-                            self.w3.to_checksum_address(test_ctoken),
-                            self.w3.to_checksum_address(bctoken),
-                            False, 0, False, 0, 0
-                        ).call()
-                        
-                        test_health_raw, test_error = test_result
-                        if test_error or test_health_raw == 0 or test_health_raw > 1e20:
-                            continue
-                        
-                        test_health = test_health_raw / 1e18
-                        
-                        # Skip if returning collateral amount (wrong)
-                        if abs(test_health - collateral_amount) < 0.001:
-                            continue
-                        
-                        # Matching strategies - look for reasonable health values
-                        zero_collateral = collateral_amount < 0.001
-                        is_wmon = test_ctoken_lower == '0xe01d426b589c7834a5f6b20d7e992a705d3c22ed'
-                        is_loaznd = test_ctoken_lower == '0xf7a6ab4af86966c141d3c5633df658e5cdb0a735'
-                        
-                        # Accept if health is reasonable (not matching collateral, in valid range)
-                        reasonable_health = 0.1 < test_health < 5.0 and abs(test_health - collateral_amount) > 0.1
-                        zero_collateral_match = zero_collateral and 0.1 < test_health < 2.0 and abs(test_health - collateral_amount) > 0.1
-                        is_wmon_for_zero = zero_collateral and is_wmon and 19.0 < debt_amount < 23.0
-                        known_collateral_match = (is_known_ctoken and reasonable_health) or \
-                                               (is_loaznd and 10.0 < debt_amount < 12.5)
-                        
-                        if reasonable_health or known_collateral_match or zero_collateral_match or is_wmon_for_zero:
-                            return (mm_address, test_ctoken, bctoken)
-                    except Exception:
-                        continue
+                test_health_raw, test_error = test_result
+                if test_error or test_health_raw == 0 or test_health_raw > 1e20:
+                    continue
+                
+                test_health = test_health_raw / 1e18
+                
+                # Skip if returning collateral amount (wrong)
+                if abs(test_health - collateral_amount) < 0.001:
+                    continue
+                
+                # Matching strategies - look for reasonable health values
+                zero_collateral = collateral_amount < 0.001
+                is_wmon = test_ctoken_lower == '0xe01d426b589c7834a5f6b20d7e992a705d3c22ed'
+                is_loaznd = test_ctoken_lower == '0xf7a6ab4af86966c141d3c5633df658e5cdb0a735'
+                
+                # Accept if health is reasonable (not matching collateral, in valid range)
+                reasonable_health = 0.1 < test_health < 5.0 and abs(test_health - collateral_amount) > 0.1
+                zero_collateral_match = zero_collateral and 0.1 < test_health < 2.0 and abs(test_health - collateral_amount) > 0.1
+                is_wmon_for_zero = zero_collateral and is_wmon and 19.0 < debt_amount < 23.0
+                known_collateral_match = (is_known_ctoken and reasonable_health) or \
+                                       (is_loaznd and 10.0 < debt_amount < 12.5)
+                
+                if reasonable_health or known_collateral_match or zero_collateral_match or is_wmon_for_zero:
+                    return (mm_address, test_ctoken, bctoken)
         
         return (None, None, None)
     
@@ -475,24 +471,25 @@ class CurvanceStrategy(LendingProtocolStrategy):
         positions = []
         
         try:
-            address_checksum = self.w3.to_checksum_address(user_address)
+            address_checksum = protocols.to_checksum_address(user_address)
             logger.info(f"Curvance: Checking positions for {user_address} using ProtocolReader {self.contract.address}")
             
+            # Pin every read in this scan to one block so the probes see a consistent snapshot
+            block_number = protocols.get_block_number(self.w3)
+            
             # Step 1: Get all positions from getAllDynamicState
             try:
-                result = self.contract.functions.getAllDynamicState(address_checksum).call()
+                result = self.contract.functions.getAllDynamicState(address_checksum).call(block_identifier=block_number)
                 logger.debug(f"Curvance: getAllDynamicState returned result: {type(result)}")
                 
                 if not result or len(result) < 2:
-                    logger.warning(f"Curvance: Invalid result from getAllDynamicState: {result}")
-                    return positions
+                    raise protocols.ProtocolQueryError(f"Curvance: Invalid result from getAllDynamicState: {result}")
                 
                 market_data, user_data = result
                 logger.debug(f"Curvance: market_data type: {type(market_data)}, user_data type: {type(user_data)}")
                 
                 if not user_data or len(user_data) < 2:
-                    logger.warning(f"Curvance: Invalid user_data structure: {user_data}")
-                    return positions
+                    raise protocols.ProtocolQueryError(f"Curvance: Invalid user_data structure: {user_data}")
                 
                 raw_positions = user_data[1]  # positions array
                 logger.info(f"Curvance: Found {len(raw_positions) if raw_positions else 0} raw positions for {user_address}")
@@ -500,9 +497,10 @@ class CurvanceStrategy(LendingProtocolStrategy):
                 if not raw_positions:
                     logger.info(f"Curvance: No positions found for {user_address} (empty positions array)")
                     return positions
+            except protocols.ProtocolQueryError:
+                raise
             except Exception as e:
-                logger.error(f"Curvance: Error calling getAllDynamicState for {user_address}: {e}", exc_info=True)
-                return positions
+                raise protocols.ProtocolQueryError(f"Curvance: Error calling getAllDynamicState for {user_address}: {e}") from e
             
             # Step 2: Get all MarketManagers and their cTokens
             market_managers = protocols.get_curvance_market_managers(self.w3)
@@ -512,14 +510,15 @@ class CurvanceStrategy(LendingProtocolStrategy):
             market_manager_to_ctokens = self._get_market_manager_ctokens(market_managers)
             logger.debug(f"Curvance: Retrieved cTokens for {len(market_manager_to_ctokens)} MarketManagers")
             
-            # ERC20 ABI for token info
-            erc20_abi = [
-                {"inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "stateMutability": "view", "type": "function"},
-                {"inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "stateMutability": "view", "type": "function"}
-            ]
-            
             zero_address = '0x0000000000000000000000000000000000000000'
             
+            # MarketManagers we can probe with getPositionHealth: (market_manager, borrowable cToken)
+            borrowable_market_managers = [
+                (mm_address, self.MARKET_MANAGER_TO_BORROWABLE_CTOKEN[mm_address.lower()])
+                for mm_address in market_managers
+                if mm_address.lower() in self.MARKET_MANAGER_TO_BORROWABLE_CTOKEN
+            ]
+            
             # Group positions by MarketManager (since aggregate health is per MarketManager)
             # Key: market_manager -> {health_factor, collateral_tokens: [], total_collateral, total_debt}
             mm_positions = {}  # market_manager -> position data
@@ -528,6 +527,24 @@ class CurvanceStrategy(LendingProtocolStrategy):
             # Key: market_manager -> health_factor
             mm_health_cache = {}  # market_manager -> health_factor
             
+            # Fetch collateral decimals for every position with debt up front in one multicall,
+            # rather than one call per position after its health check (unused results are discarded)
+            decimals_calls = {}
+            for position in raw_positions:
+                if position[2] == 0:
+                    continue
+                cToken_clean = self._extract_ctoken_address(position[0])
+                if cToken_clean in decimals_calls:
+                    continue
+                try:
+                    decimals_calls[cToken_clean] = protocols.get_contract(self.w3, cToken_clean, 'ERC20').functions.decimals()
+                except Exception:
+                    pass  # Falls back to 18 decimals below
+            ctoken_decimals = dict(zip(
+                decimals_calls,
+                protocols.multicall(self.w3, list(decimals_calls.values()), block_identifier=block_number)
+            ))
+            
             # Step 3: For each position, find its MarketManager and get health factor
             for position in raw_positions:
                 # position structure: (cToken, collateral, debt, health, tokenBalance)
@@ -550,7 +567,7 @@ class CurvanceStrategy(LendingProtocolStrategy):
                 cToken_checksum = None
                 if not is_zero_address and len(cToken_clean) == 42:
                     try:
-                        cToken_checksum = self.w3.to_checksum_address(cToken_clean)
+                        cToken_checksum = protocols.to_checksum_address(cToken_clean)
                     except Exception:
                         pass
                 
@@ -564,38 +581,31 @@ class CurvanceStrategy(LendingProtocolStrategy):
                 
                 # First, try with valid cToken
                 if cToken_checksum:
-                    for mm_address in market_managers:
-                        bctoken = self.MARKET_MANAGER_TO_BORROWABLE_CTOKEN.get(mm_address.lower())
-                        if not bctoken:
+                    # Get clean health from ProtocolReader (every MarketManager in one multicall)
+                    health_results = protocols.curvance_position_health_multicall(
+                        self.contract, self.w3, address_checksum,
+                        [(mm_address, cToken_checksum, bctoken) for mm_address, bctoken in borrowable_market_managers],
+                        block_identifier=block_number
+                    )
+                    for (mm_address, bctoken), health_result in zip(borrowable_market_managers, health_results):
+                        if health_result is None:
                             continue
                         
-                        try:
-                            # Get clean health from ProtocolReader
-                            health_result = self.contract.functions.getPositionHealth(
-                                self.w3.to_checksum_address(mm_address),
-                                address_checksum,
-                                cToken_checksum,
-                                self.w3.to_checksum_address(bctoken),
-                                False, 0, False, 0, 0
-                            ).call()
-                            
-                            test_health_raw, test_error = health_result
-                            if test_error or test_health_raw == 0 or test_health_raw > 1e20:
-                                continue
-                            
-                            test_health = test_health_raw / 1e18
-                            
-                            # Skip if returning collateral amount (wrong - indicates incorrect cToken)
-                            if abs(test_health - collateral_amount) < 0.001:
-                                continue
-                            
-                            # Found valid MarketManager - use this health
-                            market_manager_found = mm_address
-                            borrowable_ctoken_used = bctoken
-                            health_factor = test_health
-                            break
-                        except Exception:
+                        test_health_raw, test_error = health_result
+                        if test_error or test_health_raw == 0 or test_health_raw > 1e20:
                             continue
+                        
+                        test_health = test_health_raw / 1e18
+                        
+                        # Skip if returning collateral amount (wrong - indicates incorrect cToken)
+                        if abs(test_health - collateral_amount) < 0.001:
+                            continue
+                        
+                        # Found valid MarketManager - use this health
+                        market_manager_found = mm_address
+                        borrowable_ctoken_used = bctoken
+                        health_factor = test_health
+                        break
                 
                 # If not found and cToken is zero/invalid, try all MarketManagers with alternative cTokens
                 if not market_manager_found and (is_zero_address or not cToken_checksum):
@@ -617,20 +627,21 @@ class CurvanceStrategy(LendingProtocolStrategy):
                     # Try to identify by testing all MarketManagers and cTokens
                     market_manager_found, cToken_checksum, borrowable_ctoken_used = self._identify_market_manager_by_health(
                         address_checksum, collateral_amount, debt_amount,
-                        market_managers_sorted, market_manager_to_ctokens
+                        market_managers_sorted, market_manager_to_ctokens,
+                        block_identifier=block_number
                     )
                     
                     if market_manager_found and cToken_checksum and borrowable_ctoken_used:
-                        cToken_checksum = self.w3.to_checksum_address(cToken_checksum)
+                        cToken_checksum = protocols.to_checksum_address(cToken_checksum)
                         # Get clean health from ProtocolReader now that we've identified the position
                         try:
                             health_result = self.contract.functions.getPositionHealth(
-                                self.w3.to_checksum_address(market_manager_found),
+                                protocols.to_checksum_address(market_manager_found),
                                 address_checksum,
                                 cToken_checksum,
-                                self.w3.to_checksum_address(borrowable_ctoken_used),
+                                protocols.to_checksum_address(borrowable_ctoken_used),
                                 False, 0, False, 0, 0
-                            ).call()
+                            ).call(block_identifier=block_number)
                             
                             test_health_raw, test_error = health_result
                             if not test_error and test_health_raw > 0 and test_health_raw <= 1e20:
@@ -640,49 +651,42 @@ class CurvanceStrategy(LendingProtocolStrategy):
                 
                 # Fallback: try with original cToken if we still don't have a MarketManager
                 if not market_manager_found:
-                    for mm_address in market_managers:
-                        try:
-                            bctoken = self.MARKET_MANAGER_TO_BORROWABLE_CTOKEN.get(mm_address.lower())
-                            if not bctoken:
-                                continue
+                    # Get aggregate health per MarketManager with the original cToken (may be packed)
+                    health_results = protocols.curvance_position_health_multicall(
+                        self.contract, self.w3, address_checksum,
+                        [(mm_address, cToken, bctoken) for mm_address, bctoken in borrowable_market_managers],
+                        block_identifier=block_number
+                    )
+                    for (mm_address, bctoken), health_result in zip(borrowable_market_managers, health_results):
+                        if health_result is None:
+                            continue
+                        
+                        position_health_raw, error_code_hit = health_result
+                        
+                        if error_code_hit:
+                            continue
+                        
+                        if position_health_raw > 0:
+                            health_factor_candidate = position_health_raw / 1e18
                             
-                            # Call getPositionHealth to get aggregate health for this MarketManager
-                            health_result = self.contract.functions.getPositionHealth(
-                                self.w3.to_checksum_address(mm_address),
-                                address_checksum,
-                                cToken,  # Use original cToken (may be packed)
-                                self.w3.to_checksum_address(bctoken),
-                                False, 0, False, 0, 0
-                            ).call()
+                            if health_factor_candidate > 1e10:
+                                continue
                             
-                            position_health_raw, error_code_hit = health_result
+                            # Found valid MarketManager for this position
+                            health_factor = health_factor_candidate
+                            market_manager_found = mm_address
+                            borrowable_ctoken_used = bctoken
                             
-                            if error_code_hit:
-                                continue
+                            # Use extracted cToken if available, otherwise keep original
+                            if cToken_checksum:
+                                pass  # Already have it
+                            elif not is_zero_address and len(cToken_clean) == 42:
+                                try:
+                                    cToken_checksum = protocols.to_checksum_address(cToken_clean)
+                                except Exception:
+                                    pass
                             
-                            if position_health_raw > 0:
-                                health_factor_candidate = position_health_raw / 1e18
-                                
-                                if health_factor_candidate > 1e10:
-                                    continue
-                                
-                                # Found valid MarketManager for this position
-                                health_factor = health_factor_candidate
-                                market_manager_found = mm_address
-                                borrowable_ctoken_used = bctoken
-                                
-                                # Use extracted cToken if available, otherwise keep original
-                                if cToken_checksum:
-                                    pass  # Already have it
-                                elif not is_zero_address and len(cToken_clean) == 42:
-                                    try:
-                                        cToken_checksum = self.w3.to_checksum_address(cToken_clean)
-                                    except Exception:
-                                        pass
-                                
-                                break
-                        except Exception:
-                            continue
+                            break
                 
                 # Check cache - if we've already processed this MarketManager, use cached health
                 if market_manager_found and health_factor:
@@ -724,7 +728,7 @@ class CurvanceStrategy(LendingProtocolStrategy):
                 if not cToken_checksum:
                     if not is_zero_address and len(cToken_clean) == 42:
                         try:
-                            cToken_checksum = self.w3.to_checksum_address(cToken_clean)
+                            cToken_checksum = protocols.to_checksum_address(cToken_clean)
                         except Exception:
                             pass
                 
@@ -734,15 +738,11 @@ class CurvanceStrategy(LendingProtocolStrategy):
                 # Get debt symbol
                 debt_symbol = self._get_debt_symbol(market_manager_found) if market_manager_found else "?"
                 
-                # Get token decimals for amount calculation
-                try:
-                    token_contract = self.w3.eth.contract(address=cToken_clean, abi=erc20_abi)
-                    collateral_decimals = token_contract.functions.decimals().call()
-                    collateral_amount = collateral_raw / (10 ** collateral_decimals)
-                except Exception:
-                    # Fallback to 18 decimals
+                # Get token decimals for amount calculation (fallback to 18 decimals)
+                collateral_decimals = ctoken_decimals.get(cToken_clean)
+                if collateral_decimals is None:
                     collateral_decimals = 18
-                    collateral_amount = collateral_raw / (10 ** collateral_decimals)
+                collateral_amount = collateral_raw / (10 ** collateral_decimals)
                 
                 debt_decimals = 18
                 debt_amount = debt_raw / (10 ** debt_decimals)
@@ -820,8 +820,10 @@ class CurvanceStrategy(LendingProtocolStrategy):
                 ))
             
             logger.info(f"Curvance: Found {len(positions)} MarketManagers with positions from {len(raw_positions)} raw positions")
+        except protocols.ProtocolQueryError:
+            raise
         except Exception as e:
-            logger.error(f"Error fetching Curvance positions: {e}", exc_info=True)
+            raise protocols.ProtocolQueryError(f"Error fetching Curvance positions: {e}") from e
         
         return positions
 
@@ -851,7 +853,8 @@ class EulerStrategy(LendingProtocolStrategy):
                 user_address,
                 self.w3,
                 self.account_lens_address,
-                self.evc_address
+                self.evc_address,
+                raise_errors=True
             )
             
             for vault in vaults_data:
@@ -907,8 +910,10 @@ class EulerStrategy(LendingProtocolStrategy):
                     ),
                     app_url=self.app_url
                 ))
+        except protocols.ProtocolQueryError:
+            raise
         except Exception as e:
-            logger.error(f"Error fetching Euler positions: {e}", exc_info=True)
+            raise protocols.ProtocolQueryError(f"Error fetching Euler positions: {e}") from e
         
         return positions
 
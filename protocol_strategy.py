@@ -6,7 +6,7 @@ without modifying existing code.
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, List, Optional
 from web3 import Web3
 import logging
 import asyncio
@@ -15,7 +15,7 @@ from time import time
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class Asset:
     """Standardized asset representation."""
     symbol: str
@@ -24,9 +24,9 @@ class Asset:
     decimals: int = 18
 
 
-@dataclass
+@dataclass(slots=True)
 class PositionData:
-    """Standardized position data structure."""
+    """Standardized position data structure (slotted: many are held in the position caches)."""
     protocol_name: str
     market_name: str
     market_id: str
@@ -68,7 +68,10 @@ class LendingProtocolStrategy(ABC):
             user_address: User's wallet address
             
         Returns:
-            List of PositionData objects
+            List of PositionData objects (empty only when the account has no positions)
+            
+        Raises:
+            protocols.ProtocolQueryError: If the protocol couldn't be read
         """
         pass
     
@@ -88,6 +91,8 @@ class ProtocolManager:
     
     def __init__(self):
         self.strategies: dict[str, LendingProtocolStrategy] = {}
+        # Strategies registered by factory, built on first use (see get_strategy)
+        self._factories: dict[str, Callable[[], LendingProtocolStrategy]] = {}
     
     def register_strategy(self, strategy: LendingProtocolStrategy):
         """Register a protocol strategy."""
@@ -95,6 +100,41 @@ class ProtocolManager:
         self.strategies[protocol_id] = strategy
         logger.info(f"Registered protocol strategy: {strategy.get_name()} ({protocol_id})")
     
+    def register_factory(self, protocol_id: str, factory: Callable[[], LendingProtocolStrategy]):
+        """
+        Register a protocol whose strategy is only built when first needed,
+        so unused protocols never set up their Web3 connection.
+        
+        Args:
+            protocol_id: Protocol identifier the factory's strategy will report
+            factory: Zero-argument callable returning the strategy
+        """
+        self._factories[protocol_id] = factory
+    
+    @property
+    def protocol_ids(self) -> List[str]:
+        """IDs of all registered protocols, built or not."""
+        return list(self.strategies) + [pid for pid in self._factories if pid not in self.strategies]
+    
+    def get_strategy(self, protocol_id: str) -> LendingProtocolStrategy:
+        """
+        Get a protocol's strategy, building it from its factory on first use.
+        
+        Args:
+            protocol_id: Protocol identifier
+            
+        Returns:
+            The registered strategy
+            
+        Raises:
+            KeyError: If no strategy or factory is registered for protocol_id
+        """
+        strategy = self.strategies.get(protocol_id)
+        if strategy is None:
+            self.register_strategy(self._factories[protocol_id]())
+            strategy = self.strategies[protocol_id]
+        return strategy
+    
     def get_all_positions(self, user_address: str, filter_protocol: Optional[str] = None) -> List[PositionData]:
         """
         Get all positions across all registered protocols (synchronous version).
@@ -108,12 +148,12 @@ class ProtocolManager:
         """
         all_positions = []
         
-        strategies_to_check = self.strategies.values()
+        strategies_to_check = [self.get_strategy(pid) for pid in self.protocol_ids]
         if filter_protocol:
-            if filter_protocol not in self.strategies:
+            if filter_protocol not in self.protocol_ids:
                 logger.warning(f"Unknown protocol filter: {filter_protocol}")
                 return []
-            strategies_to_check = [self.strategies[filter_protocol]]
+            strategies_to_check = [self.get_strategy(filter_protocol)]
         
         for strategy in strategies_to_check:
             try:
@@ -135,12 +175,13 @@ class ProtocolManager:
         Returns:
             List of PositionData objects from all protocols
         """
-        strategies_to_check = list(self.strategies.values())
         if filter_protocol:
-            if filter_protocol not in self.strategies:
+            if filter_protocol not in self.protocol_ids:
                 logger.warning(f"Unknown protocol filter: {filter_protocol}")
                 return []
-            strategies_to_check = [self.strategies[filter_protocol]]
+            strategies_to_check = [self.get_strategy(filter_protocol)]
+        else:
+            strategies_to_check = [self.get_strategy(pid) for pid in self.protocol_ids]
         
         protocol_start_time = time()
         if len(strategies_to_check) > 1:
@@ -161,16 +202,13 @@ class ProtocolManager:
                 logger.error(f"Error fetching positions from {strategy.get_name()}: {e}", exc_info=True)
                 return []
         
-        # Execute all protocol checks concurrently
+        # Execute all protocol checks concurrently (single fan-out - latency is max(RTT), not sum)
         results = await asyncio.gather(*[fetch_positions(strategy) for strategy in strategies_to_check], return_exceptions=True)
-        
+
         total_protocol_time = time() - protocol_start_time
         if len(strategies_to_check) > 1:
             logger.info(f"[PARALLEL] All {len(strategies_to_check)} protocols completed in {total_protocol_time:.2f}s")
-        
-        # Execute all protocol checks concurrently
-        results = await asyncio.gather(*[fetch_positions(strategy) for strategy in strategies_to_check], return_exceptions=True)
-        
+
         # Flatten results and filter out exceptions
         all_positions = []
         for result in results:
@@ -183,7 +221,7 @@ class ProtocolManager:
     
     def get_protocol_names(self) -> List[str]:
         """Get list of all registered protocol names."""
-        return [strategy.get_name() for strategy in self.strategies.values()]
+        return [self.get_strategy(pid).get_name() for pid in self.protocol_ids]
 
 
 # Import protocol functions (will be done in implementations)
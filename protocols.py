@@ -4,20 +4,86 @@ Separated from main bot file for better organization.
 """
 import json
 import os
+import re
 import logging
 import requests
-from typing import Optional, List, Dict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, List, Dict, Tuple
 from web3 import Web3
 import threading
 import time
+from functools import lru_cache
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
+
+class ProtocolQueryError(Exception):
+    """A protocol read failed, as opposed to succeeding with no positions for the account."""
+
 # Morpho GraphQL API endpoint
 MORPHO_GRAPHQL_URL = "https://api.morpho.org/graphql"
 
+def morpho_market_url(app_url: str, market_id: str, market_name: str) -> str:
+    """
+    Link to a user's position on a Morpho market page.
+    
+    Args:
+        app_url: Morpho app URL for the chain (PROTOCOL_CONFIG['morpho']['app_url'])
+        market_id: Market unique key
+        market_name: Market name as used in the URL
+    
+    Returns:
+        Market page URL opened on the position tab
+    """
+    return f"{app_url}/market/{market_id}/{market_name}?subTab=yourPosition"
+
+# Shared HTTP session for all RPC providers and GraphQL requests
+# One keep-alive connection pool instead of one per provider (all protocols use the same node)
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 64))
+# Per-request timeout for RPC calls, so a stalled node fails fast instead of pinning a worker thread
+RPC_TIMEOUT = float(os.environ.get('RPC_TIMEOUT', 10))  # seconds
+# Retry failed connects and transient gateway errors with a short backoff.
+# POST is included because every request we send (eth_call, GraphQL queries) is a read.
+# Read timeouts are not retried (read=0): a stalled node should cost one RPC_TIMEOUT, not four.
+_http_retry = Retry(
+    total=3,
+    read=0,
+    backoff_factor=0.2,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=frozenset({'GET', 'POST'}),
+    raise_on_status=False,
+)
+http_session = requests.Session()
+_http_adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=_http_retry)
+http_session.mount('https://', _http_adapter)
+http_session.mount('http://', _http_adapter)
+
+@lru_cache(maxsize=None)
+def make_web3(rpc_url: str) -> Web3:
+    """
+    Web3 instance for an RPC URL, whose HTTP provider reuses the shared session (with retries and RPC_TIMEOUT).
+    web3's own exception retries are turned off so the session's Retry is the only retry layer.
+    One instance per URL is shared by every protocol and helper on that node, so they share one
+    middleware stack and the per-(w3, address) contract cache in get_contract().
+    
+    Args:
+        rpc_url: RPC endpoint URL
+    
+    Returns:
+        Web3 instance
+    """
+    return Web3(Web3.HTTPProvider(
+        rpc_url,
+        session=http_session,
+        request_kwargs={'timeout': RPC_TIMEOUT},
+        exception_retry_configuration=None
+    ))
+
 # Rate limiting for GraphQL API (thread-safe)
-# Max 5 concurrent requests, with minimum 200ms between requests
+# Minimum 200ms between request starts; how many run at once is bounded by the callers
+# (graphql_semaphore in the bot). The lock only reserves send slots, so slow responses overlap.
 _graphql_lock = threading.Lock()
 _graphql_last_call_time = 0
 _graphql_min_interval = 0.2  # 200ms between requests (5 requests/second max)
@@ -27,14 +93,29 @@ def _rate_limited_graphql_request(*args, **kwargs):
     global _graphql_last_call_time
     
     with _graphql_lock:
-        # Wait if needed to respect rate limit
-        elapsed = time.time() - _graphql_last_call_time
-        if elapsed < _graphql_min_interval:
-            time.sleep(_graphql_min_interval - elapsed)
-        _graphql_last_call_time = time.time()
-        
-        # Make the actual request
-        return requests.post(*args, **kwargs)
+        # Reserve the next send slot, at least _graphql_min_interval after the previous one
+        send_at = max(time.time(), _graphql_last_call_time + _graphql_min_interval)
+        _graphql_last_call_time = send_at
+    
+    # Wait for the slot and make the request outside the lock
+    delay = send_at - time.time()
+    if delay > 0:
+        time.sleep(delay)
+    return http_session.post(*args, **kwargs)
+
+@lru_cache(maxsize=4096)
+def to_checksum_address(address: str) -> str:
+    """
+    Memoized checksum conversion (keccak hashing is the expensive part).
+    Addresses repeat on every check, so each one is only hashed once.
+    
+    Args:
+        address: Address in any case
+    
+    Returns:
+        EIP-55 checksummed address
+    """
+    return Web3.to_checksum_address(address)
 
 # Cache for LLTV values (immutable per market, so cache indefinitely)
 _lltv_cache = {}
@@ -42,6 +123,15 @@ _lltv_cache = {}
 # Cache for token decimals (immutable per token, so cache indefinitely)
 _token_decimals_cache = {}
 
+# Cache for token symbols (immutable per token; failed lookups are not cached)
+_token_symbol_cache = {}
+
+# Block-invariant caches that callers may persist across restarts (name -> dict).
+# Token decimals are left out: failed lookups are cached with a default of 18.
+STATIC_CACHES = {
+    'morpho_lltv': _lltv_cache,
+}
+
 # ERC20 ABI for fetching decimals and symbol
 ERC20_ABI = [
     {"inputs": [], "name": "decimals", "outputs": [{"internalType": "uint8", "name": "", "type": "uint8"}], "stateMutability": "view", "type": "function"},
@@ -64,7 +154,7 @@ def get_token_decimals(token_address: str, w3) -> int:
         return _token_decimals_cache[token_address_lower]
     
     try:
-        token_contract = w3.eth.contract(address=w3.to_checksum_address(token_address), abi=ERC20_ABI)
+        token_contract = get_contract(w3, to_checksum_address(token_address), 'ERC20')
         decimals = token_contract.functions.decimals().call()
         _token_decimals_cache[token_address_lower] = decimals
         logger.debug(f"Fetched decimals for token {token_address}: {decimals}")
@@ -75,8 +165,71 @@ def get_token_decimals(token_address: str, w3) -> int:
         return 18
 
 
+def get_token_symbol(token_address: str, w3) -> str:
+    """
+    Get token symbol from contract, with caching.
+    
+    Args:
+        token_address: Token contract address
+        w3: Web3 instance
+    
+    Returns:
+        Symbol as str ('?' if query fails)
+    """
+    token_address_lower = token_address.lower()
+    if token_address_lower in _token_symbol_cache:
+        return _token_symbol_cache[token_address_lower]
+    
+    try:
+        token_contract = get_contract(w3, to_checksum_address(token_address), 'ERC20')
+        symbol = token_contract.functions.symbol().call()
+        _token_symbol_cache[token_address_lower] = symbol
+        return symbol
+    except Exception as e:
+        logger.debug(f"Error fetching symbol for token {token_address}: {e}")
+        return '?'
+
+def prefetch_token_metadata(token_addresses: List[str], w3):
+    """
+    Fill the symbol and decimals caches for several tokens with one multicall,
+    so the get_token_symbol/get_token_decimals lookups that follow are cache hits.
+    
+    Args:
+        token_addresses: Token contract addresses (duplicates and empty entries are ignored)
+        w3: Web3 instance
+    """
+    missing = {}
+    for token_address in token_addresses:
+        if not token_address:
+            continue
+        token_address_lower = token_address.lower()
+        if token_address_lower not in _token_symbol_cache or token_address_lower not in _token_decimals_cache:
+            missing[token_address_lower] = token_address
+    if not missing:
+        return
+    
+    try:
+        contracts = [get_contract(w3, to_checksum_address(token_address), 'ERC20') for token_address in missing.values()]
+        results = multicall(
+            w3,
+            [contract.functions.symbol() for contract in contracts] +
+            [contract.functions.decimals() for contract in contracts]
+        )
+    except Exception as e:
+        logger.debug(f"Token metadata prefetch failed for {len(missing)} tokens: {e}")
+        return
+    
+    # Failed reads are left uncached, so the single-token lookups retry (and apply their defaults)
+    for token_address_lower, symbol, decimals in zip(missing, results[:len(contracts)], results[len(contracts):]):
+        if symbol is not None:
+            _token_symbol_cache[token_address_lower] = symbol
+        if decimals is not None:
+            _token_decimals_cache[token_address_lower] = decimals
+
+
+@lru_cache(maxsize=None)
 def load_abi(protocol_id: str) -> List[Dict]:
-    """Load ABI from JSON file."""
+    """Load ABI from JSON file (parsed once per process, then served from cache)."""
     abi_path = os.path.join('abis', f'{protocol_id}.json')
     try:
         with open(abi_path, 'r') as f:
@@ -86,6 +239,201 @@ def load_abi(protocol_id: str) -> List[Dict]:
         return []
 
 
+# Multicall3 is deployed at the same address on every EVM chain (including Monad)
+MULTICALL3_ADDRESS = os.environ.get('MULTICALL3_ADDRESS', '0xcA11bde05977b3631167028862bE2a173976CA11')
+
+# When Multicall3 is unavailable, send the individual eth_calls as JSON-RPC batches instead of
+# one HTTP request each. Some providers reject or throttle batches, so it can be switched off.
+RPC_BATCH_ENABLED = os.environ.get('RPC_BATCH_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+RPC_BATCH_SIZE = int(os.environ.get('RPC_BATCH_SIZE', 20))  # providers get unhappy past ~30-50 per batch
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+
+# ABIs defined inline in this module, addressable by name like the JSON ones in abis/
+INLINE_ABIS = {
+    'ERC20': ERC20_ABI,
+    'Multicall3': MULTICALL3_ABI,
+}
+
+
+@lru_cache(maxsize=1024)
+def get_contract(w3, address: str, abi_name: str):
+    """
+    Contract instance for (w3, address, ABI), built once and reused.
+    Building a contract walks the whole ABI, which costs more than most of the calls made with it.
+    
+    Args:
+        w3: Web3 instance
+        address: Checksummed contract address
+        abi_name: Key in INLINE_ABIS, or an ABI file name for load_abi()
+    
+    Returns:
+        Web3 contract instance
+    """
+    abi = INLINE_ABIS[abi_name] if abi_name in INLINE_ABIS else load_abi(abi_name)
+    return w3.eth.contract(address=address, abi=abi)
+
+
+# Latest block number per RPC endpoint, reused for BLOCK_NUMBER_TTL so concurrent scans that pin
+# their reads to a block don't each spend a round-trip on eth_blockNumber
+BLOCK_NUMBER_TTL = float(os.environ.get('BLOCK_NUMBER_TTL', 1))  # seconds
+_block_number_cache = TTLCache(maxsize=16, ttl=BLOCK_NUMBER_TTL)
+_block_number_lock = threading.Lock()
+
+
+def get_block_number(w3):
+    """
+    Latest block number for w3's endpoint, cached for BLOCK_NUMBER_TTL seconds.
+    Falls back to 'latest' if the node can't be reached, so the result is always usable as a block_identifier.
+    
+    Args:
+        w3: Web3 instance
+    
+    Returns:
+        Block number, or 'latest'
+    """
+    endpoint = getattr(w3.provider, 'endpoint_uri', None) or id(w3)
+    with _block_number_lock:
+        block_number = _block_number_cache.get(endpoint)
+    if block_number is not None:
+        return block_number
+    try:
+        block_number = w3.eth.block_number
+    except Exception as e:
+        logger.debug(f"Could not fetch block number, reading at latest: {e}")
+        return 'latest'
+    with _block_number_lock:
+        _block_number_cache[endpoint] = block_number
+    return block_number
+
+
+def _abi_param_type(param: Dict) -> str:
+    """Collapse an ABI param (including nested tuples) into its canonical type string."""
+    abi_type = param['type']
+    if abi_type.startswith('tuple'):
+        components = ','.join(_abi_param_type(c) for c in param.get('components', []))
+        return f"({components}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+def multicall(w3, calls: List, block_identifier='latest') -> List:
+    """
+    Execute several contract reads in a single eth_call via Multicall3.aggregate3.
+
+    Args:
+        w3: Web3 instance
+        calls: List of bound contract function calls, e.g. contract.functions.foo(arg)
+        block_identifier: Block to read at (pin several batches to one block for a consistent snapshot)
+
+    Returns:
+        List of decoded results in the same order as `calls` (None for reverted calls).
+        Results have the same shape as `.call()` would return.
+    """
+    if not calls:
+        return []
+
+    from web3._utils.abi import map_abi_data
+    from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+
+    try:
+        multicall_contract = get_contract(w3, MULTICALL3_ADDRESS, 'Multicall3')
+        call_structs = [(fn.address, True, fn._encode_transaction_data()) for fn in calls]
+        raw_results = multicall_contract.functions.aggregate3(call_structs).call(block_identifier=block_identifier)
+    except Exception as e:
+        # Multicall3 unavailable on this RPC - fall back to individual calls
+        logger.warning(f"Multicall3 aggregate3 failed ({e}), falling back to {len(calls)} individual calls")
+        return _individual_calls(w3, calls, block_identifier)
+
+    results = []
+    for fn, (success, return_data) in zip(calls, raw_results):
+        if not success or not return_data:
+            results.append(None)
+            continue
+        try:
+            output_types = [_abi_param_type(output) for output in fn.abi.get('outputs', [])]
+            decoded = w3.codec.decode(output_types, return_data)
+            normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+            results.append(normalized[0] if len(normalized) == 1 else normalized)
+        except Exception as e:
+            logger.debug(f"Could not decode multicall result for {fn.fn_name}: {e}")
+            results.append(None)
+
+    return results
+
+
+def _individual_calls(w3, calls: List, block_identifier='latest') -> List:
+    """
+    Run contract reads one eth_call each, packed into JSON-RPC batches of RPC_BATCH_SIZE.
+    A batch that fails as a whole is retried call by call so one bad call only costs its own result.
+
+    Args:
+        w3: Web3 instance
+        calls: List of bound contract function calls
+        block_identifier: Block to read at
+
+    Returns:
+        List of results in the same order as `calls` (None for failed calls)
+    """
+    if not RPC_BATCH_ENABLED or len(calls) == 1:
+        return [_single_call(fn, block_identifier) for fn in calls]
+    if not hasattr(w3, 'batch_requests'):
+        # JSON-RPC batching needs web3 v7+ (see requirements.txt)
+        logger.warning(f"Installed web3 has no batch_requests (needs v7+), sending {len(calls)} calls individually")
+        return [_single_call(fn, block_identifier) for fn in calls]
+
+    results = []
+    for start in range(0, len(calls), RPC_BATCH_SIZE):
+        chunk = calls[start:start + RPC_BATCH_SIZE]
+        try:
+            with w3.batch_requests() as batch:
+                for fn in chunk:
+                    batch.add(fn.call(block_identifier=block_identifier))
+                results.extend(batch.execute())
+        except Exception as batch_error:
+            logger.debug(f"JSON-RPC batch of {len(chunk)} calls failed ({batch_error}), retrying individually")
+            results.extend(_single_call(fn, block_identifier) for fn in chunk)
+    return results
+
+
+def _single_call(fn, block_identifier='latest'):
+    """Run one contract read, returning None if it fails."""
+    try:
+        return fn.call(block_identifier=block_identifier)
+    except Exception as call_error:
+        logger.debug(f"Fallback call {fn.fn_name} failed: {call_error}")
+        return None
+
+
 # Curvance Central Registry address on Monad
 CURVANCE_CENTRAL_REGISTRY = '0x1310f352f1389969Ece6741671c4B919523912fF'
 
@@ -97,6 +445,12 @@ KNOWN_CURVANCE_MARKET_MANAGERS = [
     # Add more as discovered
 ]
 
+# Registered MarketManagers change rarely, so the Central Registry result is cached
+# (fallback lists are not cached so a registry failure is retried on the next call)
+CURVANCE_MANAGERS_TTL = int(os.environ.get('CURVANCE_MANAGERS_TTL', 3600))  # seconds
+_curvance_managers_cache = TTLCache(maxsize=1, ttl=CURVANCE_MANAGERS_TTL)
+_curvance_managers_lock = threading.Lock()
+
 def get_curvance_market_managers(w3) -> List[str]:
     """
     Get all registered MarketManager addresses from Central Registry.
@@ -108,6 +462,11 @@ def get_curvance_market_managers(w3) -> List[str]:
     Returns:
         List of MarketManager addresses
     """
+    with _curvance_managers_lock:
+        cached = _curvance_managers_cache.get('market_managers')
+    if cached is not None:
+        return list(cached)
+    
     try:
         # Central Registry ABI for marketManagers() function
         registry_abi = [
@@ -121,20 +480,58 @@ def get_curvance_market_managers(w3) -> List[str]:
         ]
         
         registry_contract = w3.eth.contract(
-            address=w3.to_checksum_address(CURVANCE_CENTRAL_REGISTRY),
+            address=to_checksum_address(CURVANCE_CENTRAL_REGISTRY),
             abi=registry_abi
         )
         
         market_managers = registry_contract.functions.marketManagers().call()
         if market_managers:
             logger.info(f"Retrieved {len(market_managers)} MarketManagers from Central Registry")
-            return [mm.lower() for mm in market_managers]  # Normalize to lowercase
+            market_managers = [mm.lower() for mm in market_managers]  # Normalize to lowercase
+            with _curvance_managers_lock:
+                _curvance_managers_cache['market_managers'] = market_managers
+            return list(market_managers)
     except Exception as e:
         logger.warning(f"Failed to query Central Registry for MarketManagers: {e}. Using fallback list.")
     
     # Fallback to known list
     return [mm.lower() for mm in KNOWN_CURVANCE_MARKET_MANAGERS]
 
+def curvance_position_health_multicall(contract, w3, account: str, probes: List[tuple], block_identifier='latest') -> List[Optional[tuple]]:
+    """
+    Batch ProtocolReader.getPositionHealth for several probes of an existing position into one multicall.
+    
+    Args:
+        contract: ProtocolReader contract instance
+        w3: Web3 instance
+        account: User's wallet address (checksummed)
+        probes: List of (market_manager, cToken, borrowable_ctoken) tuples to try
+        block_identifier: Block to read at (defaults to latest)
+    
+    Returns:
+        List aligned with probes of (position_health_raw, error_code_hit), or None where the call failed
+    """
+    calls = []
+    call_indices = []
+    for idx, (mm_address, cToken, borrowable_ctoken) in enumerate(probes):
+        try:
+            # Zero amounts / no deposit / no repayment = check the existing position
+            calls.append(contract.functions.getPositionHealth(
+                to_checksum_address(mm_address),
+                account,
+                cToken,
+                to_checksum_address(borrowable_ctoken),
+                False, 0, False, 0, 0
+            ))
+            call_indices.append(idx)
+        except Exception as e:
+            logger.debug(f"Could not build getPositionHealth call for MarketManager {mm_address}, cToken {cToken}: {e}")
+    
+    results = [None] * len(probes)
+    for idx, result in zip(call_indices, multicall(w3, calls, block_identifier=block_identifier)):
+        results[idx] = result
+    return results
+
 def check_curvance_health_factor(address: str, contract, w3, market_manager_address: str = None, known_market_managers: List[str] = None) -> Optional[float]:
     """
     Check health factor for Curvance protocol using ProtocolReader.getPositionHealth.
@@ -155,7 +552,7 @@ def check_curvance_health_factor(address: str, contract, w3, market_manager_addr
     """
     try:
         # Convert address to checksum format
-        address_checksum = w3.to_checksum_address(address)
+        address_checksum = to_checksum_address(address)
         
         # First, get all positions to know which markets to check
         result = contract.functions.getAllDynamicState(address_checksum).call()
@@ -212,48 +609,33 @@ def check_curvance_health_factor(address: str, contract, w3, market_manager_addr
             if debt == 0:
                 continue
             
-            # Try each MarketManager until we find one that works
+            # Probe every MarketManager in one multicall, then take the first that works
+            # (zero borrowableCToken - try zero first, might need actual address)
+            health_results = curvance_position_health_multicall(
+                contract, w3, address_checksum,
+                [(mm_address, cToken, zero_address) for mm_address in market_managers_to_try]
+            )
             position_health_found = False
-            for mm_address in market_managers_to_try:
-                try:
-                    # Call getPositionHealth to check existing position
-                    # Parameters: (mm, account, cToken, borrowableCToken, isDeposit, collateralAssets, isRepayment, debtAssets, bufferTime)
-                    # For checking existing position: use zero for borrowableCToken and zero amounts
-                    health_result = contract.functions.getPositionHealth(
-                        w3.to_checksum_address(mm_address),  # IMarketManager mm
-                        address_checksum,  # address account
-                        cToken,  # address cToken (collateral token)
-                        zero_address,  # address borrowableCToken (try zero first, might need actual address)
-                        False,  # bool isDeposit (false = check existing, not simulating deposit)
-                        0,  # uint256 collateralAssets (0 = check existing position)
-                        False,  # bool isRepayment (false = check existing, not simulating repayment)
-                        0,  # uint256 debtAssets (0 = check existing position)
-                        0  # uint256 bufferTime
-                    ).call()
-                    
-                    position_health_raw, error_code_hit = health_result
-                    
-                    if error_code_hit:
-                        # Try next MarketManager
-                        continue
-                    
-                    if position_health_raw > 0:
-                        # Health factor is in 18 decimals (1e18 = 1.0)
-                        # Note: 151% = 1.51, so 1510000000000000000 / 1e18 = 1.51
-                        # IMPORTANT: This is aggregate health for the account in this MarketManager
-                        health_factor = position_health_raw / 1e18
-                        health_factors.append(health_factor)
-                        logger.debug(f"Curvance position: cToken={cToken}, MarketManager={mm_address}, aggregate health={health_factor:.4f} ({health_factor*100:.1f}%)")
-                        position_health_found = True
-                        break  # Found working MarketManager for this position
-                    else:
-                        # Health is 0, might be wrong MarketManager, try next
-                        continue
-                        
-                except Exception as e:
+            for mm_address, health_result in zip(market_managers_to_try, health_results):
+                if health_result is None:
+                    # Call failed - try next MarketManager
+                    continue
+                
+                position_health_raw, error_code_hit = health_result
+                
+                if error_code_hit:
                     # Try next MarketManager
-                    logger.debug(f"Error calling getPositionHealth with MarketManager {mm_address} for cToken {cToken}: {e}")
                     continue
+                
+                if position_health_raw > 0:
+                    # Health factor is in 18 decimals (1e18 = 1.0)
+                    # Note: 151% = 1.51, so 1510000000000000000 / 1e18 = 1.51
+                    # IMPORTANT: This is aggregate health for the account in this MarketManager
+                    health_factor = position_health_raw / 1e18
+                    health_factors.append(health_factor)
+                    logger.debug(f"Curvance position: cToken={cToken}, MarketManager={mm_address}, aggregate health={health_factor:.4f} ({health_factor*100:.1f}%)")
+                    position_health_found = True
+                    break  # Found working MarketManager for this position
             
             # If no MarketManager worked, try fallback
             if not position_health_found:
@@ -299,7 +681,7 @@ def get_curvance_position_details(address: str, contract, w3, market_manager_add
     position_details = []
     
     try:
-        address_checksum = w3.to_checksum_address(address)
+        address_checksum = to_checksum_address(address)
         result = contract.functions.getAllDynamicState(address_checksum).call()
         market_data, user_data = result
         positions = user_data[1]  # positions array
@@ -342,33 +724,24 @@ def get_curvance_position_details(address: str, contract, w3, market_manager_add
             market_manager_found = None
             health_factor = None
             
-            for mm_address in market_managers_to_try:
-                try:
-                    # Call getPositionHealth to get accurate health factor and verify MarketManager
-                    health_result = contract.functions.getPositionHealth(
-                        w3.to_checksum_address(mm_address),
-                        address_checksum,
-                        cToken,
-                        zero_address,  # borrowableCToken (0 for checking existing)
-                        False,  # isDeposit
-                        0,  # collateralAssets (0 = check existing)
-                        False,  # isRepayment
-                        0,  # debtAssets (0 = check existing)
-                        0  # bufferTime
-                    ).call()
-                    
-                    position_health_raw, error_code_hit = health_result
-                    
-                    if error_code_hit:
-                        continue  # Try next MarketManager
-                    
-                    if position_health_raw > 0:
-                        health_factor = position_health_raw / 1e18
-                        market_manager_found = mm_address
-                        break  # Found working MarketManager
-                except Exception as e:
-                    logger.debug(f"Error calling getPositionHealth with MarketManager {mm_address} for cToken {cToken}: {e}")
-                    continue
+            # Get accurate health factor and verify MarketManager (all candidates in one multicall)
+            health_results = curvance_position_health_multicall(
+                contract, w3, address_checksum,
+                [(mm_address, cToken, zero_address) for mm_address in market_managers_to_try]
+            )
+            for mm_address, health_result in zip(market_managers_to_try, health_results):
+                if health_result is None:
+                    continue  # Try next MarketManager
+                
+                position_health_raw, error_code_hit = health_result
+                
+                if error_code_hit:
+                    continue  # Try next MarketManager
+                
+                if position_health_raw > 0:
+                    health_factor = position_health_raw / 1e18
+                    market_manager_found = mm_address
+                    break  # Found working MarketManager
             
             # If no MarketManager worked, skip this position (can't determine health)
             if not market_manager_found:
@@ -431,7 +804,7 @@ def check_euler_health_factor(address: str, contract, w3) -> Optional[float]:
         Health factor as float, or None if error
     """
     try:
-        address_checksum = w3.to_checksum_address(address)
+        address_checksum = to_checksum_address(address)
         
         # Try to get account health from accountLens
         # accountLens typically has getAccountHealth or similar function
@@ -477,7 +850,7 @@ def check_euler_health_factor(address: str, contract, w3) -> Optional[float]:
                         "type": "function"
                     }
                 ]
-                evc_contract = w3.eth.contract(address=w3.to_checksum_address(evc_address), abi=evc_abi)
+                evc_contract = w3.eth.contract(address=to_checksum_address(evc_address), abi=evc_abi)
                 health_factor_raw = evc_contract.functions.getAccountHealth(address_checksum).call()
                 health_factor = health_factor_raw / 1e18
                 if health_factor > 1e10:
@@ -504,7 +877,7 @@ def get_euler_account_data(address: str, contract, w3) -> Optional[Dict]:
         Dict with 'collateral_usd', 'debt_usd', 'health_factor', or None if error
     """
     try:
-        address_checksum = w3.to_checksum_address(address)
+        address_checksum = to_checksum_address(address)
         
         # Try to get account balances/values from accountLens
         try:
@@ -607,7 +980,7 @@ def get_euler_verified_vaults(w3, perspective_address: str = None) -> List[str]:
         ]
         
         perspective_contract = w3.eth.contract(
-            address=w3.to_checksum_address(perspective_address),
+            address=to_checksum_address(perspective_address),
             abi=perspective_abi
         )
         
@@ -618,7 +991,31 @@ def get_euler_verified_vaults(w3, perspective_address: str = None) -> List[str]:
         logger.warning(f"Failed to query governedPerspective for verified vaults: {e}")
         return []
 
-def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, evc_address: str = None) -> List[Dict]:
+def _euler_vault_tokens(vault_info) -> List[str]:
+    """
+    Debt asset and collateral token addresses referenced by a VaultAccountInfo struct.
+    
+    Args:
+        vault_info: VaultAccountInfo tuple from AccountLens
+    
+    Returns:
+        List of token addresses (empty if the struct can't be read)
+    """
+    tokens = []
+    try:
+        if len(vault_info) > 3 and vault_info[3]:
+            tokens.append(vault_info[3])
+        liquidity_info = vault_info[15] if len(vault_info) > 15 else vault_info[-1]
+        collateral_values_raw = liquidity_info[2] if len(liquidity_info) > 2 and isinstance(liquidity_info[2], (list, tuple)) else []
+        for coll_item in collateral_values_raw:
+            if isinstance(coll_item, (list, tuple)) and len(coll_item) >= 2 and coll_item[0] and coll_item[1] > 0:
+                tokens.append(coll_item[0])
+    except Exception:
+        pass
+    return tokens
+
+def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, evc_address: str = None,
+                          raise_errors: bool = False) -> List[Dict]:
     """
     Get list of Euler vaults where user has positions using AccountLens.
     
@@ -631,14 +1028,17 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
         w3: Web3 instance
         account_lens_address: accountLens contract address
         evc_address: EVC (Euler Vault Controller) contract address
+        raise_errors: Raise ProtocolQueryError if the account can't be read and nothing was found,
+            instead of returning [] (isolated vaults that fail to read are still skipped)
     
     Returns:
         List of dicts with vault info: [{'vault_address': '0x...', 'health_factor': 1.5, 'collateral_usd': 1000, 'debt_usd': 500}, ...]
     """
     vaults = []
+    error = None
     
     try:
-        address_checksum = w3.to_checksum_address(address)
+        address_checksum = to_checksum_address(address)
         account_lens_addr = account_lens_address or '0x960D481229f70c3c1CBCD3fA2d223f55Db9f36Ee'
         evc_addr = evc_address or '0x7a9324E8f270413fa2E458f5831226d99C7477CD'
         
@@ -646,17 +1046,19 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
         account_lens_abi = load_abi('AccountLens')
         if not account_lens_abi:
             logger.error("Failed to load AccountLens ABI")
+            if raise_errors:
+                raise ProtocolQueryError("Failed to load AccountLens ABI")
             return []
         
         account_lens_contract = w3.eth.contract(
-            address=w3.to_checksum_address(account_lens_addr),
+            address=to_checksum_address(account_lens_addr),
             abi=account_lens_abi
         )
         
         # Use getAccountEnabledVaultsInfo - this returns all vaults with positions
         try:
             result = account_lens_contract.functions.getAccountEnabledVaultsInfo(
-                w3.to_checksum_address(evc_addr),
+                to_checksum_address(evc_addr),
                 address_checksum
             ).call()
             
@@ -666,6 +1068,8 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
             
             if vault_account_info_list:
                 logger.debug(f"Found {len(vault_account_info_list)} EVC-enabled vault positions for {address}")
+                # Symbols and decimals of every debt and collateral token in one multicall
+                prefetch_token_metadata([token for vault_info in vault_account_info_list for token in _euler_vault_tokens(vault_info)], w3)
             
             for idx, vault_info in enumerate(vault_account_info_list):
                 try:
@@ -709,8 +1113,7 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
                     debt_amount = 0
                     if asset_address:
                         try:
-                            token_contract = w3.eth.contract(address=w3.to_checksum_address(asset_address), abi=ERC20_ABI)
-                            debt_symbol = token_contract.functions.symbol().call()
+                            debt_symbol = get_token_symbol(asset_address, w3)
                             debt_decimals = get_token_decimals(asset_address, w3)
                             debt_amount = borrowed / (10 ** debt_decimals)
                         except Exception as e:
@@ -722,8 +1125,7 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
                     if collateral_addresses:
                         try:
                             first_collateral_addr = collateral_addresses[0]
-                            token_contract = w3.eth.contract(address=w3.to_checksum_address(first_collateral_addr), abi=ERC20_ABI)
-                            collateral_symbol = token_contract.functions.symbol().call()
+                            collateral_symbol = get_token_symbol(first_collateral_addr, w3)
                             collateral_decimals = get_token_decimals(first_collateral_addr, w3)
                             if assets_account > 0:
                                 collateral_amount = assets_account / (10 ** collateral_decimals)
@@ -768,6 +1170,7 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
             logger.error(f"Error calling getAccountEnabledVaultsInfo: {e}")
             import traceback
             logger.debug(traceback.format_exc())
+            error = f"getAccountEnabledVaultsInfo failed for {address}: {e}"
         
         # Also check known isolated vault addresses using getAccountInfo
         # IMPORTANT: Positions can be on sub-accounts (0-10), so we need to check all sub-accounts
@@ -788,12 +1191,29 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
                 accounts_to_check.append(address_checksum)  # Main account
             else:
                 sub_account = get_euler_sub_account(address, account_id)
-                accounts_to_check.append(w3.to_checksum_address(sub_account))
+                accounts_to_check.append(to_checksum_address(sub_account))
         
         logger.debug(f"Checking {len(vaults_to_check)} isolated vaults across {len(accounts_to_check)} accounts (main + sub-accounts 0-10) for {address}")
         
+        # Send every (vault, account) getAccountInfo read up front as JSON-RPC batches rather than
+        # one round trip per pair. Kept out of Multicall3 so each lens call keeps its own gas budget.
+        account_pairs = [
+            (to_checksum_address(vault_address), account_addr)
+            for vault_address in vaults_to_check
+            for account_addr in accounts_to_check
+        ]
+        account_infos = dict(zip(account_pairs, _individual_calls(w3, [
+            account_lens_contract.functions.getAccountInfo(account_addr, vault_address_checksum)
+            for vault_address_checksum, account_addr in account_pairs
+        ])))
+        prefetch_token_metadata([
+            token
+            for account_info in account_infos.values() if account_info is not None
+            for token in _euler_vault_tokens(account_info[1])
+        ], w3)
+        
         for vault_address in vaults_to_check:
-            vault_address_checksum = w3.to_checksum_address(vault_address)
+            vault_address_checksum = to_checksum_address(vault_address)
             
             # Check each account (main + sub-accounts)
             for account_addr in accounts_to_check:
@@ -801,13 +1221,9 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
                 account_label = f"Sub-account {account_id}" if account_id > 0 else "Main account"
                 
                 try:
-                    # Use getAccountInfo for this specific vault and account
-                    try:
-                        account_info = account_lens_contract.functions.getAccountInfo(
-                            account_addr,
-                            vault_address_checksum
-                        ).call()
-                    except Exception as e_call:
+                    # getAccountInfo for this specific vault and account (None if the read failed)
+                    account_info = account_infos.get((vault_address_checksum, account_addr))
+                    if account_info is None:
                         continue  # Skip silently - vault might not exist or no position
                     
                     # account_info structure: (evcAccountInfo, vaultAccountInfo, accountRewardInfo)
@@ -882,8 +1298,7 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
                     debt_amount = 0
                     if asset_address:
                         try:
-                            token_contract = w3.eth.contract(address=w3.to_checksum_address(asset_address), abi=ERC20_ABI)
-                            debt_symbol = token_contract.functions.symbol().call()
+                            debt_symbol = get_token_symbol(asset_address, w3)
                             debt_decimals = get_token_decimals(asset_address, w3)
                             debt_amount = borrowed / (10 ** debt_decimals)
                         except Exception as e:
@@ -895,8 +1310,7 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
                     if collateral_addresses:
                         try:
                             first_collateral_addr = collateral_addresses[0]
-                            token_contract = w3.eth.contract(address=w3.to_checksum_address(first_collateral_addr), abi=ERC20_ABI)
-                            collateral_symbol = token_contract.functions.symbol().call()
+                            collateral_symbol = get_token_symbol(first_collateral_addr, w3)
                             collateral_decimals = get_token_decimals(first_collateral_addr, w3)
                             # Use assetsAccount for collateral amount (deposited assets)
                             if assets_account > 0:
@@ -947,14 +1361,69 @@ def get_euler_user_vaults(address: str, w3, account_lens_address: str = None, ev
                         logger.debug(f"Error checking isolated vault {vault_address} on {account_label}: {e_vault}")
                     continue
         
+    except ProtocolQueryError:
+        raise
     except Exception as e:
         logger.error(f"Error getting Euler user vaults for {address}: {e}")
         import traceback
         logger.debug(traceback.format_exc())
+        error = f"Error getting Euler user vaults for {address}: {e}"
     
+    # A partial result is still returned: it isn't empty, so it can't be mistaken for "no debt"
+    if raise_errors and error and not vaults:
+        raise ProtocolQueryError(error)
     return vaults
 
 
+# getUserAccountData(address) is the hot Neverland read - encode/decode it by hand
+# instead of going through web3.py's contract function machinery on every call
+NEVERLAND_ACCOUNT_DATA_SELECTOR = bytes(Web3.keccak(text='getUserAccountData(address)')[:4])
+# Returns six static uint256 words, so decoding is plain 32-byte slicing
+NEVERLAND_ACCOUNT_DATA_WORDS = 6
+
+# Hex address with optional 0x prefix (format check only - checksums are not validated)
+HEX_ADDRESS_RE = re.compile(r'^(?:0x)?([0-9a-fA-F]{40})$')
+
+@lru_cache(maxsize=4096)
+def address_calldata(selector: bytes, address: str) -> str:
+    """
+    Hex calldata for a single-address call: 4-byte selector + left-padded address.
+    Memoized since the same (function, user) pairs are queried on every check.
+    
+    Args:
+        selector: 4-byte function selector
+        address: Address with or without 0x prefix, any case
+    
+    Returns:
+        0x-prefixed calldata hex string
+    """
+    match = HEX_ADDRESS_RE.match(address)
+    if not match:
+        raise ValueError(f"Invalid address: {address}")
+    return '0x' + selector.hex() + '0' * 24 + match.group(1).lower()
+
+def _get_neverland_account_data_raw(address: str, contract, w3) -> tuple:
+    """
+    Raw eth_call to getUserAccountData, decoded by slicing the 32-byte return words.
+    
+    Args:
+        address: User's wallet address
+        contract: Web3 contract instance (only its address is used)
+        w3: Web3 instance
+    
+    Returns:
+        Tuple of (totalCollateralBase, totalDebtBase, availableBorrowsBase,
+                  currentLiquidationThreshold, ltv, healthFactor)
+    """
+    calldata = address_calldata(NEVERLAND_ACCOUNT_DATA_SELECTOR, address.lower())
+    response = w3.provider.make_request('eth_call', [{'to': contract.address, 'data': calldata}, 'latest'])
+    if 'error' in response:
+        raise ValueError(f"eth_call getUserAccountData failed: {response['error']}")
+    raw = bytes.fromhex(response['result'][2:])
+    if len(raw) < NEVERLAND_ACCOUNT_DATA_WORDS * 32:
+        raise ValueError(f"getUserAccountData returned {len(raw)} bytes for {address}")
+    return tuple(int.from_bytes(raw[i:i + 32], 'big') for i in range(0, NEVERLAND_ACCOUNT_DATA_WORDS * 32, 32))
+
 def check_neverland_health_factor(address: str, contract, w3) -> Optional[float]:
     """
     Check health factor for Neverland protocol.
@@ -968,9 +1437,7 @@ def check_neverland_health_factor(address: str, contract, w3) -> Optional[float]
         Health factor as float, or None if error
     """
     try:
-        # Convert address to checksum format (Web3.py requires checksum addresses)
-        address_checksum = w3.to_checksum_address(address)
-        account_data = contract.functions.getUserAccountData(address_checksum).call()
+        account_data = _get_neverland_account_data_raw(address, contract, w3)
         # Health factor is at index 5 (0-indexed)
         health_factor_raw = account_data[5]
         health_factor = health_factor_raw / 1e18
@@ -992,8 +1459,7 @@ def get_neverland_account_data(address: str, contract, w3) -> Optional[Dict]:
         Dict with 'collateral_usd', 'debt_usd', 'health_factor', or None if error
     """
     try:
-        address_checksum = w3.to_checksum_address(address)
-        account_data = contract.functions.getUserAccountData(address_checksum).call()
+        account_data = _get_neverland_account_data_raw(address, contract, w3)
         # getUserAccountData returns: [totalCollateralBase, totalDebtBase, availableBorrowsBase, 
         #                              currentLiquidationThreshold, ltv, healthFactor]
         # Values are in base currency (typically USD) with 8 decimals
@@ -1103,7 +1569,7 @@ def get_morpho_user_vaults(address: str, chain_id: int = 143) -> List[Dict]:
     try:
         # Get Web3 connection for Monad
         rpc_url = os.environ.get('MONAD_NODE_URL', 'https://rpc.monad.xyz')
-        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        w3 = make_web3(rpc_url)
         
         if not w3.is_connected():
             logger.error("Failed to connect to Monad RPC")
@@ -1136,12 +1602,12 @@ def get_morpho_user_vaults(address: str, chain_id: int = 143) -> List[Dict]:
             }
         ]
         
-        address_checksum = w3.to_checksum_address(address)
+        address_checksum = to_checksum_address(address)
         
         # Check each known vault
         for vault_address, vault_name, asset_symbol in known_vaults_monad:
             try:
-                vault_contract = w3.eth.contract(address=w3.to_checksum_address(vault_address), abi=vault_abi)
+                vault_contract = w3.eth.contract(address=to_checksum_address(vault_address), abi=vault_abi)
                 
                 # Get user's share balance
                 shares = vault_contract.functions.balanceOf(address_checksum).call()
@@ -1206,6 +1672,19 @@ def get_morpho_user_vaults(address: str, chain_id: int = 143) -> List[Dict]:
     return []
 
 
+def get_cached_morpho_market_lltv(market_id: str) -> Optional[float]:
+    """
+    Get a Morpho market's LLTV if it has already been fetched (no RPC).
+    
+    Args:
+        market_id: Market ID as hex string (bytes32)
+    
+    Returns:
+        LLTV as float, or None if not cached yet
+    """
+    return _lltv_cache.get(market_id.lower())
+
+
 def get_morpho_market_lltv(market_id: str, contract, w3) -> Optional[float]:
     """
     Get LLTV (Liquidation Loan-to-Value) for a Morpho market from the contract.
@@ -1255,7 +1734,195 @@ def get_morpho_market_lltv(market_id: str, contract, w3) -> Optional[float]:
         return None
 
 
-def get_morpho_user_markets(address: str, chain_id: int = 143) -> List[Dict]:
+def batch_morpho_lltvs(market_ids: List[str], contract, w3) -> Dict[str, Optional[float]]:
+    """
+    Get LLTVs for many Morpho markets, fetching all uncached ones in a single multicall.
+    
+    Args:
+        market_ids: Market IDs as hex strings (bytes32)
+        contract: Web3 contract instance for Morpho Blue
+        w3: Web3 instance
+    
+    Returns:
+        Dict of lowercase market ID -> LLTV as float (None if it could not be fetched)
+    """
+    lltvs = {}
+    pending = []
+    for market_id in market_ids:
+        market_id_lower = market_id.lower()
+        if market_id_lower in _lltv_cache:
+            lltvs[market_id_lower] = _lltv_cache[market_id_lower]
+        elif len(market_id_lower.replace('0x', '')) == 64:
+            pending.append(market_id_lower)
+        else:
+            logger.error(f"Invalid market ID format: {market_id} (expected 64 hex chars)")
+            lltvs[market_id_lower] = None
+    
+    if pending:
+        # idToMarketParams(id) -> (loanToken, collateralToken, oracle, irm, lltv)
+        results = multicall(w3, [
+            contract.functions.idToMarketParams(bytes.fromhex(market_id.replace('0x', '')))
+            for market_id in pending
+        ])
+        for market_id, market_params in zip(pending, results):
+            lltv = None
+            if market_params and len(market_params) > 4 and market_params[4]:
+                lltv = float(market_params[4]) / 1e18
+                _lltv_cache[market_id] = lltv
+            lltvs[market_id] = lltv
+        logger.debug(f"Fetched {len(pending)} Morpho LLTVs in one multicall")
+    
+    return lltvs
+
+
+def morpho_shares_to_assets(shares: int, total_assets: int, total_shares: int) -> int:
+    """
+    Convert Morpho Blue shares to assets, rounding down like the contract does.
+    
+    Args:
+        shares: Position shares
+        total_assets: Market total assets (supply or borrow side)
+        total_shares: Market total shares (same side)
+        
+    Returns:
+        Asset amount in raw token units (0 if the market side is empty)
+    """
+    if shares <= 0 or total_shares <= 0:
+        return 0
+    return (shares * total_assets) // total_shares
+
+
+def calculate_liquidation_price(borrow_usd: float, collateral_qty: float, lltv: float, collateral_usd: float) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Calculate the collateral price at which a Morpho position gets liquidated.
+    
+    At liquidation: Debt_USD = Collateral_Qty * Liq_Price * LLTV,
+    so Liq_Price = Debt_USD / (Collateral_Qty * LLTV).
+    
+    Args:
+        borrow_usd: Debt value in USD
+        collateral_qty: Collateral amount (human readable)
+        lltv: Liquidation LTV as a fraction (e.g., 0.86)
+        collateral_usd: Collateral value in USD
+        
+    Returns:
+        Tuple of (liquidation_price, liquidation_drop_pct); either is None if it cannot be computed
+    """
+    if not lltv or lltv <= 0 or collateral_qty <= 0:
+        return None, None
+    
+    liquidation_price = borrow_usd / (collateral_qty * lltv)
+    
+    # Current price per unit derived from the USD value
+    liquidation_drop_pct = None
+    if collateral_usd > 0:
+        current_price = collateral_usd / collateral_qty
+        liquidation_drop_pct = ((current_price - liquidation_price) / current_price) * 100
+    
+    return liquidation_price, liquidation_drop_pct
+
+
+def fetch_morpho_positions_multicall(user_address: str, market_ids: List[str], contract, w3) -> Dict[str, List]:
+    """
+    Read position() and idToMarketParams() for many Morpho markets in a single Multicall3 eth_call.
+    
+    Args:
+        user_address: User's wallet address
+        market_ids: Market IDs as hex strings (bytes32)
+        contract: Web3 contract instance for Morpho Blue
+        w3: Web3 instance
+    
+    Returns:
+        Struct-of-arrays dict: one list per field, index-aligned with market_ids
+        ('supply_shares', 'borrow_shares', 'collateral', 'total_supply_assets', 'total_supply_shares',
+        'total_borrow_assets', 'total_borrow_shares', 'loan_token', 'collateral_token', 'lltv_raw').
+        Entries are None where the market ID is malformed or the call reverted.
+    """
+    position_fields = ('supply_shares', 'borrow_shares', 'collateral')
+    market_fields = ('total_supply_assets', 'total_supply_shares', 'total_borrow_assets', 'total_borrow_shares')
+    params_fields = ('loan_token', 'collateral_token', 'lltv_raw')
+    result = {field: [] for field in position_fields + market_fields + params_fields}
+    
+    address_checksum = to_checksum_address(user_address)
+    calls = []
+    valid = []
+    for market_id in market_ids:
+        market_id_clean = market_id.lower().replace('0x', '')
+        if len(market_id_clean) != 64:
+            valid.append(False)
+            continue
+        market_id_bytes32 = bytes.fromhex(market_id_clean)
+        calls.append(contract.functions.position(market_id_bytes32, address_checksum))
+        calls.append(contract.functions.idToMarketParams(market_id_bytes32))
+        valid.append(True)
+    
+    responses = iter(multicall(w3, calls))
+    for is_valid in valid:
+        position_data = next(responses) if is_valid else None
+        market_params = next(responses) if is_valid else None
+        
+        if position_data:
+            # position() -> (marketParams, market, userPosition)
+            _, market_data, user_position = position_data
+            for field, value in zip(position_fields, user_position):
+                result[field].append(value)
+            for field, value in zip(market_fields, market_data):
+                result[field].append(value)
+        else:
+            for field in position_fields + market_fields:
+                result[field].append(None)
+        
+        if market_params:
+            # idToMarketParams() -> (loanToken, collateralToken, oracle, irm, lltv)
+            result['loan_token'].append(market_params[0])
+            result['collateral_token'].append(market_params[1])
+            result['lltv_raw'].append(market_params[4])
+        else:
+            for field in params_fields:
+                result[field].append(None)
+    
+    return result
+
+
+# One alert reads the same user's markets several times within seconds (strategy, health factor
+# check, rebalancing suggestion), so recent non-empty results are reused for MORPHO_MARKETS_TTL
+MORPHO_MARKETS_TTL = int(os.environ.get('MORPHO_MARKETS_TTL', 30))  # seconds
+_morpho_markets_cache = TTLCache(maxsize=4096, ttl=MORPHO_MARKETS_TTL)
+_morpho_markets_lock = threading.Lock()
+
+def get_morpho_user_markets(address: str, chain_id: int = 143, raise_errors: bool = False) -> List[Dict]:
+    """
+    Get list of markets where user has positions, cached for MORPHO_MARKETS_TTL seconds.
+    Empty results (no positions or an API failure) are not cached.
+    
+    Args:
+        address: User's wallet address
+        chain_id: Chain ID (143 for Monad, 1 for Ethereum)
+        raise_errors: Raise ProtocolQueryError on an API failure instead of returning []
+    
+    Returns:
+        List of market dicts, see _fetch_morpho_user_markets
+    """
+    cache_key = (address.lower(), chain_id)
+    with _morpho_markets_lock:
+        cached = _morpho_markets_cache.get(cache_key)
+    if cached is not None:
+        return list(cached)
+    
+    markets = _fetch_morpho_user_markets(address, chain_id, raise_errors)
+    if markets:
+        with _morpho_markets_lock:
+            _morpho_markets_cache[cache_key] = markets
+    return list(markets)
+
+def forget_morpho_user_markets(address: str):
+    """Drop cached Morpho markets for an address (all chains)."""
+    address = address.lower()
+    with _morpho_markets_lock:
+        for cache_key in [key for key in _morpho_markets_cache if key[0] == address]:
+            _morpho_markets_cache.pop(cache_key, None)
+
+def _fetch_morpho_user_markets(address: str, chain_id: int = 143, raise_errors: bool = False) -> List[Dict]:
     """
     Get list of markets where user has positions using Morpho's GraphQL API.
     Calculates Liquidation Price and human-readable token amounts.
@@ -1263,15 +1930,17 @@ def get_morpho_user_markets(address: str, chain_id: int = 143) -> List[Dict]:
     Args:
         address: User's wallet address
         chain_id: Chain ID (143 for Monad, 1 for Ethereum)
+        raise_errors: Raise ProtocolQueryError on an API failure instead of returning []
     
     Returns:
         List of dicts with market info: [{'id': '0x...', 'healthFactor': 1.5, ...}, ...]
     """
     markets = []
+    error = None
     
     # Initialize Web3 early so it's available for both main logic and fallbacks
     rpc_url = os.environ.get('MONAD_NODE_URL', 'https://rpc.monad.xyz')
-    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    w3 = make_web3(rpc_url)
     
     try:
         # GraphQL Query including token addresses to fetch decimals
@@ -1326,11 +1995,20 @@ def get_morpho_user_markets(address: str, chain_id: int = 143) -> List[Dict]:
         
         if response.status_code == 200:
             data = response.json()
+            # An address Morpho has never seen comes back as a NOT_FOUND error, not an empty user
+            if 'errors' in data and all(
+                graphql_error.get('status') == 'NOT_FOUND' or graphql_error.get('extensions', {}).get('code') == 'NOT_FOUND'
+                for graphql_error in data['errors']
+            ):
+                logger.debug(f"No user data found for {address} on chain {chain_id} in Morpho API")
+                return []
             if 'errors' in data:
                 logger.error(f"Morpho GraphQL errors for {address} on chain {chain_id}: {data['errors']}")
-                for error in data['errors']:
-                    logger.error(f"  GraphQL Error: {error.get('message', error)}")
-                # Don't return empty list on GraphQL errors - log and continue
+                messages = [graphql_error.get('message', str(graphql_error)) for graphql_error in data['errors']]
+                for message in messages:
+                    logger.error(f"  GraphQL Error: {message}")
+                # Keep any markets in the partial response, but an empty result is not a confirmed "no positions"
+                error = f"Morpho GraphQL errors for {address}: {'; '.join(messages)}"
                 logger.warning(f"GraphQL query had errors, but continuing to process response")
             
             if 'data' in data and data['data']:
@@ -1419,18 +2097,9 @@ def get_morpho_user_markets(address: str, chain_id: int = 143) -> List[Dict]:
                             # Debt = (Collateral_Qty * Liq_Price) * LLTV
                             # Liq_Price = Debt / (Collateral_Qty * LLTV)
                             
-                            liquidation_price = 0
-                            liquidation_drop_pct = 0
-                            
-                            if lltv and lltv > 0 and collateral_human > 0:
-                                # Calculate the unit price of collateral at which liquidation occurs
-                                liquidation_price = borrow_usd / (collateral_human * lltv)
-                                
-                                # Calculate current price per unit based on USD value
-                                if collateral_usd > 0:
-                                    current_price = collateral_usd / collateral_human
-                                    if current_price > 0:
-                                        liquidation_drop_pct = ((current_price - liquidation_price) / current_price) * 100
+                            liquidation_price, liquidation_drop_pct = calculate_liquidation_price(borrow_usd, collateral_human, lltv, collateral_usd)
+                            liquidation_price = liquidation_price or 0
+                            liquidation_drop_pct = liquidation_drop_pct or 0
                             
                             markets.append({
                                 'id': market_unique_key,
@@ -1455,198 +2124,96 @@ def get_morpho_user_markets(address: str, chain_id: int = 143) -> List[Dict]:
                             morpho_abi = load_abi('morpho')
                             contract = w3.eth.contract(address=morpho_address, abi=morpho_abi)
                             
-                            address_checksum = w3.to_checksum_address(address)
+                            # One multicall for every market's position() + idToMarketParams()
+                            # instead of four sequential RPCs per market
+                            onchain = fetch_morpho_positions_multicall(address, [market['id'] for market in markets], contract, w3)
                             
-                            for market in markets:
-                                # Fetch LLTV from contract if missing
+                            for idx, market in enumerate(markets):
+                                # Fill missing LLTV from the batched market params (immutable, so cache it)
                                 if market.get('lltv') is None or market.get('lltv') == 0:
-                                    lltv_from_contract = get_morpho_market_lltv(market['id'], contract, w3)
-                                    if lltv_from_contract:
+                                    lltv_raw = onchain['lltv_raw'][idx]
+                                    if lltv_raw:
+                                        lltv_from_contract = float(lltv_raw) / 1e18
+                                        _lltv_cache[market['id'].lower()] = lltv_from_contract
                                         market['lltv'] = lltv_from_contract
                                         logger.debug(f"Fetched LLTV from contract for market {market['id']}: {lltv_from_contract:.4f}")
                                 
-                                # Always fetch collateral and borrow amounts from contract for accuracy
-                                # GraphQL supplyAssets is often 0 or missing
-                                try:
-                                    # Convert market ID to bytes32
-                                    market_id_clean = market['id'].replace('0x', '').lower()
-                                    if len(market_id_clean) == 64:
-                                        market_id_bytes32 = bytes.fromhex(market_id_clean)
-                                        
-                                        # Get position data and market params from contract
-                                        position_data = contract.functions.position(market_id_bytes32, address_checksum).call()
-                                        market_params_tuple, market_data, user_position = position_data
-                                        
-                                        # Get market params to get token addresses
-                                        market_params = contract.functions.idToMarketParams(market_id_bytes32).call()
-                                        loan_token_address = market_params[0]
-                                        collateral_token_address = market_params[1]
-                                        
-                                        # Extract position data
-                                        supply_shares = user_position[0]
-                                        borrow_shares = user_position[1]
-                                        
-                                        # Convert supply shares to supply assets (collateral)
-                                        total_supply_assets = market_data[0]
-                                        total_supply_shares = market_data[1]
-                                        if total_supply_shares > 0 and supply_shares > 0:
-                                            supply_assets_raw = (supply_shares * total_supply_assets) // total_supply_shares
-                                            
-                                            # Get collateral token decimals dynamically
-                                            collateral_decimals = get_token_decimals(collateral_token_address, w3)
-                                            
-                                            # Convert to human-readable format
-                                            collateral_amount = float(supply_assets_raw) / (10 ** collateral_decimals)
-                                            market['supplyAmountHuman'] = collateral_amount
-                                            logger.debug(f"Fetched collateral amount from contract: {collateral_amount:.4f} {market.get('collateralAsset')} (decimals: {collateral_decimals})")
-                                        
-                                        # Convert borrow shares to borrow assets
-                                        if borrow_shares > 0:
-                                            total_borrow_assets = market_data[2]
-                                            total_borrow_shares = market_data[3]
-                                            
-                                            if total_borrow_shares > 0:
-                                                # Convert shares to assets: assets = (shares * total_assets) / total_shares
-                                                borrow_assets_raw = (borrow_shares * total_borrow_assets) // total_borrow_shares
-                                                
-                                                # Get loan token decimals dynamically
-                                                loan_decimals = get_token_decimals(loan_token_address, w3)
-                                                
-                                                # Convert to human-readable format
-                                                borrow_amount = float(borrow_assets_raw) / (10 ** loan_decimals)
-                                                market['borrowAmountHuman'] = borrow_amount
-                                                logger.debug(f"Fetched borrow amount from contract: {borrow_amount:.2f} {market.get('loanAsset')} (decimals: {loan_decimals})")
-                                        
-                                        # Recalculate liquidation price with accurate amounts
-                                        if market.get('lltv') and market.get('lltv') > 0 and market.get('supplyAmountHuman') and market.get('supplyAmountHuman') > 0:
-                                            try:
-                                                lltv = float(market['lltv'])
-                                                supply_human = float(market['supplyAmountHuman'])
-                                                borrow_usd = float(market['borrowAssetsUsd'])
-                                                
-                                                if lltv > 0 and supply_human > 0:
-                                                    # Recalculate liquidation price: Debt_USD / (Collateral_Qty * LLTV)
-                                                    liquidation_price = borrow_usd / (supply_human * lltv)
-                                                    market['liquidationPrice'] = liquidation_price
-                                                    
-                                                    # Calculate percentage drop
-                                                    supply_usd = float(market['supplyAssetsUsd'])
-                                                    if supply_usd > 0:
-                                                        current_price = supply_usd / supply_human
-                                                        if current_price > 0:
-                                                            liquidation_drop_pct = ((current_price - liquidation_price) / current_price) * 100
-                                                            market['liquidationDropPct'] = liquidation_drop_pct
-                                                            logger.debug(f"Recalculated liquidation price: ${liquidation_price:.2f}, drop: {liquidation_drop_pct:.1f}%")
-                                            except Exception as e:
-                                                logger.debug(f"Could not recalculate liquidation price: {e}")
-                                except Exception as e:
-                                    logger.debug(f"Could not fetch position data from contract for market {market['id']}: {e}")
-                                    import traceback
-                                    logger.debug(traceback.format_exc())
+                                supply_shares = onchain['supply_shares'][idx]
+                                if supply_shares is None or onchain['loan_token'][idx] is None:
+                                    logger.debug(f"Could not fetch position data from contract for market {market['id']}")
+                                    continue
                                 
-                                # Always fetch raw borrow amount, collateral amount, and calculate liquidation price from contract
-                                # This ensures we have accurate data even if GraphQL doesn't provide it
+                                # Always use contract collateral and borrow amounts for accuracy
+                                # GraphQL supplyAssets is often 0 or missing
                                 try:
-                                    # Convert market ID to bytes32
-                                    market_id_clean = market['id'].replace('0x', '').lower()
-                                    if len(market_id_clean) == 64:
-                                        market_id_bytes32 = bytes.fromhex(market_id_clean)
+                                    borrow_shares = onchain['borrow_shares'][idx]
+                                    # Collateral is stored directly as assets (not shares) - this is what borrowers post
+                                    collateral_assets_raw = onchain['collateral'][idx]
+                                    total_supply_assets = onchain['total_supply_assets'][idx]
+                                    total_supply_shares = onchain['total_supply_shares'][idx]
+                                    total_borrow_assets = onchain['total_borrow_assets'][idx]
+                                    total_borrow_shares = onchain['total_borrow_shares'][idx]
+                                    loan_token_address = onchain['loan_token'][idx]
+                                    collateral_token_address = onchain['collateral_token'][idx]
+                                    
+                                    # Convert supply shares to supply assets (collateral)
+                                    if total_supply_shares > 0 and supply_shares > 0:
+                                        supply_assets_raw = morpho_shares_to_assets(supply_shares, total_supply_assets, total_supply_shares)
                                         
-                                        # Get position data and market params from contract
-                                        position_data = contract.functions.position(market_id_bytes32, address_checksum).call()
-                                        market_params_tuple, market_data, user_position = position_data
+                                        # Get collateral token decimals dynamically
+                                        collateral_decimals = get_token_decimals(collateral_token_address, w3)
                                         
-                                        # Get market params to get token addresses
-                                        market_params = contract.functions.idToMarketParams(market_id_bytes32).call()
-                                        loan_token_address = market_params[0]
-                                        collateral_token_address = market_params[1]
+                                        # Convert to human-readable format
+                                        collateral_amount = float(supply_assets_raw) / (10 ** collateral_decimals)
+                                        market['supplyAmountHuman'] = collateral_amount
+                                        logger.debug(f"Fetched collateral amount from contract: {collateral_amount:.4f} {market.get('collateralAsset')} (decimals: {collateral_decimals})")
+                                    
+                                    # Convert borrow shares to borrow assets
+                                    if borrow_shares > 0 and total_borrow_shares > 0:
+                                        borrow_assets_raw = morpho_shares_to_assets(borrow_shares, total_borrow_assets, total_borrow_shares)
                                         
-                                        # Extract position data
-                                        supply_shares = user_position[0]  # Shares of LOAN token supplied (for lenders)
-                                        borrow_shares = user_position[1]  # Shares of LOAN token borrowed
-                                        # Index 2 is collateral amount (assets), NOT shares - this is what borrowers post
-                                        collateral_assets_raw = user_position[2]
+                                        # Get loan token decimals dynamically
+                                        loan_decimals = get_token_decimals(loan_token_address, w3)
                                         
-                                        # Handle Collateral (Borrower's collateral)
-                                        # In Morpho Blue, borrowers post collateral which is stored directly as assets in user_position[2]
-                                        # For borrowers, supplyShares is 0, so we must use the collateral field directly
-                                        if collateral_assets_raw > 0:
-                                            # Get collateral token decimals dynamically
-                                            collateral_decimals = get_token_decimals(collateral_token_address, w3)
-                                            
-                                            # Convert to human-readable format (collateral is already in assets, not shares)
-                                            collateral_amount = float(collateral_assets_raw) / (10 ** collateral_decimals)
-                                            
-                                            # Update market object with collateral amount
-                                            market['supplyAmountHuman'] = collateral_amount
-                                            
-                                            logger.debug(f"Fetched collateral from contract: {collateral_amount:.4f} {market.get('collateralAsset')} (raw: {collateral_assets_raw}, decimals: {collateral_decimals})")
+                                        # Convert to human-readable format
+                                        borrow_amount = float(borrow_assets_raw) / (10 ** loan_decimals)
+                                        market['borrowAmountHuman'] = borrow_amount
+                                        market['borrowAmountRaw'] = borrow_amount
+                                        logger.debug(f"Fetched borrow amount from contract: {borrow_amount:.2f} {market.get('loanAsset')} (decimals: {loan_decimals})")
+                                    
+                                    # Recalculate liquidation price with accurate amounts
+                                    if market.get('lltv') and market.get('lltv') > 0 and market.get('supplyAmountHuman') and market.get('supplyAmountHuman') > 0:
+                                        try:
+                                            liquidation_price, liquidation_drop_pct = calculate_liquidation_price(
+                                                float(market['borrowAssetsUsd']),
+                                                float(market['supplyAmountHuman']),
+                                                float(market['lltv']),
+                                                float(market['supplyAssetsUsd'])
+                                            )
+                                            if liquidation_price is not None:
+                                                market['liquidationPrice'] = liquidation_price
+                                            if liquidation_drop_pct is not None:
+                                                market['liquidationDropPct'] = liquidation_drop_pct
+                                                logger.debug(f"Recalculated liquidation price: ${liquidation_price:.2f}, drop: {liquidation_drop_pct:.1f}%")
+                                        except Exception as e:
+                                            logger.debug(f"Could not recalculate liquidation price: {e}")
+                                    
+                                    # Handle Collateral (Borrower's collateral)
+                                    # In Morpho Blue, borrowers post collateral which is stored directly as assets
+                                    # For borrowers, supplyShares is 0, so we must use the collateral field directly
+                                    if collateral_assets_raw > 0:
+                                        # Get collateral token decimals dynamically
+                                        collateral_decimals = get_token_decimals(collateral_token_address, w3)
                                         
-                                        # Handle Lenders: If user is lending (supplyShares > 0), convert shares to assets
-                                        # Note: This is for lenders who supply the loan token, not borrowers
-                                        if supply_shares > 0:
-                                            total_supply_assets = market_data[0]
-                                            total_supply_shares = market_data[1]
-                                            if total_supply_shares > 0:
-                                                supply_assets_raw = (supply_shares * total_supply_assets) // total_supply_shares
-                                                
-                                                # Get loan token decimals (lenders supply the loan token)
-                                                loan_decimals = get_token_decimals(loan_token_address, w3)
-                                                
-                                                # Convert to human-readable format
-                                                supply_amount = float(supply_assets_raw) / (10 ** loan_decimals)
-                                                
-                                                # For lenders, this is their supply amount (loan token)
-                                                # But we're tracking collateral for borrowers, so this might not be used
-                                                logger.debug(f"User is lending: {supply_amount:.4f} {market.get('loanAsset')} (supplyShares: {supply_shares})")
+                                        # Convert to human-readable format (collateral is already in assets, not shares)
+                                        collateral_amount = float(collateral_assets_raw) / (10 ** collateral_decimals)
                                         
-                                        # Extract borrow shares and convert to assets
-                                        if borrow_shares > 0:
-                                            total_borrow_assets = market_data[2]
-                                            total_borrow_shares = market_data[3]
-                                            
-                                            if total_borrow_shares > 0:
-                                                # Convert shares to assets: assets = (shares * total_assets) / total_shares
-                                                borrow_assets_raw = (borrow_shares * total_borrow_assets) // total_borrow_shares
-                                                
-                                                # Get loan token decimals dynamically
-                                                loan_decimals = get_token_decimals(loan_token_address, w3)
-                                                
-                                                # Convert to human-readable format
-                                                borrow_amount_raw = float(borrow_assets_raw) / (10 ** loan_decimals)
-                                                market['borrowAmountRaw'] = borrow_amount_raw
-                                                logger.debug(f"Fetched raw borrow amount from contract: {borrow_amount_raw:.2f} (decimals: {loan_decimals})")
+                                        # Update market object with collateral amount
+                                        market['supplyAmountHuman'] = collateral_amount
                                         
-                                        # Calculate liquidation price if we have the necessary data
-                                        if market.get('healthFactor') and market.get('lltv') and market.get('borrowAssetsUsd') and market.get('supplyAssetsUsd') and market.get('collateralAmount'):
-                                            try:
-                                                hf = float(market['healthFactor'])
-                                                lltv = float(market['lltv'])
-                                                debt_usd = float(market['borrowAssetsUsd'])
-                                                collateral_usd = float(market['supplyAssetsUsd'])
-                                                collateral_amount = float(market['collateralAmount'])
-                                                
-                                                if hf > 0 and lltv > 0 and debt_usd > 0 and collateral_usd > 0 and collateral_amount > 0:
-                                                    # At liquidation: collateral_value × LLTV = debt_value
-                                                    # So: collateral_amount × liquidation_price × LLTV = debt_usd
-                                                    # Therefore: liquidation_price = debt_usd / (collateral_amount × LLTV)
-                                                    liquidation_price = debt_usd / (collateral_amount * lltv)
-                                                    market['liquidationPrice'] = liquidation_price
-                                                    
-                                                    # Calculate current collateral price
-                                                    current_price = collateral_usd / collateral_amount
-                                                    
-                                                    # Calculate percentage drop to liquidation
-                                                    if current_price > 0:
-                                                        drop_pct = ((current_price - liquidation_price) / current_price) * 100
-                                                        market['liquidationDropPct'] = drop_pct
-                                                        logger.debug(f"Calculated liquidation price: ${liquidation_price:.2f}, drop: {drop_pct:.1f}%")
-                                            except Exception as e:
-                                                logger.debug(f"Could not calculate liquidation price: {e}")
-                                                import traceback
-                                                logger.debug(traceback.format_exc())
+                                        logger.debug(f"Fetched collateral from contract: {collateral_amount:.4f} {market.get('collateralAsset')} (raw: {collateral_assets_raw}, decimals: {collateral_decimals})")
                                 except Exception as e:
-                                    logger.debug(f"Could not fetch position data from contract for market {market['id']}: {e}")
+                                    logger.debug(f"Could not process contract position data for market {market['id']}: {e}")
                                     import traceback
                                     logger.debug(traceback.format_exc())
                         except Exception as e:
@@ -1661,14 +2228,19 @@ def get_morpho_user_markets(address: str, chain_id: int = 143) -> List[Dict]:
                     logger.debug(f"No user data found for {address} on chain {chain_id} in Morpho API")
             else:
                 logger.warning(f"No data in response for {address} on chain {chain_id}. Response: {data}")
+                error = error or f"Morpho GraphQL returned no data for {address}"
         else:
             logger.error(f"Morpho GraphQL API returned status {response.status_code} for {address} on chain {chain_id}: {response.text[:500]}")
+            error = f"Morpho GraphQL API returned status {response.status_code}"
             
     except Exception as e:
         logger.error(f"Morpho GraphQL API error: {e}")
         import traceback
         logger.debug(traceback.format_exc())
+        error = f"Morpho GraphQL API error: {e}"
     
+    if raise_errors and error:
+        raise ProtocolQueryError(error)
     return []
 
 
@@ -1805,7 +2377,7 @@ def check_morpho_health_factor_single_market(address: str, market_id: str, contr
         
         # Convert address to checksum format
         try:
-            address_checksum = w3.to_checksum_address(address)
+            address_checksum = to_checksum_address(address)
         except Exception as e:
             logger.error(f"Invalid address format: {address}, error: {e}")
             return None
@@ -1830,15 +2402,8 @@ def check_morpho_health_factor_single_market(address: str, market_id: str, contr
         total_borrow_shares = market[3]
         
         # Convert shares to assets
-        if total_supply_shares > 0:
-            supply_assets = (supply_shares * total_supply_assets) // total_supply_shares
-        else:
-            supply_assets = 0
-            
-        if total_borrow_shares > 0:
-            borrow_assets = (borrow_shares * total_borrow_assets) // total_borrow_shares
-        else:
-            borrow_assets = 0
+        supply_assets = morpho_shares_to_assets(supply_shares, total_supply_assets, total_supply_shares)
+        borrow_assets = morpho_shares_to_assets(borrow_shares, total_borrow_assets, total_borrow_shares)
         
         # Get LLTV from market params
         lltv = market_params[4] if len(market_params) > 4 else 0
@@ -8,6 +8,9 @@ import protocols
 
 logger = logging.getLogger(__name__)
 
+# Protocols generate_rebalancing_message can produce suggestions for
+SUPPORTED_PROTOCOLS = frozenset({'morpho'})
+
 
 def get_vault_balances_by_asset(address: str, chain_id: int = 143) -> Dict[str, Dict]:
     """
@@ -124,7 +127,8 @@ def generate_rebalancing_message(
     market_id: Optional[str],
     current_hf: float,
     threshold: float,
-    chain_id: int = 143
+    chain_id: int = 143,
+    app_url: Optional[str] = None
 ) -> Optional[str]:
     """
     Generate rebalancing message with repayment and collateral deposit suggestions.
@@ -136,11 +140,12 @@ def generate_rebalancing_message(
         current_hf: Current health factor
         threshold: Target threshold
         chain_id: Chain ID
+        app_url: Protocol app URL from PROTOCOL_CONFIG, for the position link (omitted if None)
     
     Returns:
         Formatted message string or None if no suggestions
     """
-    if protocol_id != 'morpho':
+    if protocol_id not in SUPPORTED_PROTOCOLS:
         # For now, only support Morpho rebalancing
         return None
     
@@ -149,16 +154,13 @@ def generate_rebalancing_message(
     if not markets:
         return None
     
-    # Find worst (lowest HF) market
-    worst_market = min(markets, key=lambda x: x.get('healthFactor', float('inf')))
-    
-    # If market_id specified, use that instead
+    # Use the specified market if given, otherwise the worst (lowest HF) market
+    worst_market = None
     if market_id:
         market_id_lower = market_id.lower()
-        for market in markets:
-            if market['id'].lower() == market_id_lower:
-                worst_market = market
-                break
+        worst_market = next((market for market in markets if market['id'].lower() == market_id_lower), None)
+    if worst_market is None:
+        worst_market = min(markets, key=lambda x: x.get('healthFactor', float('inf')))
     
     loan_asset = worst_market.get('loanAsset', '?')
     collateral_asset = worst_market.get('collateralAsset', '?')
@@ -179,8 +181,9 @@ def generate_rebalancing_message(
     message_parts.append(f"Borrowed: ${borrow_assets_usd:,.2f}")
     message_parts.append(f"\nNeed to repay ~${repayment_needed_usd:,.2f} {loan_asset} to reach safe threshold")
     
-    market_url = f"https://app.morpho.org/monad/market/{worst_market['id']}/{worst_market['name']}?subTab=yourPosition"
-    message_parts.append(f"\n[View Position]({market_url})")
+    if app_url:
+        market_url = protocols.morpho_market_url(app_url, worst_market['id'], worst_market['name'])
+        message_parts.append(f"\n[View Position]({market_url})")
     
     return "\n".join(message_parts)
 